@@ -0,0 +1,172 @@
+# Endpoints d'analyse (fiabilité, disponibilité, temps par statut, simulation)
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..core.database import get_db
+from ..core.cache import response_cache
+from ..core.config import settings
+from ..core.responses import model_response
+from ..schemas.analytics import (
+    ReliabilityGroupBy, ReliabilityReport, AvailabilityLevel, AvailabilityReport, TimeInStateReport,
+    SimulationRequest, SimulationJob
+)
+from ..services.availability import compute_availability
+from ..services.reliability import reliability_by_group
+from ..services.simulation import get_job, submit_simulation
+from ..services.status_history import time_in_state
+from ..api.auth import get_current_user
+from ..models.user import User
+
+router = APIRouter()
+
+@router.get("/reliability", response_model=ReliabilityReport)
+def get_reliability(
+    request: Request,
+    group_by: ReliabilityGroupBy = Query(ReliabilityGroupBy.MODEL),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    min_failures: int = Query(3, ge=2),
+    points: int = Query(20, ge=2, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Lois de Weibull des intervalles entre pannes (correctives et urgences)
+    par modèle, fabricant ou ligne de production, avec MTBF et courbes de
+    taux de défaillance. La dernière panne de chaque équipement compte comme
+    un intervalle censuré jusqu'à la fin de la période.
+    """
+    def compute():
+        period_end = end or datetime.now()
+        groups = reliability_by_group(db, group_by.value, start, period_end, min_failures, points)
+        return model_response(ReliabilityReport, {
+            "group_by": group_by,
+            "start": start,
+            "end": period_end,
+            "groups": groups
+        })
+
+    return response_cache.response(
+        "analytics:reliability", request, ("maintenance", "equipment"), settings.CACHE_TTL_ANALYTICS, compute
+    )
+
+@router.get("/availability", response_model=AvailabilityReport)
+def get_availability(
+    request: Request,
+    level: AvailabilityLevel = Query(AvailabilityLevel.PRODUCTION_LINE),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    site_id: Optional[int] = Query(None),
+    production_line_id: Optional[int] = Query(None),
+    limit: int = Query(100, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Disponibilité par équipement, ligne ou site sur une période (30 derniers
+    jours par défaut), les moins disponibles en premier. Les arrêts qui se
+    chevauchent, sur un équipement ou entre équipements d'un groupe, sont
+    fusionnés avant d'être comptés.
+    """
+    period_end = end or datetime.now()
+    period_start = start or period_end - timedelta(days=30)
+    if period_start >= period_end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start doit précéder end"
+        )
+
+    def compute():
+        rows = compute_availability(db, level.value, period_start, period_end, site_id, production_line_id)
+        rows.sort(key=lambda row: row["availability_percent"])
+        return model_response(AvailabilityReport, {
+            "level": level,
+            "start": period_start,
+            "end": period_end,
+            "period_seconds": int((period_end - period_start).total_seconds()),
+            "rows": rows[:limit]
+        })
+
+    return response_cache.response(
+        "analytics:availability", request, ("maintenance", "equipment", "production_lines", "sites"),
+        settings.CACHE_TTL_ANALYTICS, compute
+    )
+
+@router.get("/time-in-state", response_model=TimeInStateReport)
+def get_time_in_state(
+    request: Request,
+    level: AvailabilityLevel = Query(AvailabilityLevel.EQUIPMENT),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    site_id: Optional[int] = Query(None),
+    production_line_id: Optional[int] = Query(None),
+    equipment_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Temps passé dans chaque statut (actif, en panne, en maintenance...)
+    par équipement, ligne ou site, d'après l'historique des statuts
+    (90 derniers jours par défaut).
+    """
+    period_end = end or datetime.now()
+    period_start = start or period_end - timedelta(days=90)
+    if period_start >= period_end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start doit précéder end"
+        )
+
+    def compute():
+        rows = time_in_state(
+            db, level.value, period_start, period_end, site_id, production_line_id, equipment_id
+        )
+        return model_response(TimeInStateReport, {
+            "level": level,
+            "start": period_start,
+            "end": period_end,
+            "rows": rows
+        })
+
+    return response_cache.response(
+        "analytics:time_in_state", request, ("equipment", "production_lines", "sites"),
+        settings.CACHE_TTL_ANALYTICS, compute
+    )
+
+@router.post("/simulations", response_model=SimulationJob, status_code=status.HTTP_202_ACCEPTED)
+def create_simulation(
+    simulation: SimulationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Lancer une simulation Monte Carlo des pannes, arrêts et coûts de
+    maintenance par site sur l'horizon demandé. Le calcul tourne en tâche
+    de fond : suivre GET /simulations/{id}. La graine utilisée est renvoyée
+    pour rejouer exactement la même simulation.
+    """
+    if current_user.role not in ["admin", "supervisor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permissions insuffisantes"
+        )
+
+    runs = simulation.runs or settings.SIMULATION_RUNS
+    if runs > settings.SIMULATION_MAX_RUNS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Au plus {settings.SIMULATION_MAX_RUNS} tirages par simulation"
+        )
+    return submit_simulation(db, runs, simulation.horizon_days, simulation.seed, simulation.site_id)
+
+@router.get("/simulations/{job_id}", response_model=SimulationJob)
+def get_simulation(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """État et, une fois terminée, percentiles d'une simulation"""
+    job = get_job(db, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Simulation non trouvée"
+        )
+    return job
@@ -0,0 +1,61 @@
+# Endpoints du journal d'audit
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..core.database import get_db
+from ..core.config import settings
+from ..core.responses import model_response
+from ..models.audit import AuditLog
+from ..schemas.audit import AuditAction, AuditLogResponse
+from ..api.auth import get_current_user
+from ..models.user import User
+
+router = APIRouter()
+
+@router.get("/", response_model=List[AuditLogResponse])
+def get_audit_log(
+    entity: Optional[str] = Query(None, description="Nom de table, ex. equipment"),
+    entity_id: Optional[int] = Query(None),
+    actor: Optional[str] = Query(None),
+    action: Optional[AuditAction] = Query(None),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    before_id: Optional[int] = Query(None, description="Curseur : id de la dernière entrée de la page précédente"),
+    limit: int = Query(100, ge=1, le=settings.AUDIT_MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Journal d'audit, du plus récent au plus ancien.
+
+    Pagination par curseur : passer l'id de la dernière entrée reçue dans
+    before_id pour obtenir la page suivante (coût constant quelle que soit
+    la profondeur, contrairement à un décalage).
+    """
+    if current_user.role not in ["admin", "supervisor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permissions insuffisantes"
+        )
+
+    criteria = []
+    if entity is not None:
+        criteria.append(AuditLog.entity == entity)
+    if entity_id is not None:
+        criteria.append(AuditLog.entity_id == entity_id)
+    if actor is not None:
+        criteria.append(AuditLog.actor == actor)
+    if action is not None:
+        criteria.append(AuditLog.action == action.value)
+    if start is not None:
+        criteria.append(AuditLog.occurred_at >= start)
+    if end is not None:
+        criteria.append(AuditLog.occurred_at < end)
+    if before_id is not None:
+        criteria.append(AuditLog.id < before_id)
+
+    entries = db.execute(
+        select(AuditLog).where(*criteria).order_by(AuditLog.id.desc()).limit(limit)
+    ).scalars().all()
+    return model_response(AuditLogResponse, entries)
@@ -0,0 +1,191 @@
+# Endpoint agrégé du tableau de bord
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import func, literal, null, select, type_coerce, union_all
+from sqlalchemy.orm import Session
+from ..core.database import get_db
+from ..core.cache import response_cache
+from ..core.config import settings
+from ..core.responses import FastJSONResponse, model_response
+from ..models.equipment import Equipment
+from ..models.maintenance import ScheduledMaintenance, MaintenanceIntervention
+from ..schemas.dashboard import DashboardResponse, DashboardUpcomingMaintenance, DashboardIntervention
+from ..schemas.maintenance import MaintenanceStats
+from ..api.auth import get_current_user
+from ..api.equipment import summarize_equipment_stats
+from ..api.v1.maintenance import build_maintenance_stats, maintenance_counters
+from ..models.user import User
+
+router = APIRouter()
+
+# Colonnes communes des lignes du tableau de bord : chaque widget n'en remplit qu'une partie
+COLUMNS = (
+    "widget", "position", "id", "equipment_id", "equipment_name", "moment", "label",
+    "category", "priority", "maintenance_type", "technician_id", "number"
+)
+
+def _empty(column) -> object:
+    """NULL typé comme la colonne : le type de l'UNION est celui du premier membre"""
+    return type_coerce(null(), column.type)
+
+def _dashboard_query(limit: int):
+    """Tous les widgets en une seule instruction (CTE + UNION ALL), une ligne par élément.
+
+    - upcoming : prochaines maintenances planifiées, avec le nom de l'équipement
+    - in_progress : interventions en cours, les plus anciennes en premier
+    - equipment : nombre d'équipements par (statut, criticité)
+    - maintenance : un compteur par ligne (label)
+    """
+    upcoming = (
+        select(
+            ScheduledMaintenance.id,
+            ScheduledMaintenance.equipment_id,
+            Equipment.name.label("equipment_name"),
+            ScheduledMaintenance.scheduled_date,
+            ScheduledMaintenance.estimated_start_time,
+            ScheduledMaintenance.priority,
+            ScheduledMaintenance.assigned_technician_id,
+            func.row_number().over(order_by=(ScheduledMaintenance.scheduled_date, ScheduledMaintenance.id)).label("position")
+        )
+        .outerjoin(Equipment, Equipment.id == ScheduledMaintenance.equipment_id)
+        .where(
+            ScheduledMaintenance.status == "scheduled",
+            ScheduledMaintenance.scheduled_date >= datetime.now()
+        )
+        .order_by(ScheduledMaintenance.scheduled_date, ScheduledMaintenance.id)
+        .limit(limit)
+        .cte("upcoming")
+    )
+    in_progress = (
+        select(
+            MaintenanceIntervention.id,
+            MaintenanceIntervention.equipment_id,
+            Equipment.name.label("equipment_name"),
+            MaintenanceIntervention.technician_id,
+            MaintenanceIntervention.priority,
+            MaintenanceIntervention.maintenance_type,
+            MaintenanceIntervention.actual_start_time,
+            func.row_number().over(order_by=(MaintenanceIntervention.actual_start_time, MaintenanceIntervention.id)).label("position")
+        )
+        .outerjoin(Equipment, Equipment.id == MaintenanceIntervention.equipment_id)
+        .where(MaintenanceIntervention.status == "in_progress")
+        .order_by(MaintenanceIntervention.actual_start_time, MaintenanceIntervention.id)
+        .limit(limit)
+        .cte("in_progress")
+    )
+
+    no_name, no_moment, no_text = _empty(Equipment.name), _empty(ScheduledMaintenance.scheduled_date), _empty(Equipment.status)
+    no_priority, no_type = _empty(MaintenanceIntervention.priority), _empty(MaintenanceIntervention.maintenance_type)
+    no_int = _empty(Equipment.id)
+
+    members = [
+        select(
+            literal("upcoming"), upcoming.c.position, upcoming.c.id, upcoming.c.equipment_id,
+            upcoming.c.equipment_name, upcoming.c.scheduled_date, upcoming.c.estimated_start_time,
+            no_text, upcoming.c.priority, no_type, upcoming.c.assigned_technician_id, no_int
+        ),
+        select(
+            literal("in_progress"), in_progress.c.position, in_progress.c.id, in_progress.c.equipment_id,
+            in_progress.c.equipment_name, in_progress.c.actual_start_time, no_text,
+            no_text, in_progress.c.priority, in_progress.c.maintenance_type, in_progress.c.technician_id, no_int
+        ),
+        select(
+            literal("equipment"), no_int, no_int, no_int, no_name, no_moment, Equipment.status,
+            Equipment.criticality, no_priority, no_type, no_int, func.count(Equipment.id)
+        ).group_by(Equipment.status, Equipment.criticality),
+    ]
+    for name, counter in maintenance_counters().items():
+        members.append(select(
+            literal("maintenance"), no_int, no_int, no_int, no_name, no_moment, literal(name),
+            no_text, no_priority, no_type, no_int, counter
+        ))
+    return union_all(*members)
+
+def compute_dashboard(db: Session, limit: int) -> dict:
+    """Contenu de tous les widgets, lu en un seul aller-retour"""
+    widgets = {"upcoming": [], "in_progress": [], "equipment": [], "maintenance": {}}
+    for row in db.execute(_dashboard_query(limit)):
+        row = dict(zip(COLUMNS, row))
+        widget = row["widget"]
+        if widget == "upcoming":
+            widgets[widget].append({
+                "position": row["position"],
+                "id": row["id"],
+                "equipment_id": row["equipment_id"],
+                "equipment_name": row["equipment_name"],
+                "scheduled_date": row["moment"],
+                "estimated_start_time": row["label"],
+                "priority": row["priority"],
+                "assigned_technician_id": row["technician_id"],
+            })
+        elif widget == "in_progress":
+            widgets[widget].append({
+                "position": row["position"],
+                "id": row["id"],
+                "equipment_id": row["equipment_id"],
+                "equipment_name": row["equipment_name"],
+                "technician_id": row["technician_id"],
+                "priority": row["priority"],
+                "maintenance_type": row["maintenance_type"],
+                "actual_start_time": row["moment"],
+            })
+        elif widget == "equipment":
+            widgets[widget].append((row["label"], row["category"], row["number"]))
+        else:
+            widgets[widget][row["label"]] = row["number"]
+
+    # L'ordre des lignes d'une UNION n'est pas garanti : chaque liste garde sa position
+    for name in ("upcoming", "in_progress"):
+        widgets[name].sort(key=lambda item: item.pop("position"))
+    widgets["equipment"] = summarize_equipment_stats(widgets["equipment"])
+    widgets["maintenance"] = build_maintenance_stats(widgets["maintenance"])
+    return widgets
+
+@router.get("/", response_model=DashboardResponse)
+def get_dashboard(
+    request: Request,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Récupérer tous les widgets du tableau de bord en une seule requête HTTP.
+
+    Chaque widget est mis en cache séparément, avec sa propre durée de vie
+    et ses étiquettes. Au premier widget manquant, tous sont calculés par
+    une seule instruction SQL ; les autres widgets manquants réutilisent
+    son résultat.
+    """
+    snapshot = {}
+
+    def computed(name: str):
+        if not snapshot:
+            snapshot.update(compute_dashboard(db, limit))
+        return snapshot[name]
+
+    widgets = {
+        "equipment": (
+            ("equipment",), settings.DASHBOARD_TTL_COUNTERS,
+            lambda: FastJSONResponse(computed("equipment"))
+        ),
+        "maintenance": (
+            ("maintenance",), settings.DASHBOARD_TTL_COUNTERS,
+            lambda: model_response(MaintenanceStats, computed("maintenance"))
+        ),
+        "upcoming": (
+            ("maintenance", "equipment"), settings.DASHBOARD_TTL_LISTS,
+            lambda: model_response(DashboardUpcomingMaintenance, computed("upcoming"))
+        ),
+        "in_progress": (
+            ("maintenance", "equipment"), settings.DASHBOARD_TTL_LISTS,
+            lambda: model_response(DashboardIntervention, computed("in_progress"))
+        ),
+    }
+
+    # Les corps JSON mis en cache sont assemblés tels quels, sans re-sérialisation
+    parts = []
+    for name, (tags, ttl, compute) in widgets.items():
+        widget = response_cache.response(
+            f"dashboard:{name}", request, tags, ttl, compute, scope=current_user.role
+        )
+        parts.append(b'"' + name.encode() + b'":' + widget.body)
+    return Response(content=b"{" + b",".join(parts) + b"}", media_type="application/json")
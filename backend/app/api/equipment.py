@@ -1,23 +1,40 @@
 # Endpoints pour les équipements
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, func
 from typing import List, Optional
 from ..core.database import get_db
-from ..models.equipment import Equipment
+from ..core.cache import response_cache
+from ..core.config import settings
+from ..core.changes import record_change
+from ..core.events import equipment_event
+from ..core.conditional import CollectionValidators, check_if_match, version_etag
+from ..core.fields import parse_fields, query_options
+from ..core.responses import FastJSONResponse, model_response
+from ..models.equipment import Equipment, EquipmentStatusChange
 from ..models.site import Site
 from ..models.production_line import ProductionLine
 from ..schemas.equipment import (
     EquipmentCreate, EquipmentUpdate, EquipmentResponse, 
-    EquipmentWithRelations, EquipmentFilter, EquipmentStatus, EquipmentCriticality
+    EquipmentWithRelations, EquipmentFilter, EquipmentStatus, EquipmentCriticality,
+    EquipmentStatusChangeResponse
 )
 from ..api.auth import get_current_user
 from ..models.user import User
 
 router = APIRouter()
 
+# Colonnes et relations nécessaires aux champs calculés
+FIELD_DEPENDENCIES = {
+    "status_display": ("status",),
+    "criticality_display": ("criticality",),
+    "site_name": ("site_id", "site"),
+    "production_line_name": ("production_line_id", "production_line"),
+}
+
 @router.get("/", response_model=List[EquipmentResponse])
-async def get_equipment_list(
+def get_equipment_list(
+    request: Request,
     site_id: Optional[int] = Query(None),
     production_line_id: Optional[int] = Query(None),
     status: Optional[EquipmentStatus] = Query(None),
@@ -25,48 +42,64 @@ async def get_equipment_list(
     search: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Liste de champs séparés par des virgules"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Récupérer la liste des équipements avec filtres"""
-    query = db.query(Equipment)
+    selected = parse_fields(fields, EquipmentResponse)
     
     # Appliquer les filtres
+    criteria = []
     if site_id:
-        query = query.filter(Equipment.site_id == site_id)
+        criteria.append(Equipment.site_id == site_id)
     
     if production_line_id:
-        query = query.filter(Equipment.production_line_id == production_line_id)
+        criteria.append(Equipment.production_line_id == production_line_id)
     
     if status:
-        query = query.filter(Equipment.status == status)
+        criteria.append(Equipment.status == status)
     
     if criticality:
-        query = query.filter(Equipment.criticality == criticality)
+        criteria.append(Equipment.criticality == criticality)
     
     if search:
-        search_filter = or_(
+        criteria.append(or_(
             Equipment.name.ilike(f"%{search}%"),
             Equipment.model.ilike(f"%{search}%"),
             Equipment.manufacturer.ilike(f"%{search}%"),
             Equipment.serial_number.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+        ))
+    
+    validators = CollectionValidators.compute(db, request, (Equipment, criteria), tags=("equipment",))
+    if validators.is_not_modified(request):
+        return validators.not_modified()
     
-    equipment_list = query.offset(skip).limit(limit).all()
-    return equipment_list
+    def compute():
+        query = db.query(Equipment).options(*query_options(Equipment, selected, FIELD_DEPENDENCIES)).filter(*criteria)
+        equipment_list = query.offset(skip).limit(limit).all()
+        return model_response(EquipmentResponse, equipment_list, selected)
+    
+    # Les noms de site et de ligne ne font pas partie de la liste : seule l'étiquette equipment compte
+    response = response_cache.response(
+        "equipment:list", request, ("equipment",), settings.CACHE_TTL_REFERENCE, compute, versions=validators.tag_versions
+    )
+    return validators.apply(response)
 
 @router.get("/{equipment_id}", response_model=EquipmentWithRelations)
 async def get_equipment(
     equipment_id: int,
+    fields: Optional[str] = Query(None, description="Liste de champs séparés par des virgules"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Récupérer un équipement par son ID avec ses relations"""
-    equipment = db.query(Equipment).options(
-        joinedload(Equipment.site),
-        joinedload(Equipment.production_line)
-    ).filter(Equipment.id == equipment_id).first()
+    selected = parse_fields(fields, EquipmentWithRelations)
+    if selected is not None:
+        options = query_options(Equipment, selected, FIELD_DEPENDENCIES)
+    else:
+        options = [joinedload(Equipment.site), joinedload(Equipment.production_line)]
+    equipment = db.query(Equipment).options(*options).filter(Equipment.id == equipment_id).first()
 
     if not equipment:
         raise HTTPException(
@@ -74,12 +107,30 @@ async def get_equipment(
             detail="Équipement non trouvé"
         )
 
-    # Créer la réponse avec les noms des relations
-    equipment_dict = equipment.__dict__.copy()
-    equipment_dict['site_name'] = equipment.site.name if equipment.site else None
-    equipment_dict['production_line_name'] = equipment.production_line.name if equipment.production_line else None
+    headers = {"ETag": version_etag(equipment.version)} if selected is None else None
+    return model_response(EquipmentWithRelations, equipment, selected, headers=headers)
 
-    return equipment_dict
+@router.get("/{equipment_id}/status-history", response_model=List[EquipmentStatusChangeResponse])
+def get_equipment_status_history(
+    equipment_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Changements de statut d'un équipement, du plus récent au plus ancien"""
+    if db.query(Equipment.id).filter(Equipment.id == equipment_id).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Équipement non trouvé"
+        )
+
+    changes = db.query(EquipmentStatusChange).filter(
+        EquipmentStatusChange.equipment_id == equipment_id
+    ).order_by(
+        EquipmentStatusChange.changed_at.desc(), EquipmentStatusChange.id.desc()
+    ).offset(skip).limit(limit).all()
+    return model_response(EquipmentStatusChangeResponse, changes)
 
 @router.post("/", response_model=EquipmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_equipment(
@@ -133,6 +184,7 @@ async def create_equipment(
     
     db_equipment = Equipment(**equipment_data.model_dump())
     db.add(db_equipment)
+    record_change(db, ("equipment",))
     db.commit()
     db.refresh(db_equipment)
 
@@ -140,12 +192,13 @@ async def create_equipment(
 
 @router.put("/{equipment_id}", response_model=EquipmentResponse)
 async def update_equipment(
+    request: Request,
     equipment_id: int,
     equipment_data: EquipmentUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Mettre à jour un équipement"""
+    """Mettre à jour un équipement (If-Match : 412 si modifié entre-temps)"""
     # Vérifier les permissions
     if current_user.role not in ["admin", "supervisor"]:
         raise HTTPException(
@@ -159,6 +212,7 @@ async def update_equipment(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Équipement non trouvé"
         )
+    check_if_match(request, equipment.version)
 
     # Vérifier l'unicité du numéro de série si modifié
     update_data = equipment_data.model_dump(exclude_unset=True)
@@ -174,13 +228,25 @@ async def update_equipment(
             )
 
     # Mettre à jour les champs modifiés
+    previous_status = equipment.status
+    previous_line_id = equipment.production_line_id
     for field, value in update_data.items():
         setattr(equipment, field, value)
 
+    status_event = None
+    if equipment.status != previous_status:
+        status_event = equipment_event("equipment.status", equipment, {
+            "id": equipment.id,
+            "status": equipment.status,
+            "previous_status": previous_status
+        })
+    # Un déplacement change la composition (et le graphe) des deux lignes
+    tags = ("equipment", "production_lines") if equipment.production_line_id != previous_line_id else ("equipment",)
+    record_change(db, tags, status_event)
     db.commit()
     db.refresh(equipment)
 
-    return equipment
+    return model_response(EquipmentResponse, equipment, headers={"ETag": version_etag(equipment.version)})
 
 @router.delete("/{equipment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_equipment(
@@ -204,37 +270,42 @@ async def delete_equipment(
         )
 
     db.delete(equipment)
+    record_change(db, ("equipment",))
     db.commit()
 
     return None
 
 @router.get("/stats/summary")
-async def get_equipment_stats(
+def get_equipment_stats(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Récupérer les statistiques des équipements"""
-    total = db.query(Equipment).count()
-    active = db.query(Equipment).filter(Equipment.status == EquipmentStatus.ACTIVE).count()
-    maintenance = db.query(Equipment).filter(Equipment.status == EquipmentStatus.MAINTENANCE).count()
-    broken = db.query(Equipment).filter(Equipment.status == EquipmentStatus.BROKEN).count()
-    inactive = db.query(Equipment).filter(Equipment.status == EquipmentStatus.INACTIVE).count()
+    def compute():
+        return FastJSONResponse(compute_equipment_stats(db))
+    
+    return response_cache.response(
+        "equipment:stats", request, ("equipment",), settings.CACHE_TTL_STATS, compute, scope=current_user.role
+    )
+
+def compute_equipment_stats(db: Session) -> dict:
+    """Calculer les statistiques des équipements en une seule requête groupée"""
+    rows = db.query(Equipment.status, Equipment.criticality, func.count(Equipment.id)).group_by(
+        Equipment.status, Equipment.criticality
+    ).all()
+    return summarize_equipment_stats(rows)
 
-    critical = db.query(Equipment).filter(Equipment.criticality == EquipmentCriticality.CRITICAL).count()
-    high = db.query(Equipment).filter(Equipment.criticality == EquipmentCriticality.HIGH).count()
+def summarize_equipment_stats(rows) -> dict:
+    """Statistiques des équipements à partir des lignes (statut, criticité, nombre)"""
+    by_status = {status.value: 0 for status in EquipmentStatus}
+    by_criticality = {criticality.value: 0 for criticality in reversed(EquipmentCriticality)}
+    for equipment_status, criticality, count in rows:
+        by_status[equipment_status] = by_status.get(equipment_status, 0) + count
+        by_criticality[criticality] = by_criticality.get(criticality, 0) + count
 
     return {
-        "total": total,
-        "by_status": {
-            "active": active,
-            "maintenance": maintenance,
-            "broken": broken,
-            "inactive": inactive
-        },
-        "by_criticality": {
-            "critical": critical,
-            "high": high,
-            "medium": db.query(Equipment).filter(Equipment.criticality == EquipmentCriticality.MEDIUM).count(),
-            "low": db.query(Equipment).filter(Equipment.criticality == EquipmentCriticality.LOW).count()
-        }
+        "total": sum(count for _, _, count in rows),
+        "by_status": by_status,
+        "by_criticality": by_criticality
     }
@@ -0,0 +1,64 @@
+# Flux d'événements temps réel (Server-Sent Events)
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.events import event_bus
+from ..api.auth import get_current_user, oauth2_scheme
+from ..models.user import User
+
+router = APIRouter()
+
+def get_stream_user(token: str = Depends(oauth2_scheme)) -> User:
+    """Authentifier l'abonné avec une session courte.
+
+    La session n'est pas conservée pendant toute la durée du flux : une
+    connexion SSE inactive ne doit pas immobiliser une connexion du pool.
+    """
+    db = SessionLocal()
+    try:
+        return get_current_user(token, db)
+    finally:
+        db.close()
+
+@router.get("/stream")
+async def stream_events(
+    site_id: Optional[int] = Query(None),
+    production_line_id: Optional[int] = Query(None),
+    technician_id: Optional[int] = Query(None),
+    current_user: User = Depends(get_stream_user)
+):
+    """S'abonner aux changements d'interventions, de planning et de statut des équipements"""
+    async def event_stream():
+        # Abonnement créé au démarrage du flux, pour être toujours libéré dans le finally
+        subscription = event_bus.subscribe(
+            site_id=site_id,
+            production_line_id=production_line_id,
+            technician_id=technician_id
+        )
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Commentaire SSE : maintient la connexion ouverte à travers les proxys
+                    yield ": keep-alive\n\n"
+                    continue
+                if subscription.dropped:
+                    # Le client a pris du retard : il doit recharger ses données
+                    yield f"event: resync\ndata: {{\"dropped\":{subscription.dropped}}}\n\n"
+                    subscription.dropped = 0
+                yield event.encode()
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,251 @@
+# Endpoints pour les pièces détachées et leur stock
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
+from ..core.database import get_db
+from ..core.cache import response_cache
+from ..core.changes import record_change
+from ..core.config import settings
+from ..core.conditional import CollectionValidators
+from ..core.responses import model_response
+from ..models.inventory import Part, PartStock, StockAlert, StockMovement, StockMovementType
+from ..schemas.inventory import (
+    PartCreate, PartUpdate, PartResponse,
+    StockReceipt, StockAdjustment, StockMovementResponse,
+    StockAlertResponse, ReorderPointsResult
+)
+from ..services.inventory import apply_stock_movement, refresh_stock_alerts, update_reorder_points
+from ..api.auth import get_current_user
+from ..models.user import User
+
+router = APIRouter()
+
+def _get_part(db: Session, part_id: int) -> Part:
+    part = db.query(Part).options(joinedload(Part.stock)).filter(Part.id == part_id).first()
+    if not part:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pièce non trouvée"
+        )
+    return part
+
+def _require_manager(current_user: User):
+    if current_user.role not in ["admin", "supervisor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permissions insuffisantes"
+        )
+
+@router.get("/", response_model=List[PartResponse])
+def get_parts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    search: Optional[str] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Récupérer le catalogue des pièces avec leur stock"""
+    criteria = []
+    if search:
+        criteria.append(Part.name.ilike(f"%{search}%") | Part.reference.ilike(f"%{search}%"))
+    if is_active is not None:
+        criteria.append(Part.is_active == is_active)
+
+    validators = CollectionValidators.compute(db, request, (Part, criteria), (PartStock, []), tags=("parts",))
+    if validators.is_not_modified(request):
+        return validators.not_modified()
+
+    def compute():
+        parts = (
+            db.query(Part)
+            .options(joinedload(Part.stock))
+            .filter(*criteria)
+            .order_by(Part.reference)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return model_response(PartResponse, parts)
+
+    response = response_cache.response(
+        "parts:list", request, ("parts",), settings.CACHE_TTL_REFERENCE, compute, versions=validators.tag_versions
+    )
+    return validators.apply(response)
+
+@router.get("/alerts", response_model=List[StockAlertResponse])
+def get_stock_alerts(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Pièces sous leur seuil d'alerte.
+
+    L'ensemble est tenu à jour à chaque mouvement : la lecture ne parcourt
+    que les alertes en cours, jamais le catalogue.
+    """
+    def compute():
+        alerts = db.execute(
+            select(
+                StockAlert.part_id,
+                Part.reference,
+                Part.name,
+                StockAlert.quantity,
+                StockAlert.threshold,
+                StockAlert.triggered_at
+            )
+            .join(Part, Part.id == StockAlert.part_id)
+            .order_by(StockAlert.quantity * 1.0 / StockAlert.threshold, StockAlert.triggered_at)
+        ).mappings().all()
+        return model_response(StockAlertResponse, alerts)
+
+    return response_cache.response("parts:alerts", request, ("parts",), settings.CACHE_TTL_STATS, compute)
+
+@router.post("/reorder-points", response_model=ReorderPointsResult)
+def recompute_reorder_points(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recalculer les points de commande à partir de l'historique de consommation"""
+    _require_manager(current_user)
+    updated = update_reorder_points(
+        db,
+        settings.REORDER_HISTORY_DAYS,
+        settings.REORDER_LEAD_TIME_DAYS,
+        settings.REORDER_SERVICE_LEVEL_Z
+    )
+    record_change(db, ("parts",))
+    db.commit()
+
+    alerts = db.query(func.count(StockAlert.id)).scalar()
+    return ReorderPointsResult(updated=updated, alerts=alerts)
+
+@router.get("/{part_id}", response_model=PartResponse)
+def get_part(
+    part_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Récupérer une pièce par son ID"""
+    return model_response(PartResponse, _get_part(db, part_id))
+
+@router.post("/", response_model=PartResponse, status_code=status.HTTP_201_CREATED)
+def create_part(
+    part_data: PartCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Créer une pièce et son stock initial"""
+    _require_manager(current_user)
+
+    existing_part = db.query(Part).filter(Part.reference == part_data.reference).first()
+    if existing_part:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Une pièce avec cette référence existe déjà"
+        )
+
+    db_part = Part(**part_data.dict(exclude={"initial_quantity", "min_quantity"}))
+    db_part.stock = PartStock(quantity=0, min_quantity=part_data.min_quantity)
+    db.add(db_part)
+    db.flush()
+    if part_data.initial_quantity:
+        apply_stock_movement(
+            db, db_part.id, part_data.initial_quantity, StockMovementType.RECEIPT,
+            unit_cost=db_part.unit_cost, user_id=current_user.id, notes="Stock initial"
+        )
+    else:
+        refresh_stock_alerts(db, [db_part.id])
+    record_change(db, ("parts",))
+    db.commit()
+
+    return _get_part(db, db_part.id)
+
+@router.put("/{part_id}", response_model=PartResponse)
+def update_part(
+    part_id: int,
+    part_data: PartUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mettre à jour une pièce (la quantité ne change que par des mouvements)"""
+    _require_manager(current_user)
+    part = _get_part(db, part_id)
+
+    update_data = part_data.dict(exclude_unset=True)
+    min_quantity = update_data.pop("min_quantity", None)
+    for field, value in update_data.items():
+        setattr(part, field, value)
+    if min_quantity is not None:
+        part.stock.min_quantity = min_quantity
+        db.flush()
+        refresh_stock_alerts(db, [part_id])
+
+    record_change(db, ("parts",))
+    db.commit()
+
+    return _get_part(db, part_id)
+
+@router.post("/{part_id}/receipts", response_model=StockMovementResponse, status_code=status.HTTP_201_CREATED)
+def receive_part(
+    part_id: int,
+    receipt: StockReceipt,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Entrée en stock (réception fournisseur)"""
+    movement = apply_stock_movement(
+        db, part_id, receipt.quantity, StockMovementType.RECEIPT,
+        unit_cost=receipt.unit_cost, user_id=current_user.id, notes=receipt.notes
+    )
+    record_change(db, ("parts",))
+    db.commit()
+    db.refresh(movement)
+
+    return movement
+
+@router.post("/{part_id}/adjustments", response_model=StockMovementResponse, status_code=status.HTTP_201_CREATED)
+def adjust_part_stock(
+    part_id: int,
+    adjustment: StockAdjustment,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Corriger le stock après inventaire"""
+    _require_manager(current_user)
+    if adjustment.quantity == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La variation doit être non nulle"
+        )
+
+    movement = apply_stock_movement(
+        db, part_id, adjustment.quantity, StockMovementType.ADJUSTMENT,
+        user_id=current_user.id, notes=adjustment.notes
+    )
+    record_change(db, ("parts",))
+    db.commit()
+    db.refresh(movement)
+
+    return movement
+
+@router.get("/{part_id}/movements", response_model=List[StockMovementResponse])
+def get_part_movements(
+    part_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Journal des mouvements d'une pièce, du plus récent au plus ancien"""
+    movements = (
+        db.query(StockMovement)
+        .filter(StockMovement.part_id == part_id)
+        .order_by(StockMovement.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return model_response(StockMovementResponse, movements)
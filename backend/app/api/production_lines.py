@@ -1,19 +1,30 @@
 # Endpoints pour les lignes de production
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..core.database import get_db
-from ..models.production_line import ProductionLine
+from ..core.cache import response_cache
+from ..core.changes import record_change
+from ..core.config import settings
+from ..core.conditional import CollectionValidators
+from ..core.responses import model_response
+from ..models.production_line import ProductionLine, EquipmentDependency
 from ..models.site import Site
 from ..models.equipment import Equipment
-from ..schemas.production_line import ProductionLineCreate, ProductionLineUpdate, ProductionLineResponse, ProductionLineWithRelations
+from ..schemas.production_line import (
+    ProductionLineCreate, ProductionLineUpdate, ProductionLineResponse, ProductionLineWithRelations,
+    DependencyGraphUpdate, LineGraphResponse, LineImpactResponse
+)
+from ..services.line_graph import line_graphs, line_impact, validate_graph
 from ..api.auth import get_current_user
 from ..models.user import User
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ProductionLineResponse])
-async def get_production_lines(
+def get_production_lines(
+    request: Request,
     site_id: Optional[int] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -21,13 +32,23 @@ async def get_production_lines(
     current_user: User = Depends(get_current_user)
 ):
     """Récupérer la liste des lignes de production"""
-    query = db.query(ProductionLine)
-    
+    criteria = []
     if site_id:
-        query = query.filter(ProductionLine.site_id == site_id)
+        criteria.append(ProductionLine.site_id == site_id)
+    
+    validators = CollectionValidators.compute(db, request, (ProductionLine, criteria), tags=("production_lines",))
+    if validators.is_not_modified(request):
+        return validators.not_modified()
+    
+    def compute():
+        production_lines = db.query(ProductionLine).filter(*criteria).offset(skip).limit(limit).all()
+        return model_response(ProductionLineResponse, production_lines)
     
-    production_lines = query.offset(skip).limit(limit).all()
-    return production_lines
+    response = response_cache.response(
+        "production_lines:list", request, ("production_lines",), settings.CACHE_TTL_REFERENCE, compute,
+        versions=validators.tag_versions
+    )
+    return validators.apply(response)
 
 @router.get("/{line_id}", response_model=ProductionLineWithRelations)
 async def get_production_line(
@@ -36,10 +57,7 @@ async def get_production_line(
     current_user: User = Depends(get_current_user)
 ):
     """Récupérer une ligne de production par son ID avec ses relations"""
-    line = db.query(ProductionLine).options(
-        joinedload(ProductionLine.site),
-        joinedload(ProductionLine.equipment)
-    ).filter(ProductionLine.id == line_id).first()
+    line = db.query(ProductionLine).filter(ProductionLine.id == line_id).first()
     
     if not line:
         raise HTTPException(
@@ -49,10 +67,9 @@ async def get_production_line(
     
     # Ajouter le nombre d'équipements
     equipment_count = db.query(Equipment).filter(Equipment.production_line_id == line_id).count()
-    line_dict = line.__dict__.copy()
-    line_dict['equipment_count'] = equipment_count
+    response = ProductionLineWithRelations.model_validate(line).model_copy(update={'equipment_count': equipment_count})
     
-    return line_dict
+    return model_response(ProductionLineWithRelations, response)
 
 @router.post("/", response_model=ProductionLineResponse, status_code=status.HTTP_201_CREATED)
 async def create_production_line(
@@ -89,6 +106,7 @@ async def create_production_line(
     
     db_line = ProductionLine(**line_data.dict())
     db.add(db_line)
+    record_change(db, ("production_lines",))
     db.commit()
     db.refresh(db_line)
     
@@ -121,6 +139,7 @@ async def update_production_line(
     for field, value in update_data.items():
         setattr(line, field, value)
     
+    record_change(db, ("production_lines",))
     db.commit()
     db.refresh(line)
     
@@ -156,6 +175,81 @@ async def delete_production_line(
         )
     
     db.delete(line)
+    record_change(db, ("production_lines",))
     db.commit()
     
     return None
+
+def _get_line(db: Session, line_id: int) -> ProductionLine:
+    line = db.query(ProductionLine).filter(ProductionLine.id == line_id).first()
+    if not line:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ligne de production non trouvée"
+        )
+    return line
+
+@router.get("/{line_id}/graph", response_model=LineGraphResponse)
+def get_line_graph(
+    line_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Graphe de flux de la ligne et état de marche courant de chaque équipement"""
+    _get_line(db, line_id)
+    return line_graphs.snapshot(db, line_id)
+
+@router.put("/{line_id}/dependencies", response_model=LineGraphResponse)
+def replace_line_dependencies(
+    line_id: int,
+    graph_data: DependencyGraphUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remplacer les dépendances amont -> aval des équipements de la ligne"""
+    if current_user.role not in ["admin", "supervisor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permissions insuffisantes"
+        )
+    _get_line(db, line_id)
+
+    equipment_ids = [
+        equipment_id for (equipment_id,) in
+        db.query(Equipment.id).filter(Equipment.production_line_id == line_id)
+    ]
+    edges = [(edge.upstream_id, edge.downstream_id) for edge in graph_data.edges]
+    validate_graph(equipment_ids, edges)
+
+    db.query(EquipmentDependency).filter(EquipmentDependency.production_line_id == line_id).delete(
+        synchronize_session=False
+    )
+    db.add_all([
+        EquipmentDependency(production_line_id=line_id, upstream_id=upstream_id, downstream_id=downstream_id)
+        for upstream_id, downstream_id in edges
+    ])
+    record_change(db, ("production_lines",))
+    db.commit()
+
+    return line_graphs.snapshot(db, line_id)
+
+@router.get("/{line_id}/impact", response_model=LineImpactResponse)
+def get_line_impact(
+    line_id: int,
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Arrêt effectif de la ligne (propagé par le graphe) et équipements classés
+    par impact, sur une période (30 derniers jours par défaut)
+    """
+    _get_line(db, line_id)
+    period_end = end or datetime.now()
+    period_start = start or period_end - timedelta(days=30)
+    if period_start >= period_end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start doit précéder end"
+        )
+    return model_response(LineImpactResponse, line_impact(db, line_id, period_start, period_end))
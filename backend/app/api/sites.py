@@ -1,8 +1,13 @@
 # Endpoints pour les sites
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..core.database import get_db
+from ..core.cache import response_cache
+from ..core.changes import record_change
+from ..core.config import settings
+from ..core.conditional import CollectionValidators
+from ..core.responses import model_response
 from ..models.site import Site
 from ..models.production_line import ProductionLine
 from ..models.equipment import Equipment
@@ -13,15 +18,26 @@ from ..models.user import User
 router = APIRouter()
 
 @router.get("/", response_model=List[SiteResponse])
-async def get_sites(
+def get_sites(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Récupérer la liste des sites"""
-    sites = db.query(Site).offset(skip).limit(limit).all()
-    return sites
+    validators = CollectionValidators.compute(db, request, (Site, []), tags=("sites",))
+    if validators.is_not_modified(request):
+        return validators.not_modified()
+
+    def compute():
+        sites = db.query(Site).offset(skip).limit(limit).all()
+        return model_response(SiteResponse, sites)
+    
+    response = response_cache.response(
+        "sites:list", request, ("sites",), settings.CACHE_TTL_REFERENCE, compute, versions=validators.tag_versions
+    )
+    return validators.apply(response)
 
 @router.get("/{site_id}", response_model=SiteWithRelations)
 async def get_site(
@@ -30,10 +46,7 @@ async def get_site(
     current_user: User = Depends(get_current_user)
 ):
     """Récupérer un site par son ID avec ses relations"""
-    site = db.query(Site).options(
-        joinedload(Site.production_lines),
-        joinedload(Site.equipment)
-    ).filter(Site.id == site_id).first()
+    site = db.query(Site).filter(Site.id == site_id).first()
     
     if not site:
         raise HTTPException(
@@ -43,10 +56,9 @@ async def get_site(
     
     # Ajouter le nombre d'équipements
     equipment_count = db.query(Equipment).filter(Equipment.site_id == site_id).count()
-    site_dict = site.__dict__.copy()
-    site_dict['equipment_count'] = equipment_count
+    response = SiteWithRelations.model_validate(site).model_copy(update={'equipment_count': equipment_count})
     
-    return site_dict
+    return model_response(SiteWithRelations, response)
 
 @router.post("/", response_model=SiteResponse, status_code=status.HTTP_201_CREATED)
 async def create_site(
@@ -72,6 +84,7 @@ async def create_site(
     
     db_site = Site(**site_data.dict())
     db.add(db_site)
+    record_change(db, ("sites",))
     db.commit()
     db.refresh(db_site)
     
@@ -104,6 +117,7 @@ async def update_site(
     for field, value in update_data.items():
         setattr(site, field, value)
     
+    record_change(db, ("sites",))
     db.commit()
     db.refresh(site)
     
@@ -139,6 +153,7 @@ async def delete_site(
         )
     
     db.delete(site)
+    record_change(db, ("sites", "production_lines"))
     db.commit()
     
     return None
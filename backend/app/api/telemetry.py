@@ -0,0 +1,148 @@
+# Endpoints d'ingestion et de lecture de la télémétrie
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..core.database import get_db
+from ..core.config import settings
+from ..core.responses import model_response
+from ..models.telemetry import SensorReading
+from ..schemas.telemetry import (
+    IngestionResult, SensorReadingResponse, DetectorStats, Resolution, SeriesPoint, SeriesResponse
+)
+from ..services.anomaly import anomaly_detector, open_predictive_interventions
+from ..services.rollups import rollup_readings, choose_resolution, query_series, utc_now
+from ..services.telemetry import decode_batches, flatten_batches, check_equipment, write_readings
+from ..api.auth import get_current_user
+from ..models.user import User
+
+router = APIRouter()
+
+def _ingest(db: Session, body: bytes, content_type: str, user_id: int) -> IngestionResult:
+    rows = flatten_batches(decode_batches(body, content_type), settings.TELEMETRY_MAX_READINGS)
+    if not rows:
+        return IngestionResult(accepted=0, inserted=0, equipment=0)
+    check_equipment(db, rows)
+    inserted = write_readings(db, rows)
+    rollup_readings(db, inserted)
+
+    # Détection en continu : les interventions sont ouvertes dans la même transaction
+    anomalies = anomaly_detector.observe_batch(rows)
+    interventions = open_predictive_interventions(
+        db, anomalies, settings.ANOMALY_TECHNICIAN_ID or user_id, settings.ANOMALY_Z_THRESHOLD
+    )
+    db.commit()
+    return IngestionResult(
+        accepted=len(rows),
+        inserted=len(inserted),
+        equipment=len({row[0] for row in rows}),
+        anomalies=len(anomalies),
+        interventions=[intervention.id for intervention in interventions]
+    )
+
+@router.post("/readings", response_model=IngestionResult, status_code=status.HTTP_201_CREATED)
+async def ingest_readings(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Ingérer des lots de mesures (NDJSON ou MessagePack), un lot par équipement.
+
+    Chaque lot : {"equipment_id": 12, "readings": [{"metric": "temperature",
+    "value": 71.3, "recorded_at": "2025-01-01T08:00:00Z"}, ...]}. Les mesures
+    déjà reçues (même équipement, métrique et instant) sont ignorées.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and int(content_length) > settings.TELEMETRY_MAX_BODY_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Corps limité à {settings.TELEMETRY_MAX_BODY_BYTES} octets"
+        )
+    body = await request.body()
+    if len(body) > settings.TELEMETRY_MAX_BODY_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Corps limité à {settings.TELEMETRY_MAX_BODY_BYTES} octets"
+        )
+
+    # Décodage et écriture hors de la boucle asyncio
+    return await run_in_threadpool(_ingest, db, body, request.headers.get("content-type", ""), current_user.id)
+
+@router.get("/readings", response_model=List[SensorReadingResponse])
+def get_readings(
+    equipment_id: int = Query(...),
+    metric: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mesures brutes d'un équipement, les plus récentes en premier"""
+    criteria = [SensorReading.equipment_id == equipment_id]
+    if metric:
+        criteria.append(SensorReading.metric == metric)
+    if start:
+        criteria.append(SensorReading.recorded_at >= start)
+    if end:
+        criteria.append(SensorReading.recorded_at < end)
+
+    readings = db.execute(
+        select(SensorReading)
+        .where(*criteria)
+        .order_by(SensorReading.recorded_at.desc())
+        .limit(limit)
+    ).scalars().all()
+    return model_response(SensorReadingResponse, readings)
+
+@router.get("/series", response_model=SeriesResponse)
+def get_series(
+    equipment_id: int = Query(...),
+    metric: str = Query(...),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    max_points: int = Query(settings.TELEMETRY_MAX_POINTS, ge=1, le=10000),
+    resolution: Optional[Resolution] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Courbe d'une métrique (moyenne, min, max par intervalle).
+
+    Sans résolution imposée, le niveau le plus fin qui tient dans
+    max_points et que la rétention couvre est choisi : mesures brutes,
+    puis agrégats à la minute, à l'heure ou au jour. Dernières 24 h par défaut.
+    """
+    # Les mesures sont stockées en UTC sans fuseau
+    if end is not None and end.tzinfo is not None:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    if start is not None and start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    end = end or utc_now()
+    start = start or end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start doit précéder end"
+        )
+
+    if resolution is None:
+        resolution = Resolution(choose_resolution(db, equipment_id, metric, start, end, max_points))
+    points = query_series(db, equipment_id, metric, start, end, resolution.value, max_points)
+    return SeriesResponse(
+        equipment_id=equipment_id,
+        metric=metric,
+        resolution=resolution,
+        start=start,
+        end=end,
+        points=[
+            SeriesPoint(bucket=bucket, mean=mean, min=minimum, max=maximum, count=count)
+            for bucket, mean, minimum, maximum, count in points
+        ]
+    )
+
+@router.get("/detector", response_model=DetectorStats)
+def get_detector_stats(current_user: User = Depends(get_current_user)):
+    """État du détecteur d'anomalies de ce worker"""
+    return anomaly_detector.stats()
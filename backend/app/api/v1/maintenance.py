@@ -1,51 +1,125 @@
 # Routes API pour la maintenance
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from datetime import datetime, timedelta
 
 from app.core.database import get_db
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.changes import record_change
+from app.core.events import equipment_event
+from app.core.idempotency import idempotent
+from app.core.conditional import CollectionValidators, check_if_match, version_etag
+from app.core.fields import parse_fields, query_options
+from app.core.responses import model_response
 from app.models.maintenance import (
     MaintenancePlan, MaintenanceTask, ScheduledMaintenance, 
-    MaintenanceIntervention, InterventionTask
+    MaintenanceIntervention, InterventionTask, MaintenancePartUsed
 )
+from app.models.user import User
 from app.schemas.maintenance import (
     MaintenancePlanCreate, MaintenancePlanUpdate, MaintenancePlanResponse,
     ScheduledMaintenanceCreate, ScheduledMaintenanceUpdate, ScheduledMaintenanceResponse,
     MaintenanceInterventionCreate, MaintenanceInterventionUpdate, MaintenanceInterventionResponse,
-    CalendarEvent, MaintenanceStats
+    CalendarEvent, MaintenanceStats, WorkQueueResponse
 )
+from app.schemas.inventory import PartConsumption, MaintenancePartUsedResponse
+from app.schemas.sync import SyncPage
+from app.services.costs import rollup_costs
+from app.services.inventory import consume_part
+from app.services.sync import sync_page
+from app.services.work_queue import SCHEDULED_STATUSES, work_queue
+from app.api.auth import get_current_user
 
 router = APIRouter()
 
+def _record_intervention_change(db: Session, intervention: MaintenanceIntervention, event_type: str):
+    """Enregistrer un changement d'intervention (cache, flux d'événements, autres workers)"""
+    record_change(db, ("maintenance",), equipment_event(event_type, intervention.equipment, {
+        "id": intervention.id,
+        "equipment_id": intervention.equipment_id,
+        "technician_id": intervention.technician_id,
+        "status": intervention.status,
+        "priority": intervention.priority,
+        "actual_start_time": intervention.actual_start_time,
+        "actual_end_time": intervention.actual_end_time
+    }, technician_id=intervention.technician_id))
+
 # ===== PLANS DE MAINTENANCE =====
 
+def _plan_validators(db: Session, request: Request, criteria: list) -> CollectionValidators:
+    """Validateurs des plans filtrés, en tenant compte de leurs tâches"""
+    plan_ids = select(MaintenancePlan.id).where(*criteria)
+    return CollectionValidators.compute(
+        db, request,
+        (MaintenancePlan, criteria),
+        (MaintenanceTask, [MaintenanceTask.maintenance_plan_id.in_(plan_ids)]),
+        tags=("maintenance",)
+    )
+
 @router.get("/plans", response_model=List[MaintenancePlanResponse])
 def get_maintenance_plans(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     equipment_id: Optional[int] = None,
     is_active: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Liste de champs séparés par des virgules"),
     db: Session = Depends(get_db)
 ):
     """Récupérer la liste des plans de maintenance"""
-    query = db.query(MaintenancePlan)
-    
+    selected = parse_fields(fields, MaintenancePlanResponse)
+    criteria = []
     if equipment_id:
-        query = query.filter(MaintenancePlan.equipment_id == equipment_id)
+        criteria.append(MaintenancePlan.equipment_id == equipment_id)
     if is_active is not None:
-        query = query.filter(MaintenancePlan.is_active == is_active)
+        criteria.append(MaintenancePlan.is_active == is_active)
     
+    validators = _plan_validators(db, request, criteria)
+    if validators.is_not_modified(request):
+        return validators.not_modified()
+    
+    options = query_options(MaintenancePlan, selected) or [selectinload(MaintenancePlan.tasks)]
+    query = db.query(MaintenancePlan).options(*options).filter(*criteria)
     plans = query.offset(skip).limit(limit).all()
-    return plans
+    return validators.apply(model_response(MaintenancePlanResponse, plans, selected))
 
 @router.get("/plans/{plan_id}", response_model=MaintenancePlanResponse)
-def get_maintenance_plan(plan_id: int, db: Session = Depends(get_db)):
-    """Récupérer un plan de maintenance par ID"""
-    plan = db.query(MaintenancePlan).filter(MaintenancePlan.id == plan_id).first()
+def get_maintenance_plan(
+    plan_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Liste de champs séparés par des virgules"),
+    db: Session = Depends(get_db)
+):
+    """Récupérer un plan de maintenance par ID.
+
+    L'ETag est la version du plan (ses tâches ne changent pas après la
+    création) : il sert aussi bien à If-None-Match qu'à If-Match. Une
+    projection (fields) n'en a pas, comme pour les interventions : la
+    version désigne la représentation complète.
+    """
+    selected = parse_fields(fields, MaintenancePlanResponse)
+    criteria = [MaintenancePlan.id == plan_id]
+    validators = None
+    if not fields:
+        current = db.execute(
+            select(MaintenancePlan.version, MaintenancePlan.updated_at).where(*criteria)
+        ).first()
+        if current is None:
+            raise HTTPException(status_code=404, detail="Plan de maintenance non trouvé")
+        validators = CollectionValidators(version_etag(current.version), current.updated_at)
+        if validators.is_not_modified(request):
+            return validators.not_modified()
+    
+    plan = db.query(MaintenancePlan).options(
+        *query_options(MaintenancePlan, selected)
+    ).filter(*criteria).first()
     if not plan:
         raise HTTPException(status_code=404, detail="Plan de maintenance non trouvé")
-    return plan
+    response = model_response(MaintenancePlanResponse, plan, selected)
+    return validators.apply(response) if validators is not None else response
 
 @router.post("/plans", response_model=MaintenancePlanResponse)
 def create_maintenance_plan(plan: MaintenancePlanCreate, db: Session = Depends(get_db)):
@@ -62,8 +136,8 @@ def create_maintenance_plan(plan: MaintenancePlanCreate, db: Session = Depends(g
         is_active=plan.is_active
     )
     db.add(db_plan)
-    db.commit()
-    db.refresh(db_plan)
+    # Plan et tâches dans la même transaction : l'ETag (version) du plan couvre ses tâches
+    db.flush()
     
     # Créer les tâches associées
     for task_data in plan.tasks:
@@ -80,28 +154,32 @@ def create_maintenance_plan(plan: MaintenancePlanCreate, db: Session = Depends(g
         )
         db.add(db_task)
     
+    record_change(db, ("maintenance",))
     db.commit()
     db.refresh(db_plan)
     return db_plan
 
 @router.put("/plans/{plan_id}", response_model=MaintenancePlanResponse)
 def update_maintenance_plan(
+    request: Request,
     plan_id: int, 
     plan_update: MaintenancePlanUpdate, 
     db: Session = Depends(get_db)
 ):
-    """Mettre à jour un plan de maintenance"""
+    """Mettre à jour un plan de maintenance (If-Match : 412 si modifié entre-temps)"""
     db_plan = db.query(MaintenancePlan).filter(MaintenancePlan.id == plan_id).first()
     if not db_plan:
         raise HTTPException(status_code=404, detail="Plan de maintenance non trouvé")
+    check_if_match(request, db_plan.version)
     
     update_data = plan_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_plan, field, value)
     
+    record_change(db, ("maintenance",), _plan_event("plan.updated", db, db_plan))
     db.commit()
     db.refresh(db_plan)
-    return db_plan
+    return model_response(MaintenancePlanResponse, db_plan, headers={"ETag": version_etag(db_plan.version)})
 
 @router.delete("/plans/{plan_id}")
 def delete_maintenance_plan(plan_id: int, db: Session = Depends(get_db)):
@@ -110,10 +188,25 @@ def delete_maintenance_plan(plan_id: int, db: Session = Depends(get_db)):
     if not db_plan:
         raise HTTPException(status_code=404, detail="Plan de maintenance non trouvé")
     
+    record_change(db, ("maintenance",), _plan_event("plan.deleted", db, db_plan))
     db.delete(db_plan)
     db.commit()
     return {"message": "Plan de maintenance supprimé"}
 
+def _plan_event(event_type: str, db: Session, db_plan: MaintenancePlan):
+    """Événement de plan avec ses maintenances planifiées non commencées (file de travail)"""
+    scheduled_ids = [
+        scheduled_id for (scheduled_id,) in db.query(ScheduledMaintenance.id).filter(
+            ScheduledMaintenance.maintenance_plan_id == db_plan.id,
+            ScheduledMaintenance.status.in_(SCHEDULED_STATUSES)
+        )
+    ]
+    return equipment_event(event_type, db_plan.equipment, {
+        "id": db_plan.id,
+        "equipment_id": db_plan.equipment_id,
+        "scheduled_ids": scheduled_ids
+    })
+
 # ===== MAINTENANCES PLANIFIÉES =====
 
 @router.get("/scheduled", response_model=List[ScheduledMaintenanceResponse])
@@ -142,7 +235,7 @@ def get_scheduled_maintenances(
         query = query.filter(ScheduledMaintenance.scheduled_date <= date_to)
     
     maintenances = query.offset(skip).limit(limit).all()
-    return maintenances
+    return model_response(ScheduledMaintenanceResponse, maintenances)
 
 @router.get("/scheduled/{maintenance_id}", response_model=ScheduledMaintenanceResponse)
 def get_scheduled_maintenance(maintenance_id: int, db: Session = Depends(get_db)):
@@ -152,7 +245,7 @@ def get_scheduled_maintenance(maintenance_id: int, db: Session = Depends(get_db)
     ).first()
     if not maintenance:
         raise HTTPException(status_code=404, detail="Maintenance planifiée non trouvée")
-    return maintenance
+    return model_response(ScheduledMaintenanceResponse, maintenance)
 
 @router.post("/scheduled", response_model=ScheduledMaintenanceResponse)
 def create_scheduled_maintenance(
@@ -162,10 +255,68 @@ def create_scheduled_maintenance(
     """Créer une nouvelle maintenance planifiée"""
     db_maintenance = ScheduledMaintenance(**maintenance.dict())
     db.add(db_maintenance)
+    db.flush()
+    record_change(db, ("maintenance",), equipment_event("scheduled.created", db_maintenance.equipment, {
+        "id": db_maintenance.id,
+        "equipment_id": db_maintenance.equipment_id,
+        "scheduled_date": db_maintenance.scheduled_date,
+        "assigned_technician_id": db_maintenance.assigned_technician_id,
+        "priority": db_maintenance.priority
+    }, technician_id=db_maintenance.assigned_technician_id))
     db.commit()
     db.refresh(db_maintenance)
     return db_maintenance
 
+# ===== FILE DE TRAVAIL =====
+
+@router.get("/queue", response_model=WorkQueueResponse)
+def get_work_queue(
+    technician_id: Optional[int] = None,
+    unassigned: bool = False,
+    limit: int = Query(20, ge=1, le=settings.WORK_QUEUE_TOP_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """File de travail classée par risque : interventions en attente ou
+    assignées et maintenances planifiées, par priorité, criticité de
+    l'équipement, impact sur la ligne et retard. Un technicien voit sa
+    propre file ; admin et superviseur choisissent le technicien ou les
+    maintenances non assignées.
+    """
+    if current_user.role not in ["admin", "supervisor"]:
+        technician_id = current_user.id
+    elif unassigned:
+        technician_id = None
+    elif technician_id is None:
+        technician_id = current_user.id
+
+    total, items = work_queue.top(db, technician_id, limit)
+    return model_response(WorkQueueResponse, {
+        "technician_id": technician_id,
+        "total": total,
+        "items": items
+    })
+
+# ===== SYNCHRONISATION HORS LIGNE =====
+
+@router.get("/sync", response_model=SyncPage)
+def sync_technician_data(
+    token: Optional[str] = None,
+    technician_id: Optional[int] = None,
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Changements depuis un jeton de synchronisation, pour une tablette
+    hors ligne : maintenances planifiées assignées, interventions et leurs
+    tâches, équipements concernés, et identifiants supprimés ou sortis du
+    périmètre. Sans jeton : tout le périmètre. Suivre next_token tant que
+    has_more est vrai, puis le conserver pour la prochaine synchronisation.
+    """
+    if current_user.role not in ["admin", "supervisor"] or technician_id is None:
+        technician_id = current_user.id
+    return model_response(SyncPage, sync_page(db, technician_id, token, limit))
+
 # ===== INTERVENTIONS =====
 
 @router.get("/interventions", response_model=List[MaintenanceInterventionResponse])
@@ -175,10 +326,13 @@ def get_interventions(
     equipment_id: Optional[int] = None,
     technician_id: Optional[int] = None,
     status: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Liste de champs séparés par des virgules"),
     db: Session = Depends(get_db)
 ):
     """Récupérer la liste des interventions"""
-    query = db.query(MaintenanceIntervention)
+    selected = parse_fields(fields, MaintenanceInterventionResponse)
+    options = query_options(MaintenanceIntervention, selected) or [selectinload(MaintenanceIntervention.tasks)]
+    query = db.query(MaintenanceIntervention).options(*options)
     
     if equipment_id:
         query = query.filter(MaintenanceIntervention.equipment_id == equipment_id)
@@ -188,72 +342,141 @@ def get_interventions(
         query = query.filter(MaintenanceIntervention.status == status)
     
     interventions = query.offset(skip).limit(limit).all()
-    return interventions
+    return model_response(MaintenanceInterventionResponse, interventions, selected)
 
 @router.get("/interventions/{intervention_id}", response_model=MaintenanceInterventionResponse)
-def get_intervention(intervention_id: int, db: Session = Depends(get_db)):
+def get_intervention(
+    intervention_id: int,
+    fields: Optional[str] = Query(None, description="Liste de champs séparés par des virgules"),
+    db: Session = Depends(get_db)
+):
     """Récupérer une intervention par ID"""
-    intervention = db.query(MaintenanceIntervention).filter(
+    selected = parse_fields(fields, MaintenanceInterventionResponse)
+    intervention = db.query(MaintenanceIntervention).options(
+        *query_options(MaintenanceIntervention, selected)
+    ).filter(
         MaintenanceIntervention.id == intervention_id
     ).first()
     if not intervention:
         raise HTTPException(status_code=404, detail="Intervention non trouvée")
-    return intervention
+    headers = {"ETag": version_etag(intervention.version)} if selected is None else None
+    return model_response(MaintenanceInterventionResponse, intervention, selected, headers=headers)
 
 @router.post("/interventions", response_model=MaintenanceInterventionResponse)
 def create_intervention(
+    request: Request,
     intervention: MaintenanceInterventionCreate, 
     db: Session = Depends(get_db)
 ):
-    """Créer une nouvelle intervention"""
-    db_intervention = MaintenanceIntervention(**intervention.dict())
-    db.add(db_intervention)
-    db.commit()
-    db.refresh(db_intervention)
-    return db_intervention
+    """Créer une nouvelle intervention (en-tête Idempotency-Key accepté)"""
+    def create():
+        db_intervention = MaintenanceIntervention(**intervention.dict())
+        db.add(db_intervention)
+        db.flush()
+        _record_intervention_change(db, db_intervention, "intervention.created")
+        # Validé par idempotent(), avec la réponse conservée le cas échéant
+        db.flush()
+        db.refresh(db_intervention)
+        return model_response(MaintenanceInterventionResponse, db_intervention)
 
-@router.post("/interventions/{intervention_id}/start")
-def start_intervention(intervention_id: int, db: Session = Depends(get_db)):
-    """Démarrer une intervention"""
-    intervention = db.query(MaintenanceIntervention).filter(
-        MaintenanceIntervention.id == intervention_id
-    ).first()
-    if not intervention:
-        raise HTTPException(status_code=404, detail="Intervention non trouvée")
-    
-    intervention.status = "in_progress"
-    intervention.actual_start_time = datetime.now()
-    db.commit()
-    db.refresh(intervention)
-    return intervention
+    return idempotent(db, request, create, intervention.model_dump(mode="json"))
+
+@router.post("/interventions/{intervention_id}/start", response_model=MaintenanceInterventionResponse)
+def start_intervention(request: Request, intervention_id: int, db: Session = Depends(get_db)):
+    """Démarrer une intervention (Idempotency-Key accepté ; If-Match : 412 si modifiée entre-temps)"""
+    def start():
+        intervention = db.query(MaintenanceIntervention).filter(
+            MaintenanceIntervention.id == intervention_id
+        ).first()
+        if not intervention:
+            raise HTTPException(status_code=404, detail="Intervention non trouvée")
+        check_if_match(request, intervention.version)
+        
+        intervention.status = "in_progress"
+        intervention.actual_start_time = datetime.now()
+        _record_intervention_change(db, intervention, "intervention.status")
+        # Validé par idempotent(), avec la réponse conservée le cas échéant
+        db.flush()
+        db.refresh(intervention)
+        return model_response(
+            MaintenanceInterventionResponse, intervention, headers={"ETag": version_etag(intervention.version)}
+        )
+
+    return idempotent(db, request, start)
 
-@router.post("/interventions/{intervention_id}/complete")
+@router.post("/interventions/{intervention_id}/complete", response_model=MaintenanceInterventionResponse)
 def complete_intervention(
+    request: Request,
     intervention_id: int, 
     completion_data: dict,
     db: Session = Depends(get_db)
 ):
-    """Terminer une intervention"""
-    intervention = db.query(MaintenanceIntervention).filter(
+    """Terminer une intervention (Idempotency-Key accepté ; If-Match : 412 si modifiée entre-temps)"""
+    def complete():
+        intervention = db.query(MaintenanceIntervention).filter(
+            MaintenanceIntervention.id == intervention_id
+        ).first()
+        if not intervention:
+            raise HTTPException(status_code=404, detail="Intervention non trouvée")
+        check_if_match(request, intervention.version)
+        
+        intervention.status = "completed"
+        intervention.actual_end_time = datetime.now()
+        intervention.work_performed = completion_data.get("work_performed")
+        intervention.issues_found = completion_data.get("issues_found")
+        intervention.recommendations = completion_data.get("recommendations")
+        db.flush()
+        rollup_costs(db, [MaintenanceIntervention.id == intervention_id], settings.DEFAULT_LABOR_RATE)
+        
+        _record_intervention_change(db, intervention, "intervention.status")
+        # Validé par idempotent(), avec la réponse conservée le cas échéant
+        db.flush()
+        db.refresh(intervention)
+        return model_response(
+            MaintenanceInterventionResponse, intervention, headers={"ETag": version_etag(intervention.version)}
+        )
+
+    return idempotent(db, request, complete, completion_data)
+
+@router.get("/interventions/{intervention_id}/parts", response_model=List[MaintenancePartUsedResponse])
+def get_intervention_parts(intervention_id: int, db: Session = Depends(get_db)):
+    """Pièces utilisées lors d'une intervention"""
+    parts_used = db.query(MaintenancePartUsed).filter(
+        MaintenancePartUsed.intervention_id == intervention_id
+    ).order_by(MaintenancePartUsed.id).all()
+    return model_response(MaintenancePartUsedResponse, parts_used)
+
+@router.post("/interventions/{intervention_id}/parts", response_model=MaintenancePartUsedResponse, status_code=201)
+def consume_intervention_part(
+    intervention_id: int,
+    consumption: PartConsumption,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Sortir des pièces du stock pour une intervention (409 si le stock est insuffisant)"""
+    intervention_status = db.query(MaintenanceIntervention.status).filter(
         MaintenanceIntervention.id == intervention_id
-    ).first()
-    if not intervention:
+    ).scalar()
+    if intervention_status is None:
         raise HTTPException(status_code=404, detail="Intervention non trouvée")
-    
-    intervention.status = "completed"
-    intervention.actual_end_time = datetime.now()
-    intervention.work_performed = completion_data.get("work_performed")
-    intervention.issues_found = completion_data.get("issues_found")
-    intervention.recommendations = completion_data.get("recommendations")
-    
+
+    part_used = consume_part(
+        db, intervention_id, consumption.part_id, consumption.quantity, user_id=current_user.id
+    )
+    if intervention_status in ("completed", "validated"):
+        # Pièce ajoutée après coup : les coûts déjà calculés sont mis à jour
+        db.flush()
+        rollup_costs(db, [MaintenanceIntervention.id == intervention_id], settings.DEFAULT_LABOR_RATE)
+    record_change(db, ("parts", "maintenance"))
     db.commit()
-    db.refresh(intervention)
-    return intervention
+    db.refresh(part_used)
+    return part_used
 
 # ===== CALENDRIER =====
 
 @router.get("/calendar", response_model=List[CalendarEvent])
 def get_calendar_events(
+    request: Request,
     start_date: str = Query(...),
     end_date: str = Query(...),
     equipment_id: Optional[int] = None,
@@ -261,6 +484,22 @@ def get_calendar_events(
     db: Session = Depends(get_db)
 ):
     """Récupérer les événements du calendrier"""
+    def compute():
+        events = compute_calendar_events(db, start_date, end_date, equipment_id, technician_id)
+        return model_response(CalendarEvent, events)
+    
+    return response_cache.response(
+        "maintenance:calendar", request, ("maintenance", "equipment"), settings.CACHE_TTL_CALENDAR, compute
+    )
+
+def compute_calendar_events(
+    db: Session,
+    start_date: str,
+    end_date: str,
+    equipment_id: Optional[int] = None,
+    technician_id: Optional[int] = None
+) -> List[CalendarEvent]:
+    """Construire les événements du calendrier"""
     start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
     end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
     
@@ -310,38 +549,55 @@ def get_calendar_events(
 
 @router.get("/stats", response_model=MaintenanceStats)
 def get_maintenance_stats(
+    request: Request,
     equipment_id: Optional[int] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
     db: Session = Depends(get_db)
 ):
     """Récupérer les statistiques de maintenance"""
-    # Statistiques basiques (à implémenter selon les besoins)
-    total_scheduled = db.query(ScheduledMaintenance).count()
-    
-    # Maintenances terminées ce mois
-    current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    completed_this_month = db.query(MaintenanceIntervention).filter(
-        MaintenanceIntervention.status == "completed",
-        MaintenanceIntervention.actual_end_time >= current_month_start
-    ).count()
+    def compute():
+        return model_response(MaintenanceStats, compute_maintenance_stats(db))
     
-    # Maintenances en retard
-    overdue = db.query(ScheduledMaintenance).filter(
-        ScheduledMaintenance.scheduled_date < datetime.now(),
-        ScheduledMaintenance.status == "scheduled"
-    ).count()
+    return response_cache.response("maintenance:stats", request, ("maintenance",), settings.CACHE_TTL_STATS, compute)
+
+def maintenance_counters() -> dict:
+    """Compteurs des statistiques de maintenance, en sous-requêtes scalaires nommées"""
+    now = datetime.now()
+    current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     
-    # Maintenances en cours
-    in_progress = db.query(MaintenanceIntervention).filter(
-        MaintenanceIntervention.status == "in_progress"
-    ).count()
+    def count(model, *criteria):
+        return select(func.count(model.id)).where(*criteria).scalar_subquery()
     
+    return {
+        # Statistiques basiques (à implémenter selon les besoins)
+        "total_scheduled": count(ScheduledMaintenance),
+        # Maintenances terminées ce mois
+        "completed_this_month": count(
+            MaintenanceIntervention,
+            MaintenanceIntervention.status == "completed",
+            MaintenanceIntervention.actual_end_time >= current_month_start
+        ),
+        # Maintenances en retard
+        "overdue": count(
+            ScheduledMaintenance,
+            ScheduledMaintenance.scheduled_date < now,
+            ScheduledMaintenance.status == "scheduled"
+        ),
+        # Maintenances en cours
+        "in_progress": count(MaintenanceIntervention, MaintenanceIntervention.status == "in_progress")
+    }
+
+def compute_maintenance_stats(db: Session) -> MaintenanceStats:
+    """Calculer les statistiques de maintenance en un seul aller-retour"""
+    counters = maintenance_counters()
+    row = db.execute(select(*counters.values())).one()
+    return build_maintenance_stats(dict(zip(counters, row)))
+
+def build_maintenance_stats(counts: dict) -> MaintenanceStats:
+    """Statistiques de maintenance à partir des compteurs de maintenance_counters()"""
     return MaintenanceStats(
-        total_scheduled=total_scheduled,
-        completed_this_month=completed_this_month,
-        overdue=overdue,
-        in_progress=in_progress,
+        **counts,
         by_type={"preventive": 0, "corrective": 0, "predictive": 0, "emergency": 0},
         by_priority={"low": 0, "medium": 0, "high": 0, "critical": 0},
         average_completion_time=0.0,
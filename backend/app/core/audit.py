@@ -0,0 +1,217 @@
+# Journal d'audit des écritures (diff avant/après, une insertion par transaction)
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Optional
+
+from sqlalchemy import event as sa_event, inspect, insert
+from sqlalchemy.orm import ORMExecuteState, Session
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .database import SessionLocal
+from .security import verify_token
+from ..models.audit import AuditLog
+
+# Tables qui sont déjà des journaux, ou sans intérêt pour l'audit
+EXCLUDED_TABLES = {
+    "audit_log",
+    "change_counters",
+    "equipment_status_history",
+    "idempotency_keys",
+    "stock_movements",
+    "sync_tombstones",
+    "sensor_readings",
+    "simulation_jobs",
+    "sensor_rollups_1m",
+    "sensor_rollups_1h",
+    "sensor_rollups_1d",
+}
+REDACTED_COLUMNS = {"password_hash"}
+IGNORED_COLUMNS = {"created_at", "updated_at", "version"}
+
+# Auteur et origine de l'écriture, posés par AuditContextMiddleware
+current_actor: ContextVar[Optional[str]] = ContextVar("audit_actor", default=None)
+current_source: ContextVar[Optional[str]] = ContextVar("audit_source", default=None)
+
+def _jsonable(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def _columns(state):
+    """Colonnes auditées d'un objet : (nom d'attribut, nom de colonne)"""
+    for attribute in state.mapper.column_attrs:
+        name = attribute.columns[0].name
+        if name not in IGNORED_COLUMNS:
+            yield attribute.key, name
+
+def _value(name: str, value):
+    return "***" if name in REDACTED_COLUMNS and value is not None else _jsonable(value)
+
+def _snapshot(state) -> dict:
+    """Valeurs déjà chargées, sans requête supplémentaire pendant le flush"""
+    loaded = state.dict
+    return {
+        name: _value(name, loaded[key])
+        for key, name in _columns(state)
+        if key in loaded and loaded[key] is not None
+    }
+
+def _diff(state) -> dict:
+    changes = {}
+    for key, name in _columns(state):
+        history = state.attrs[key].history
+        if not history.added:
+            continue
+        before = history.deleted[0] if history.deleted else None
+        after = history.added[0]
+        if before != after:
+            changes[name] = [_value(name, before), _value(name, after)]
+    return changes
+
+def _record(entity: str, entity_id, action: str, changes: dict, now: datetime) -> dict:
+    return {
+        "occurred_at": now,
+        "actor": current_actor.get(),
+        "source": current_source.get(),
+        "action": action,
+        "entity": entity,
+        "entity_id": entity_id,
+        "changes": changes,
+    }
+
+def _entry(state, action: str, changes: dict, now: datetime) -> dict:
+    # Clé primaire lue dans l'état : l'identité d'un objet créé n'est posée qu'après le flush
+    primary_key = state.mapper.primary_key
+    entity_id = None
+    if len(primary_key) == 1:
+        entity_id = state.dict.get(state.mapper.get_property_by_column(primary_key[0]).key)
+    return _record(state.mapper.local_table.name, entity_id, action, changes, now)
+
+@sa_event.listens_for(SessionLocal, "after_flush")
+def _collect_audit_entries(session: Session, flush_context) -> None:
+    """Relever les diffs du flush (l'état d'avant est encore disponible ici).
+
+    Les entrées sont gardées dans la session jusqu'au commit : aucune
+    écriture supplémentaire par flush.
+    """
+    now = datetime.now()
+    entries = session.info.setdefault("audit_entries", [])
+    for action, objects in (("create", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            state = inspect(obj)
+            if state.mapper.local_table.name in EXCLUDED_TABLES:
+                continue
+            if action == "update":
+                changes = _diff(state)
+                if not changes:
+                    continue
+            else:
+                changes = _snapshot(state)
+            entries.append(_entry(state, action, changes, now))
+
+def _set_columns(statement, parameters) -> set:
+    """Colonnes modifiées par un UPDATE : clauses values(), sinon paramètres d'exécution"""
+    return {getattr(key, "name", key) for key in (statement._values or parameters or {})}
+
+@sa_event.listens_for(SessionLocal, "do_orm_execute")
+def _collect_bulk_audit_entries(state: ORMExecuteState):
+    """UPDATE, DELETE et INSERT ensemblistes : exécutés hors du flush, donc hors d'after_flush.
+
+    L'instruction est exécutée avec RETURNING de ses colonnes auditées ;
+    les entrées rejoignent celles du flush (même insertion au commit). Les
+    exécutions multiples (executemany) n'ont pas de RETURNING : à éviter
+    sur les tables auditées.
+    """
+    if not (state.is_update or state.is_delete or state.is_insert) or isinstance(state.parameters, list):
+        return None
+    statement = state.statement
+    table = statement.table
+    if table.name in EXCLUDED_TABLES:
+        return None
+
+    session = state.session
+    if session.autoflush:
+        session.flush()
+    columns = [column for column in table.columns if column.name not in IGNORED_COLUMNS]
+    primary_key = list(table.primary_key.columns)
+    result = session.connection().execute(
+        statement.returning(*(column.label(f"audit_{column.name}") for column in columns)),
+        state.parameters or {}
+    )
+    frozen = result.freeze()
+
+    now = datetime.now()
+    action = "create" if state.is_insert else "update" if state.is_update else "delete"
+    changed = _set_columns(statement, state.parameters) if action == "update" else None
+    entries = session.info.setdefault("audit_entries", [])
+    mapper = state.bind_mapper
+    for row in frozen().all():
+        values = dict(zip((column.name for column in columns), row[len(row) - len(columns):]))
+        entity_id = values.get(primary_key[0].name) if len(primary_key) == 1 else None
+        if action == "update":
+            changes = {name: [None, _value(name, values[name])] for name in changed if name in values}
+            if not changes:
+                continue
+        else:
+            changes = {name: _value(name, value) for name, value in values.items() if value is not None}
+        entries.append(_record(table.name, entity_id, action, changes, now))
+        # Objets déjà chargés : relus au prochain accès, comme synchronize_session="fetch"
+        if mapper is not None and entity_id is not None:
+            obj = session.identity_map.get(mapper.identity_key_from_primary_key([entity_id]))
+            if obj is not None:
+                session.expire(obj)
+
+    # Sans RETURNING demandé par l'appelant, seul rowcount compte
+    if len(result.keys()) == len(columns):
+        return result
+    return frozen().columns(*range(len(result.keys()) - len(columns)))
+
+@sa_event.listens_for(SessionLocal, "before_commit")
+def _write_audit_entries(session: Session) -> None:
+    # Le commit flushe après before_commit : les derniers changements sont flushés ici
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    entries = session.info.pop("audit_entries", None)
+    batch_size = settings.AUDIT_BATCH_SIZE
+    for offset in range(0, len(entries or ()), batch_size):
+        session.execute(insert(AuditLog.__table__).values(entries[offset:offset + batch_size]))
+
+@sa_event.listens_for(SessionLocal, "after_rollback")
+def _discard_audit_entries(session: Session) -> None:
+    session.info.pop("audit_entries", None)
+
+class AuditContextMiddleware:
+    """Middleware ASGI : auteur (sujet du jeton) et origine des requêtes d'écriture.
+
+    Le jeton est seulement décodé, sans requête en base : l'authentification
+    reste le rôle des dépendances des routes.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        actor = None
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            payload = verify_token(token)
+            actor = payload.get("sub") if payload else None
+        actor_token = current_actor.set(actor)
+        source_token = current_source.set(f"{scope['method']} {scope['path']}"[:200])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_actor.reset(actor_token)
+            current_source.reset(source_token)
@@ -0,0 +1,208 @@
+# Cache des réponses en lecture (Redis si configuré, LRU local sinon)
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from fastapi import Request, Response
+
+from .config import settings
+from .coalescing import SingleFlight, request_flight
+
+try:
+    import redis
+except ImportError:  # redis est optionnel, le cache local est alors utilisé
+    redis = None
+
+class LocalCacheBackend:
+    """Cache LRU en mémoire du processus, avec expiration par entrée"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Les versions d'étiquettes ne sont jamais évincées par le LRU
+        self._counters = {}
+        self._guard = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        values = []
+        with self._guard:
+            for key in keys:
+                if key in self._counters:
+                    values.append(str(self._counters[key]).encode())
+                    continue
+                entry = self._entries.get(key)
+                if entry is None or (entry[1] is not None and entry[1] <= now):
+                    values.append(None)
+                    continue
+                self._entries.move_to_end(key)
+                values.append(entry[0])
+        return values
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key])[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._guard:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key: str) -> int:
+        with self._guard:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    @contextmanager
+    def lock(self, key: str, timeout: float) -> Iterator[bool]:
+        """Aucun verrou nécessaire : le regroupement single-flight suffit dans un seul processus"""
+        yield True
+
+class RedisCacheBackend:
+    """Cache partagé entre workers, reposant sur un client Redis (ou un substitut compatible).
+
+    Les entrées ont un TTL et les versions d'étiquettes n'en ont pas : avec la
+    politique d'éviction volatile-lru, seules les entrées sont évincées.
+    """
+
+    def __init__(self, client, poll_interval: float = 0.05):
+        self.client = client
+        self.poll_interval = poll_interval
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.client.mget(keys)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+    @contextmanager
+    def lock(self, key: str, timeout: float) -> Iterator[bool]:
+        """Verrou distribué (SET NX PX) : un seul worker recalcule une entrée expirée"""
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex.encode()
+        deadline = time.monotonic() + timeout
+        acquired = bool(self.client.set(lock_key, token, nx=True, px=int(timeout * 1000)))
+        while not acquired and time.monotonic() < deadline:
+            # L'entrée a pu être remplie par le détenteur du verrou
+            if self.client.get(key) is not None:
+                break
+            time.sleep(self.poll_interval)
+            acquired = bool(self.client.set(lock_key, token, nx=True, px=int(timeout * 1000)))
+        try:
+            yield acquired
+        finally:
+            # Ne libérer que notre propre verrou (il a pu expirer et être repris)
+            if acquired and self.client.get(lock_key) == token:
+                self.client.delete(lock_key)
+
+class ResponseCache:
+    """Cache de corps de réponses JSON avec invalidation par étiquettes.
+
+    Chaque clé intègre la version courante de ses étiquettes : invalider une
+    étiquette revient à incrémenter sa version, les anciennes entrées
+    devenant inaccessibles jusqu'à leur éviction.
+    """
+
+    def __init__(
+        self,
+        backend,
+        namespace: str = "mp",
+        lock_timeout: float = 10.0,
+        flight: Optional[SingleFlight] = None
+    ):
+        self.backend = backend
+        self.namespace = namespace
+        self.lock_timeout = lock_timeout
+        self.flight = flight or SingleFlight()
+
+    @property
+    def shared(self) -> bool:
+        """Vrai si le backend est partagé entre workers (les invalidations le sont aussi)"""
+        return isinstance(self.backend, RedisCacheBackend)
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+
+    def tag_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Versions courantes des étiquettes (incrémentées à chaque invalidation)"""
+        tags = sorted(tags)
+        versions = self.backend.get_many([self._tag_key(tag) for tag in tags])
+        return {tag: int(version or 0) for tag, version in zip(tags, versions)}
+
+    def build_key(self, name: str, params: str, tags: Iterable[str], versions: Optional[Dict[str, int]] = None) -> str:
+        versions = versions if versions is not None else self.tag_versions(tags)
+        fingerprint = hashlib.sha1(params.encode())
+        for tag in sorted(tags):
+            fingerprint.update(f"|{tag}={versions[tag]}".encode())
+        return f"{self.namespace}:resp:{name}:{fingerprint.hexdigest()}"
+
+    def get_or_set(self, key: str, ttl: int, compute: Callable[[], bytes], label: str = "default") -> bytes:
+        """Lire une entrée ou la calculer une seule fois malgré les requêtes concurrentes.
+
+        Dans un worker, les requêtes simultanées partagent le calcul en cours
+        (single-flight) ; entre workers, le verrou du backend évite que chacun
+        recalcule la même entrée.
+        """
+        value = self.backend.get(key)
+        if value is not None:
+            return value
+        return self.flight.do(key, lambda: self._fill(key, ttl, compute), label)
+
+    def _fill(self, key: str, ttl: int, compute: Callable[[], bytes]) -> bytes:
+        with self.backend.lock(key, self.lock_timeout):
+            # Un autre worker a pu remplir l'entrée pendant l'attente du verrou
+            value = self.backend.get(key)
+            if value is not None:
+                return value
+            value = compute()
+            self.backend.set(key, value, ttl)
+            return value
+
+    def response(
+        self,
+        name: str,
+        request: Request,
+        tags: Iterable[str],
+        ttl: int,
+        compute: Callable[[], Response],
+        scope: str = "",
+        versions: Optional[Dict[str, int]] = None
+    ) -> Response:
+        """Servir une réponse JSON depuis le cache.
+
+        La clé dépend de la route, des paramètres de requête normalisés et de
+        la portée d'autorisation (scope) de l'appelant. versions : versions
+        d'étiquettes déjà lues (celles de l'ETag), pour que corps et
+        validateurs viennent du même instantané.
+        """
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        key = self.build_key(name, f"{request.url.path}|{scope}?{params}", tags, versions)
+        body = self.get_or_set(key, ttl, lambda: compute().body, label=name)
+        return Response(content=body, media_type="application/json")
+
+    def invalidate(self, *tags: str) -> None:
+        """Invalider toutes les entrées portant l'une des étiquettes"""
+        for tag in tags:
+            self.backend.incr(self._tag_key(tag))
+
+def build_cache() -> ResponseCache:
+    """Construire le cache selon la configuration (Redis si REDIS_URL est défini)"""
+    if settings.REDIS_URL and redis is not None:
+        backend = RedisCacheBackend(redis.Redis.from_url(settings.REDIS_URL))
+    else:
+        backend = LocalCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    return ResponseCache(backend, flight=request_flight)
+
+response_cache = build_cache()
@@ -0,0 +1,210 @@
+# Notification des changements entre workers (PostgreSQL LISTEN/NOTIFY)
+import json
+import logging
+import select
+import threading
+import uuid
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import event as sa_event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .cache import response_cache
+from .database import SessionLocal, engine
+from .events import Event, event_bus
+from ..models.change import ChangeCounter
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "maintenance_changes"
+WORKER_ID = uuid.uuid4().hex[:12]
+
+# Étiquettes connues : toutes invalidées lors d'une resynchronisation
+KNOWN_TAGS = {"sites", "production_lines", "equipment", "maintenance", "parts"}
+
+# Taille maximale d'une charge utile NOTIFY (limite PostgreSQL : 8000 octets)
+MAX_PAYLOAD_SIZE = 7900
+
+# Traitements locaux déclenchés par chaque changement (ce worker ou un autre)
+_change_hooks: List[Callable[[tuple, Optional[Event]], None]] = []
+
+def on_change(hook: Callable[[tuple, Optional[Event]], None]) -> Callable:
+    """Enregistrer un traitement appelé avec (étiquettes, événement) à chaque changement appliqué"""
+    _change_hooks.append(hook)
+    return hook
+
+def _encode(tags: Iterable[str], change_event: Optional[Event]) -> str:
+    """Charge utile compacte : worker d'origine, étiquettes et événement éventuel"""
+    payload = {"w": WORKER_ID, "t": sorted(tags)}
+    if change_event is not None:
+        payload["e"] = [
+            change_event.type,
+            change_event.data,
+            change_event.site_id,
+            change_event.production_line_id,
+            change_event.technician_id,
+        ]
+    encoded = json.dumps(payload, default=_json_default, separators=(",", ":"))
+    if len(encoded.encode()) > MAX_PAYLOAD_SIZE:
+        # Événement trop volumineux : les autres workers resynchronisent leurs clients
+        payload["e"] = ["resync", {}, None, None, None]
+        encoded = json.dumps(payload, separators=(",", ":"))
+    return encoded
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+def record_change(db: Session, tags: Iterable[str], change_event: Optional[Event] = None) -> None:
+    """Enregistrer un changement dans la transaction en cours.
+
+    Le NOTIFY est émis dans la même transaction : il n'est délivré aux
+    autres workers qu'au commit, et jamais en cas de rollback. Localement,
+    l'invalidation du cache et la diffusion de l'événement ont lieu après
+    le commit (voir _apply_pending_changes). Sans cache partagé ou sans
+    LISTEN/NOTIFY, les compteurs en base des étiquettes sont incrémentés
+    dans la transaction.
+    """
+    tags = tuple(tags)
+    db.info.setdefault("pending_changes", []).append((tags, change_event))
+    if not response_cache.shared or not change_listener.enabled:
+        _bump_counters(db, tags)
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": _encode(tags, change_event)}
+        )
+
+def _bump_counters(db: Session, tags: Iterable[str]) -> None:
+    """Incrémenter les compteurs des étiquettes (une seule instruction, ordre stable contre les interblocages)"""
+    if db.get_bind().dialect.name == "postgresql":
+        statement = postgresql.insert(ChangeCounter.__table__)
+    else:
+        statement = sqlite.insert(ChangeCounter.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ChangeCounter.tag],
+        set_={"version": ChangeCounter.version + 1}
+    )
+    db.execute(statement, [{"tag": tag, "version": 1} for tag in sorted(set(tags))])
+
+def _apply(tags: Iterable[str], change_event: Optional[Event], invalidate: bool = True) -> None:
+    tags = tuple(tags)
+    if invalidate:
+        response_cache.invalidate(*tags)
+    for hook in _change_hooks:
+        try:
+            hook(tags, change_event)
+        except Exception:
+            logger.exception("Échec du traitement de changement %s", getattr(hook, "__name__", hook))
+    if change_event is not None:
+        if change_event.type == "resync":
+            event_bus.broadcast(change_event)
+        else:
+            event_bus.publish(change_event)
+
+@sa_event.listens_for(SessionLocal, "after_commit")
+def _apply_pending_changes(session: Session) -> None:
+    for tags, change_event in session.info.pop("pending_changes", []):
+        _apply(tags, change_event)
+
+@sa_event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending_changes(session: Session) -> None:
+    session.info.pop("pending_changes", None)
+
+class ChangeListener:
+    """Écoute unique par worker du canal NOTIFY, avec reconnexion automatique.
+
+    Après une perte de connexion, des notifications ont pu être manquées :
+    toutes les étiquettes du cache local sont invalidées et les clients
+    SSE reçoivent un événement resync.
+    """
+
+    def __init__(self, poll_timeout: float = 5.0, max_backoff: float = 30.0):
+        self.poll_timeout = poll_timeout
+        self.max_backoff = max_backoff
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return engine.dialect.name == "postgresql"
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_timeout + 1)
+            self._thread = None
+
+    def _connect(self):
+        # Connexion dédiée hors pool : elle reste en LISTEN pendant toute la vie du worker
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        connection = engine.dialect.connect(*cargs, **cparams)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return connection
+
+    def _run(self) -> None:
+        backoff = 1.0
+        connected_once = False
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                if connected_once:
+                    self.resync()
+                connected_once = True
+                backoff = 1.0
+                self._listen(connection)
+            except Exception:
+                logger.exception("Connexion LISTEN perdue, nouvelle tentative dans %.0f s", backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _listen(self, connection) -> None:
+        while not self._stop.is_set():
+            ready, _, _ = select.select([connection], [], [], self.poll_timeout)
+            if not ready:
+                # Requête de contrôle : détecte une connexion morte sans trafic
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                continue
+            connection.poll()
+            while connection.notifies:
+                self.dispatch(connection.notifies.pop(0).payload)
+
+    def dispatch(self, raw_payload: str) -> None:
+        """Appliquer localement un changement émis par un autre worker"""
+        try:
+            payload = json.loads(raw_payload)
+        except ValueError:
+            return
+        if payload.get("w") == WORKER_ID:
+            return  # déjà appliqué au commit
+
+        change_event = None
+        if payload.get("e"):
+            type_, data, site_id, production_line_id, technician_id = payload["e"]
+            change_event = Event(type_, data, site_id, production_line_id, technician_id)
+        # Avec Redis, la version des étiquettes est déjà partagée entre workers
+        _apply(payload.get("t", ()), change_event, invalidate=not response_cache.shared)
+
+    def resync(self) -> None:
+        """Invalider tout le cache local et demander aux clients de recharger leurs données"""
+        _apply(KNOWN_TAGS, Event("resync", {"reason": "reconnect"}), invalidate=not response_cache.shared)
+
+change_listener = ChangeListener()
@@ -0,0 +1,75 @@
+# Regroupement des requêtes identiques concurrentes (single-flight)
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Optional
+
+class _Call:
+    """Calcul en cours partagé par toutes les requêtes ayant la même clé"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Exécute une seule fois un calcul demandé simultanément par plusieurs requêtes.
+
+    La première requête (leader) exécute le calcul ; les suivantes attendent
+    son résultat au lieu de relancer les mêmes requêtes SQL. Rien n'est
+    conservé une fois le calcul terminé : c'est le rôle du cache.
+
+    L'attente est bloquante : à n'appeler que depuis des routes synchrones
+    (def), exécutées dans le pool de threads, jamais depuis un async def.
+    """
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._calls = {}
+        self._executions = defaultdict(int)
+        self._coalesced = defaultdict(int)
+
+    def do(self, key: str, fn: Callable[[], Any], label: str = "default") -> Any:
+        with self._guard:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions[label] += 1
+            else:
+                self._coalesced[label] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._guard:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        """Nombre d'exécutions réelles et d'exécutions économisées, par libellé"""
+        with self._guard:
+            labels = sorted(set(self._executions) | set(self._coalesced))
+            return {
+                "in_flight": len(self._calls),
+                "executions": sum(self._executions.values()),
+                "saved_executions": sum(self._coalesced.values()),
+                "by_label": {
+                    label: {
+                        "executions": self._executions[label],
+                        "saved_executions": self._coalesced[label],
+                    }
+                    for label in labels
+                },
+            }
+
+request_flight = SingleFlight()
@@ -0,0 +1,129 @@
+# Compression négociée des réponses (gzip / brotli)
+import gzip
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel, seul gzip est alors proposé
+    brotli = None
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Choisir l'encodage à partir de l'en-tête Accept-Encoding (br prioritaire à qualité égale)"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[coding] = quality
+
+    wildcard = weights.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = weights.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+class CompressionMiddleware:
+    """Middleware ASGI compressant les réponses volumineuses selon Accept-Encoding.
+
+    Les réponses diffusées en flux (plusieurs messages de corps), déjà
+    encodées, en pièce jointe ou de type binaire ne sont jamais compressées.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        excluded_media_types: Iterable[str] = ()
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_media_types = tuple(excluded_media_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        """Compresser un corps complet avec l'encodage négocié"""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    def is_compressible(self, headers: Headers) -> bool:
+        """Vérifier que la réponse n'est ni déjà encodée, ni une pièce jointe, ni un type exclu"""
+        if "content-encoding" in headers:
+            return False
+        if headers.get("content-disposition", "").lower().startswith("attachment"):
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return not media_type.startswith(self.excluded_media_types)
+
+class _CompressionResponder:
+    """Intercepte les messages ASGI d'une réponse pour la compresser si elle est éligible"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # On attend le premier message de corps pour décider
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        self.passthrough = True
+        start_message = self.start_message
+        headers = MutableHeaders(raw=start_message["headers"])
+        body = message.get("body", b"")
+
+        # Réponse diffusée en flux, trop petite ou non éligible : transmise telle quelle
+        if (
+            message.get("more_body", False)
+            or len(body) < self.middleware.minimum_size
+            or not self.middleware.is_compressible(headers)
+        ):
+            await self.downstream(start_message)
+            await self.downstream(message)
+            return
+
+        compressed = self.middleware.compress(self.encoding, body)
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        await self.downstream(start_message)
+        await self.downstream({"type": "http.response.body", "body": compressed, "more_body": False})
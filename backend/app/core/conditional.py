@@ -0,0 +1,137 @@
+# Requêtes conditionnelles (ETag / Last-Modified, If-Match sur les ressources versionnées)
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from .cache import response_cache
+from .responses import FastJSONResponse
+from ..models.change import ChangeCounter
+
+STALE_DETAIL = "La ressource a été modifiée entre-temps"
+
+class CollectionValidators:
+    """Validateurs HTTP d'un ensemble filtré : nombre de lignes, max(updated_at) et versions des étiquettes"""
+
+    def __init__(self, etag: str, last_modified: Optional[datetime], tag_versions: Optional[Dict[str, int]] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.tag_versions = tag_versions
+
+    @classmethod
+    def compute(
+        cls,
+        db: Session,
+        request: Request,
+        *sources: Tuple[type, Iterable],
+        tags: Iterable[str] = ()
+    ) -> "CollectionValidators":
+        """Calculer les validateurs en une seule requête agrégée, sans hydrater d'objets ORM.
+
+        Chaque source est un couple (modèle, critères de filtre). updated_at
+        n'a qu'une précision d'une seconde sur certains moteurs : les
+        versions des étiquettes (incrémentées à chaque écriture) distinguent
+        deux changements de la même seconde. Ce sont celles du cache s'il est
+        partagé (Redis), sinon les compteurs en base (change_counters), lus
+        dans la même requête : un cache local a des versions propres à
+        chaque worker. Passées à response_cache.response, elles désignent
+        aussi le corps servi avec cet ETag.
+        """
+        tags = sorted(set(tags))
+        columns = []
+        for model, criteria in sources:
+            criteria = list(criteria)
+            columns.append(select(func.count(model.id)).where(*criteria).scalar_subquery())
+            columns.append(select(func.max(model.updated_at)).where(*criteria).scalar_subquery())
+        counted = len(columns)
+        if not response_cache.shared:
+            for tag in tags:
+                columns.append(select(ChangeCounter.version).where(ChangeCounter.tag == tag).scalar_subquery())
+        row = db.execute(select(*columns)).one()
+        if response_cache.shared:
+            tag_versions = response_cache.tag_versions(tags)
+        else:
+            tag_versions = {tag: int(version or 0) for tag, version in zip(tags, row[counted:])}
+
+        # La chaîne de requête fait partie de la clé : chaque page / filtre a son propre ETag
+        fingerprint = hashlib.sha1(request.url.path.encode())
+        fingerprint.update(request.url.query.encode())
+        for value in row[:counted]:
+            fingerprint.update(f"|{value}".encode())
+        for tag, version in tag_versions.items():
+            fingerprint.update(f"|{tag}={version}".encode())
+
+        timestamps = [value for value in row[1:counted:2] if value is not None]
+        last_modified = max(timestamps) if timestamps else None
+        return cls(f'W/"{fingerprint.hexdigest()[:32]}"', last_modified, tag_versions)
+
+    @property
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(_as_utc(self.last_modified).replace(microsecond=0), usegmt=True)
+        return headers
+
+    def is_not_modified(self, request: Request) -> bool:
+        """Vérifier If-None-Match (prioritaire) puis If-Modified-Since"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            candidates = {tag.strip() for tag in if_none_match.split(",")}
+            return "*" in candidates or _weak(self.etag) in {_weak(tag) for tag in candidates}
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return _as_utc(self.last_modified).replace(microsecond=0) <= _as_utc(since)
+        return False
+
+    def not_modified(self) -> Response:
+        """Réponse 304 sans corps"""
+        return Response(status_code=304, headers=self.headers)
+
+    def apply(self, response: Response) -> Response:
+        """Ajouter les validateurs à une réponse"""
+        response.headers.update(self.headers)
+        return response
+
+def version_etag(version: int) -> str:
+    """ETag fort d'une ressource versionnée (colonne version)"""
+    return f'"{version}"'
+
+def check_if_match(request: Request, version: int) -> None:
+    """Vérifier If-Match contre la version chargée (412 si elle a changé).
+
+    La version comparée est celle du SELECT qui a chargé l'objet ; elle
+    sert ensuite de condition à l'UPDATE du flush (version_id_col) : une
+    écriture concurrente entre ce SELECT et le commit fait échouer l'UPDATE
+    (StaleDataError, 412). Sans en-tête If-Match, seule cette seconde
+    vérification s'applique.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    candidates = {tag.strip() for tag in if_match.split(",")}
+    if "*" not in candidates and version_etag(version) not in candidates:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=STALE_DETAIL)
+
+async def stale_data_handler(request: Request, exc: StaleDataError) -> Response:
+    """UPDATE ... WHERE version = ? sans ligne modifiée : écriture concurrente"""
+    return FastJSONResponse(status_code=status.HTTP_412_PRECONDITION_FAILED, content={"detail": STALE_DETAIL})
+
+def _weak(tag: str) -> str:
+    """Comparaison faible des ETags (RFC 9110)"""
+    return tag[2:] if tag.startswith("W/") else tag
+
+def _as_utc(value: datetime) -> datetime:
+    """Les horodatages de la base sont naïfs et exprimés en UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -22,6 +22,97 @@ class Settings(BaseSettings):
     ENVIRONMENT: Optional[str] = "development"
     DEBUG: Optional[bool] = True
 
+    # Cache des réponses en lecture (durées en secondes)
+    CACHE_MAX_ENTRIES: int = 2048
+    CACHE_TTL_REFERENCE: int = 300  # sites, lignes, équipements
+    CACHE_TTL_STATS: int = 30  # statistiques
+    CACHE_TTL_CALENDAR: int = 60
+    CACHE_TTL_ANALYTICS: int = 600  # analyses de fiabilité et de disponibilité
+    DASHBOARD_TTL_COUNTERS: int = 30  # compteurs du tableau de bord
+    DASHBOARD_TTL_LISTS: int = 15  # listes (maintenances à venir, interventions en cours)
+
+    # Diffusion des événements (SSE)
+    EVENTS_QUEUE_SIZE: int = 100  # événements en attente par client
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+
+    # Coûts des interventions
+    DEFAULT_LABOR_RATE: int = 4500  # taux horaire par défaut, en centimes d'euro
+    COST_ROLLUP_BATCH_SIZE: int = 500
+
+    # Points de commande des pièces détachées
+    REORDER_HISTORY_DAYS: int = 90  # historique de consommation pris en compte
+    REORDER_LEAD_TIME_DAYS: int = 7  # délai d'approvisionnement par défaut
+    REORDER_SERVICE_LEVEL_Z: float = 1.65  # ~95 % de taux de service
+
+    # Télémétrie des équipements
+    TELEMETRY_MAX_BODY_BYTES: int = 16 * 1024 * 1024
+    TELEMETRY_MAX_READINGS: int = 100000  # mesures par requête
+    TELEMETRY_PARTITION_MONTHS_AHEAD: int = 3  # partitions mensuelles créées à l'avance
+    TELEMETRY_MAX_POINTS: int = 1000  # points par courbe, par défaut
+
+    # Rétention de la télémétrie, en jours (None : conservation illimitée)
+    TELEMETRY_RETENTION_RAW_DAYS: Optional[int] = 30
+    TELEMETRY_RETENTION_1M_DAYS: Optional[int] = 90
+    TELEMETRY_RETENTION_1H_DAYS: Optional[int] = 730
+    TELEMETRY_RETENTION_1D_DAYS: Optional[int] = None
+
+    # Détection d'anomalies sur la télémétrie
+    ANOMALY_WINDOW: int = 120  # mesures conservées par série
+    ANOMALY_EWMA_ALPHA: float = 0.05
+    ANOMALY_Z_THRESHOLD: float = 4.0
+    ANOMALY_MIN_SAMPLES: int = 30  # mesures avant la première détection
+    ANOMALY_CONSECUTIVE: int = 3  # dépassements successifs avant alerte
+    ANOMALY_RATE_LIMITS: dict = {}  # variation maximale par seconde, par métrique
+    ANOMALY_TECHNICIAN_ID: Optional[int] = None  # technicien des interventions prédictives
+
+    # Simulation Monte Carlo des arrêts et coûts
+    SIMULATION_RUNS: int = 2000  # tirages par défaut
+    SIMULATION_MAX_RUNS: int = 20000
+    SIMULATION_CHUNK_RUNS: int = 250  # tirages par lot (une graine dérivée par lot)
+    SIMULATION_PROCESSES: int = 2  # processus de calcul (1 : dans le thread de la tâche)
+    SIMULATION_JOB_TTL: int = 86400  # conservation du résultat, en secondes
+    SIMULATION_MIN_FAILURES: int = 3  # pannes minimales pour retenir la loi d'un modèle
+    SIMULATION_DEFAULT_MTBF_HOURS: float = 2000.0  # loi exponentielle sans historique
+    SIMULATION_DEFAULT_MTTR_HOURS: float = 4.0
+    SIMULATION_DEFAULT_FAILURE_COST: int = 50000  # en centimes d'euro
+    SIMULATION_CRITICALITY_FACTORS: dict = {"low": 0.5, "medium": 1.0, "high": 1.5, "critical": 2.5}
+
+    # File de travail des techniciens : poids en heures de retard équivalentes
+    WORK_QUEUE_PRIORITY_HOURS: dict = {"low": 0, "medium": 24, "high": 72, "critical": 168}
+    WORK_QUEUE_CRITICALITY_HOURS: dict = {"low": 0, "medium": 12, "high": 48, "critical": 120}
+    WORK_QUEUE_LINE_STOP_HOURS: int = 72  # équipement dont l'arrêt seul arrête sa ligne
+    WORK_QUEUE_TOP_SIZE: int = 100  # éléments gardés en tête de chaque file
+    WORK_QUEUE_REBUILD_SECONDS: int = 300  # reconstruction complète de sécurité
+    WORK_QUEUE_OVERLAP_SECONDS: int = 60  # recouvrement de la relecture sans LISTEN/NOTIFY (transactions longues)
+
+    # Journal d'audit
+    AUDIT_BATCH_SIZE: int = 1000  # lignes par insertion multi-lignes
+    AUDIT_MAX_PAGE_SIZE: int = 500
+
+    # Synchronisation des tablettes hors ligne
+    SYNC_PAGE_SIZE: int = 500  # lignes par page, toutes entités confondues
+    SYNC_MAX_PAGE_SIZE: int = 2000
+    SYNC_OVERLAP_SECONDS: int = 60  # recouvrement entre passes (transactions longues)
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30  # au-delà, synchronisation complète
+
+    # Clés d'idempotence des écritures
+    IDEMPOTENCY_TTL: int = 86400  # conservation des réponses, en secondes
+    IDEMPOTENCY_LOCK_TIMEOUT: float = 30.0  # attente maximale d'un doublon simultané (PostgreSQL)
+    IDEMPOTENCY_KEY_MAX_LENGTH: int = 255
+
+    # Compression des réponses
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # en octets
+    GZIP_COMPRESSION_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    COMPRESSION_EXCLUDED_MEDIA_TYPES: list = [
+        "text/event-stream",
+        "application/octet-stream",
+        "application/zip",
+        "image/",
+        "video/",
+        "audio/"
+    ]
+
     # CORS
     ALLOWED_ORIGINS: list = [
         "http://localhost:5173",
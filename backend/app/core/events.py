@@ -0,0 +1,177 @@
+# Bus d'événements en mémoire pour la diffusion en temps réel (SSE)
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+from typing import Optional
+
+from .config import settings
+
+class Event:
+    """Changement diffusé aux clients abonnés, avec ses attributs de routage"""
+
+    __slots__ = ("id", "type", "data", "site_id", "production_line_id", "technician_id")
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        type: str,
+        data: dict,
+        site_id: Optional[int] = None,
+        production_line_id: Optional[int] = None,
+        technician_id: Optional[int] = None
+    ):
+        self.id = next(Event._ids)
+        self.type = type
+        self.data = data
+        self.site_id = site_id
+        self.production_line_id = production_line_id
+        self.technician_id = technician_id
+
+    def encode(self) -> str:
+        """Format text/event-stream"""
+        payload = json.dumps(self.data, default=_json_default, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+def _json_default(value):
+    """Dates au format ISO 8601, autres valeurs en texte"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+class Subscription:
+    """Abonnement d'un client : file bornée et filtres site / ligne / technicien"""
+
+    def __init__(
+        self,
+        max_queue_size: int,
+        site_id: Optional[int] = None,
+        production_line_id: Optional[int] = None,
+        technician_id: Optional[int] = None
+    ):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.site_id = site_id
+        self.production_line_id = production_line_id
+        self.technician_id = technician_id
+        self.dropped = 0
+
+    def matches(self, event: Event) -> bool:
+        return (
+            (self.site_id is None or self.site_id == event.site_id)
+            and (self.production_line_id is None or self.production_line_id == event.production_line_id)
+            and (self.technician_id is None or self.technician_id == event.technician_id)
+        )
+
+    def offer(self, event: Event) -> None:
+        """Contre-pression : un client trop lent perd ses événements les plus anciens"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+class EventBus:
+    """Bus publish/subscribe d'un worker.
+
+    Les abonnements sont indexés par leur filtre le plus sélectif, si bien
+    qu'un événement n'est comparé qu'aux abonnés susceptibles de le
+    recevoir, même avec des milliers de connexions inactives. La
+    publication est sûre depuis n'importe quel thread (endpoints
+    synchrones exécutés dans le threadpool).
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._guard = threading.Lock()
+        self._index = defaultdict(set)
+
+    @staticmethod
+    def _index_key(subscription: Subscription) -> tuple:
+        if subscription.technician_id is not None:
+            return ("technician", subscription.technician_id)
+        if subscription.production_line_id is not None:
+            return ("production_line", subscription.production_line_id)
+        if subscription.site_id is not None:
+            return ("site", subscription.site_id)
+        return ("all", None)
+
+    def subscribe(self, **filters) -> Subscription:
+        """S'abonner depuis la boucle asyncio du worker"""
+        subscription = Subscription(self.max_queue_size, **filters)
+        with self._guard:
+            self._loop = asyncio.get_running_loop()
+            self._index[self._index_key(subscription)].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._guard:
+            key = self._index_key(subscription)
+            self._index[key].discard(subscription)
+            if not self._index[key]:
+                del self._index[key]
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._guard:
+            return sum(len(subscriptions) for subscriptions in self._index.values())
+
+    def publish(self, event: Event) -> None:
+        """Publier un événement (depuis la boucle ou depuis un autre thread)"""
+        with self._guard:
+            loop = self._loop
+            if loop is None or not self._index:
+                return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, event)
+        except RuntimeError:
+            pass  # boucle fermée (arrêt du worker)
+
+    def broadcast(self, event: Event) -> None:
+        """Diffuser un événement à tous les abonnés, quels que soient leurs filtres"""
+        with self._guard:
+            loop = self._loop
+            if loop is None or not self._index:
+                return
+        try:
+            loop.call_soon_threadsafe(self._dispatch_all, event)
+        except RuntimeError:
+            pass
+
+    def _dispatch_all(self, event: Event) -> None:
+        with self._guard:
+            subscriptions = [subscription for group in self._index.values() for subscription in group]
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+    def _dispatch(self, event: Event) -> None:
+        candidates = [("all", None)]
+        if event.site_id is not None:
+            candidates.append(("site", event.site_id))
+        if event.production_line_id is not None:
+            candidates.append(("production_line", event.production_line_id))
+        if event.technician_id is not None:
+            candidates.append(("technician", event.technician_id))
+
+        with self._guard:
+            subscriptions = [
+                subscription
+                for key in candidates
+                for subscription in self._index.get(key, ())
+            ]
+        for subscription in subscriptions:
+            if subscription.matches(event):
+                subscription.offer(event)
+
+def equipment_event(type: str, equipment, data: dict, technician_id: Optional[int] = None) -> Event:
+    """Construire un événement routé selon le site et la ligne de l'équipement concerné"""
+    return Event(
+        type,
+        data,
+        site_id=equipment.site_id if equipment is not None else None,
+        production_line_id=equipment.production_line_id if equipment is not None else None,
+        technician_id=technician_id
+    )
+
+event_bus = EventBus(max_queue_size=settings.EVENTS_QUEUE_SIZE)
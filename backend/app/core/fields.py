@@ -0,0 +1,59 @@
+# Sélection partielle des champs (paramètre ?fields=)
+from functools import lru_cache
+from typing import FrozenSet, Optional, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import load_only, noload, selectinload
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """Analyser le paramètre fields et le valider contre le schéma de réponse"""
+    if not fields:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Champs inconnus : {', '.join(sorted(unknown))}"
+        )
+
+    # L'identifiant est toujours renvoyé
+    requested.add("id")
+    return frozenset(requested)
+
+def query_options(model, selected: Optional[FrozenSet[str]], dependencies: Optional[dict] = None) -> list:
+    """Construire les options de chargement limitant la projection SQL aux champs demandés"""
+    if selected is None:
+        return []
+
+    # Les champs calculés (ex: status_display) dépendent de colonnes ou de relations
+    needed = set(selected)
+    for name in selected:
+        needed.update((dependencies or {}).get(name, ()))
+
+    mapper = sa_inspect(model)
+    columns = [getattr(model, name) for name in sorted(needed) if name in mapper.columns]
+    options = [load_only(*columns)]
+    for relationship in mapper.relationships:
+        if relationship.key in needed:
+            options.append(selectinload(getattr(model, relationship.key)))
+        else:
+            options.append(noload(getattr(model, relationship.key)))
+    return options
+
+@lru_cache(maxsize=128)
+def sparse_model(schema: Type[BaseModel], selected: FrozenSet[str]) -> Type[BaseModel]:
+    """Créer (et mettre en cache) un schéma réduit aux champs demandés"""
+    definitions = {
+        name: (field.annotation, field)
+        for name, field in schema.model_fields.items()
+        if name in selected
+    }
+    return create_model(
+        f"{schema.__name__}Partial",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
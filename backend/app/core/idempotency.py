@@ -0,0 +1,123 @@
+# Clés d'idempotence des requêtes d'écriture (en-tête Idempotency-Key)
+import hashlib
+import json
+from datetime import timedelta
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from .audit import current_actor
+from .config import settings
+from ..models.idempotency import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+# En-têtes de la réponse conservés avec son corps
+STORED_HEADERS = ("etag", "location")
+
+def _fingerprint(request: Request, payload: Any) -> str:
+    """Empreinte de la requête : une clé ne sert qu'à une seule requête"""
+    content = json.dumps(payload, sort_keys=True, default=str) if payload is not None else ""
+    return hashlib.sha1(f"{request.method} {request.url.path}|{content}".encode()).hexdigest()
+
+def _stored(db: Session, owner: str, key: str, now) -> Optional[IdempotencyKey]:
+    return db.execute(
+        select(IdempotencyKey).where(
+            IdempotencyKey.owner == owner,
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at > now
+        )
+    ).scalar_one_or_none()
+
+def _replay(record: IdempotencyKey, fingerprint: str) -> Response:
+    if record.fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Clé d'idempotence déjà utilisée pour une autre requête"
+        )
+    return Response(
+        content=record.body.encode(),
+        status_code=record.status_code,
+        headers={**(record.headers or {}), REPLAYED_HEADER: "true"},
+        media_type=record.media_type
+    )
+
+def _claim(db: Session, record: IdempotencyKey) -> None:
+    """Insérer la clé : un doublon simultané attend la fin de la transaction qui la détient"""
+    postgresql = db.get_bind().dialect.name == "postgresql"
+    if postgresql:
+        timeout = int(settings.IDEMPOTENCY_LOCK_TIMEOUT * 1000)
+        db.execute(text(f"SET LOCAL lock_timeout = {timeout}"))
+    db.add(record)
+    db.flush()
+    if postgresql:
+        db.execute(text("SET LOCAL lock_timeout = DEFAULT"))
+
+def idempotent(db: Session, request: Request, compute: Callable[[], Response], payload: Any = None) -> Response:
+    """Exécuter une écriture au plus une fois par clé d'idempotence, puis valider la transaction.
+
+    compute fait ses changements sans commit. Sans en-tête Idempotency-Key,
+    la transaction est simplement validée. Sinon la clé est insérée avant
+    l'écriture, et la réponse avec elle, dans la même transaction ; une
+    nouvelle tentative la rejoue sans toucher aux tables métier. Un doublon
+    simultané bloque sur la contrainte unique (owner, key) jusqu'à la fin
+    de la première exécution, puis rejoue sa réponse. Une erreur annule la
+    transaction, clé comprise : la requête peut être retentée.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        response = compute()
+        db.commit()
+        return response
+    if not key or len(key) > settings.IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Clé d'idempotence invalide"
+        )
+    # Les clés sont propres à chaque auteur : sans auteur, rien ne les distingue
+    owner = current_actor.get()
+    if owner is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentification requise pour utiliser Idempotency-Key",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    fingerprint = _fingerprint(request, payload)
+    now = db.execute(select(func.now())).scalar()
+    record = _stored(db, owner, key, now)
+    if record is not None:
+        return _replay(record, fingerprint)
+
+    db.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.owner == owner, IdempotencyKey.key == key, IdempotencyKey.expires_at <= now
+    ))
+    record = IdempotencyKey(
+        owner=owner,
+        key=key,
+        fingerprint=fingerprint,
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL)
+    )
+    try:
+        _claim(db, record)
+    except (IntegrityError, OperationalError):
+        # Doublon : la première exécution est terminée (ou dure encore au-delà du délai)
+        db.rollback()
+        record = _stored(db, owner, key, now)
+        if record is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Requête identique en cours de traitement"
+            )
+        return _replay(record, fingerprint)
+
+    response = compute()
+    record.status_code = response.status_code
+    record.media_type = response.media_type
+    record.headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+    record.body = response.body.decode()
+    db.commit()
+    return response
@@ -0,0 +1,44 @@
+# Réponses JSON rapides
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, Type
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+from .fields import sparse_model
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel, on retombe sur le module json standard
+    orjson = None
+
+class FastJSONResponse(JSONResponse):
+    """Réponse JSON par défaut de l'application, sérialisée avec orjson si disponible"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+@lru_cache(maxsize=256)
+def _adapter(schema: Type[BaseModel], many: bool) -> TypeAdapter:
+    """Adaptateur pydantic mis en cache pour un schéma (ou une liste de schémas)"""
+    return TypeAdapter(List[schema] if many else schema)
+
+def model_response(
+    schema: Type[BaseModel],
+    content: Any,
+    selected: Optional[FrozenSet[str]] = None,
+    status_code: int = 200,
+    headers: Optional[dict] = None
+) -> Response:
+    """Valider des objets ORM une seule fois puis les sérialiser directement en JSON (pydantic-core).
+
+    La réponse retournée court-circuite le response_model de FastAPI, qui
+    reste déclaré sur la route pour la documentation OpenAPI.
+    """
+    if selected is not None:
+        schema = sparse_model(schema, selected)
+    adapter = _adapter(schema, isinstance(content, list))
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
@@ -1,15 +1,30 @@
-﻿from fastapi import FastAPI
+﻿from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm.exc import StaleDataError
 from .core.config import settings
-from .api.auth import router as auth_router
+from .core.compression import CompressionMiddleware
+from .core.coalescing import request_flight
+from .core.changes import change_listener
+from .core.audit import AuditContextMiddleware
+from .core.conditional import stale_data_handler
+from .core.responses import FastJSONResponse
+from .models.user import User
+from .api.auth import router as auth_router, get_current_user
 from .api.sites import router as sites_router
 from .api.production_lines import router as production_lines_router
 from .api.equipment import router as equipment_router
+from .api.inventory import router as inventory_router
+from .api.telemetry import router as telemetry_router
+from .api.dashboard import router as dashboard_router
+from .api.analytics import router as analytics_router
+from .api.events import router as events_router
+from .api.audit import router as audit_router
 
 app = FastAPI(
     title="Maintenance Platform API",
     description="API pour la plateforme de maintenance industrielle",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Configuration CORS
@@ -21,6 +36,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression gzip / brotli des réponses volumineuses
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+    excluded_media_types=settings.COMPRESSION_EXCLUDED_MEDIA_TYPES,
+)
+
+# Auteur des écritures pour le journal d'audit
+app.add_middleware(AuditContextMiddleware)
+
+# Écriture concurrente détectée par le verrouillage optimiste : 412
+app.add_exception_handler(StaleDataError, stale_data_handler)
+
 # Inclure les routes d'authentification
 app.include_router(auth_router, prefix="/api/auth", tags=["authentication"])
 
@@ -29,10 +59,37 @@ app.include_router(sites_router, prefix="/api/v1/sites", tags=["sites"])
 app.include_router(production_lines_router, prefix="/api/v1/production-lines", tags=["production-lines"])
 app.include_router(equipment_router, prefix="/api/v1/equipment", tags=["equipment"])
 
+# Pièces détachées et stock
+app.include_router(inventory_router, prefix="/api/v1/parts", tags=["parts"])
+
+# Télémétrie des équipements (maintenance prédictive)
+app.include_router(telemetry_router, prefix="/api/v1/telemetry", tags=["telemetry"])
+
 # Inclure les routes pour la maintenance
 from app.api.v1.maintenance import router as maintenance_router
 app.include_router(maintenance_router, prefix="/api/v1/maintenance", tags=["maintenance"])
 
+# Tableau de bord agrégé
+app.include_router(dashboard_router, prefix="/api/v1/dashboard", tags=["dashboard"])
+
+# Analyses de fiabilité et de disponibilité
+app.include_router(analytics_router, prefix="/api/v1/analytics", tags=["analytics"])
+
+# Flux d'événements temps réel
+app.include_router(events_router, prefix="/api/v1/events", tags=["events"])
+
+# Journal d'audit des écritures
+app.include_router(audit_router, prefix="/api/v1/audit", tags=["audit"])
+
+@app.on_event("startup")
+def start_change_listener():
+    """Un écouteur LISTEN/NOTIFY par worker (PostgreSQL uniquement)"""
+    change_listener.start()
+
+@app.on_event("shutdown")
+def stop_change_listener():
+    change_listener.stop()
+
 @app.get("/")
 async def root():
     return {"message": "API Maintenance Platform"}
@@ -40,3 +97,13 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+@app.get("/metrics/coalescing")
+async def coalescing_metrics(current_user: User = Depends(get_current_user)):
+    """Exécutions SQL économisées par le regroupement des requêtes concurrentes"""
+    if current_user.role not in ["admin", "supervisor"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permissions insuffisantes"
+        )
+    return request_flight.stats()
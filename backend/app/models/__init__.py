@@ -1,8 +1,8 @@
 # Modèles de données
 from .user import User
 from .site import Site
-from .production_line import ProductionLine
-from .equipment import Equipment
+from .production_line import ProductionLine, EquipmentDependency
+from .equipment import Equipment, EquipmentStatusChange
 from .maintenance import (
     MaintenancePlan,
     MaintenanceTask,
@@ -11,16 +11,38 @@ from .maintenance import (
     InterventionTask,
     MaintenancePartUsed
 )
+from .inventory import Part, PartStock, StockMovement, StockAlert
+from .telemetry import SensorReading, SensorRollupMinute, SensorRollupHour, SensorRollupDay
+from .audit import AuditLog
+from .sync import SyncTombstone
+from .idempotency import IdempotencyKey
+from .change import ChangeCounter
+from .simulation import SimulationJob
 
 __all__ = [
     "User",
     "Site",
     "ProductionLine",
+    "EquipmentDependency",
     "Equipment",
+    "EquipmentStatusChange",
     "MaintenancePlan",
     "MaintenanceTask",
     "ScheduledMaintenance",
     "MaintenanceIntervention",
     "InterventionTask",
-    "MaintenancePartUsed"
+    "MaintenancePartUsed",
+    "Part",
+    "PartStock",
+    "StockMovement",
+    "StockAlert",
+    "SensorReading",
+    "SensorRollupMinute",
+    "SensorRollupHour",
+    "SensorRollupDay",
+    "AuditLog",
+    "SyncTombstone",
+    "IdempotencyKey",
+    "ChangeCounter",
+    "SimulationJob"
 ]
@@ -0,0 +1,29 @@
+# Modèle du journal d'audit
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, JSON, String
+from .base import Base
+
+class AuditLog(Base):
+    """Création, modification ou suppression d'une ligne, avec son auteur.
+
+    Table en ajout seul, écrite en une insertion multi-lignes par
+    transaction : pas de colonnes d'horodatage techniques ni de clé
+    étrangère (l'entité ou l'auteur peuvent avoir été supprimés depuis).
+    """
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        Index("idx_audit_log_entity", "entity", "entity_id", "id"),
+        Index("idx_audit_log_actor", "actor", "id"),
+        Index("idx_audit_log_occurred_at", "occurred_at", postgresql_using="brin"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    occurred_at = Column(DateTime, nullable=False)
+    actor = Column(String(50), nullable=True)  # nom d'utilisateur du jeton, None hors requête
+    source = Column(String(200), nullable=True)  # méthode et chemin de la requête
+    action = Column(String(10), nullable=False)  # create, update, delete
+    entity = Column(String(50), nullable=False)  # nom de la table
+    entity_id = Column(Integer, nullable=True)
+    changes = Column(JSON, nullable=False)  # {champ: [avant, après]} ; valeurs seules à la création et à la suppression
+
+    def __repr__(self):
+        return f"<AuditLog(id={self.id}, action='{self.action}', entity='{self.entity}', entity_id={self.entity_id})>"
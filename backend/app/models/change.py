@@ -0,0 +1,18 @@
+# Modèle des compteurs de changements par étiquette de cache
+from sqlalchemy import BigInteger, Column, String
+from .base import Base
+
+class ChangeCounter(Base):
+    """Compteur incrémenté par chaque écriture portant l'étiquette (voir record_change).
+
+    Lu dans la même requête que les agrégats des validateurs de collection :
+    un ETag commun à tous les workers, qui distingue deux changements de la
+    même seconde quand le cache n'est pas partagé.
+    """
+    __tablename__ = "change_counters"
+
+    tag = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ChangeCounter(tag='{self.tag}', version={self.version})>"
@@ -1,7 +1,7 @@
 # Modèle Equipment
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
-from .base import BaseModel
+from .base import Base, BaseModel
 
 class Equipment(BaseModel):
     __tablename__ = "equipment"
@@ -19,6 +19,9 @@ class Equipment(BaseModel):
     status = Column(String(20), nullable=False, default='active')  # active, inactive, maintenance, broken
     criticality = Column(String(10), nullable=False, default='medium')  # low, medium, high, critical
     specifications = Column(JSON, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # verrouillage optimiste (ETag)
+    
+    __mapper_args__ = {"version_id_col": version}
     
     # Relations
     site = relationship("Site", back_populates="equipment")
@@ -51,3 +54,40 @@ class Equipment(BaseModel):
             'critical': 'Critique'
         }
         return criticality_map.get(self.criticality, self.criticality)
+    
+    @property
+    def site_name(self):
+        """Retourne le nom du site associé"""
+        return self.site.name if self.site else None
+    
+    @property
+    def production_line_name(self):
+        """Retourne le nom de la ligne de production associée"""
+        return self.production_line.name if self.production_line else None
+
+class EquipmentStatusChange(Base):
+    """Changement de statut d'un équipement (journal en ajout seul).
+
+    Chaque ligne ouvre une période qui dure jusqu'au changement suivant du
+    même équipement. L'index (équipement, instant) couvre le statut : les
+    calculs de temps par statut se font sans lire la table.
+    """
+    __tablename__ = "equipment_status_history"
+    __table_args__ = (
+        Index(
+            "idx_equipment_status_history_equipment_changed_at",
+            "equipment_id", "changed_at", "id",
+            postgresql_include=["status"]
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    equipment_id = Column(Integer, ForeignKey("equipment.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(20), nullable=False)
+    previous_status = Column(String(20), nullable=True)  # None : création de l'équipement
+    changed_at = Column(DateTime, nullable=False)
+
+    equipment = relationship("Equipment")
+
+    def __repr__(self):
+        return f"<EquipmentStatusChange(equipment_id={self.equipment_id}, status='{self.status}', changed_at={self.changed_at})>"
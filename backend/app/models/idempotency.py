@@ -0,0 +1,29 @@
+# Modèle des réponses conservées par clé d'idempotence
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, JSON, String, Text, UniqueConstraint, func
+from .base import Base
+
+class IdempotencyKey(Base):
+    """Réponse d'une écriture, rejouée aux nouvelles tentatives de la même clé.
+
+    La ligne est insérée dans la transaction de l'écriture : elle n'existe
+    que si l'écriture a été validée. Purgée après expires_at.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("owner", "key", name="uq_idempotency_keys_owner_key"),
+        Index("idx_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    owner = Column(String(100), nullable=False)  # sujet du jeton de l'auteur
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(40), nullable=False)  # méthode, chemin et corps de la requête
+    status_code = Column(Integer, nullable=True)
+    media_type = Column(String(100), nullable=True)
+    headers = Column(JSON, nullable=True)
+    body = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<IdempotencyKey(owner='{self.owner}', key='{self.key}', status_code={self.status_code})>"
@@ -0,0 +1,97 @@
+# Modèles pour le stock de pièces détachées
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, CheckConstraint, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from enum import Enum
+from .base import BaseModel
+
+class StockMovementType(str, Enum):
+    RECEIPT = "receipt"
+    CONSUMPTION = "consumption"
+    ADJUSTMENT = "adjustment"
+    RETURN = "return"
+
+class Part(BaseModel):
+    __tablename__ = "parts"
+
+    reference = Column(String(50), unique=True, nullable=False, index=True)
+    name = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    manufacturer = Column(String(100), nullable=True)
+    unit = Column(String(20), nullable=False, default="unit")
+    unit_cost = Column(Integer, nullable=True)  # en centimes d'euro
+    lead_time_days = Column(Integer, nullable=True)  # délai d'approvisionnement
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    # Relations
+    stock = relationship("PartStock", back_populates="part", uselist=False, cascade="all, delete-orphan")
+    movements = relationship("StockMovement", back_populates="part")
+
+    def __repr__(self):
+        return f"<Part(id={self.id}, reference='{self.reference}', name='{self.name}')>"
+
+    @property
+    def quantity(self):
+        """Quantité en stock"""
+        return self.stock.quantity if self.stock else 0
+
+    @property
+    def min_quantity(self):
+        """Stock minimum"""
+        return self.stock.min_quantity if self.stock else 0
+
+    @property
+    def reorder_point(self):
+        """Point de commande calculé sur l'historique de consommation"""
+        return self.stock.reorder_point if self.stock else 0
+
+class PartStock(BaseModel):
+    __tablename__ = "part_stock"
+    __table_args__ = (
+        CheckConstraint("quantity >= 0", name="ck_part_stock_quantity_non_negative"),
+    )
+
+    part_id = Column(Integer, ForeignKey("parts.id"), unique=True, nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    min_quantity = Column(Integer, nullable=False, default=0)
+    reorder_point = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=1)  # incrémentée à chaque mouvement
+
+    # Relations
+    part = relationship("Part", back_populates="stock")
+
+    def __repr__(self):
+        return f"<PartStock(part_id={self.part_id}, quantity={self.quantity})>"
+
+class StockMovement(BaseModel):
+    """Journal des mouvements de stock : ajout uniquement, jamais modifié ni supprimé"""
+    __tablename__ = "stock_movements"
+
+    part_id = Column(Integer, ForeignKey("parts.id"), nullable=False, index=True)
+    movement_type = Column(SQLEnum(StockMovementType), nullable=False)
+    quantity = Column(Integer, nullable=False)  # variation signée (négative pour une sortie)
+    balance_after = Column(Integer, nullable=False)  # stock après le mouvement
+    unit_cost = Column(Integer, nullable=True)  # en centimes d'euro
+    intervention_id = Column(Integer, ForeignKey("maintenance_interventions.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    notes = Column(Text, nullable=True)
+
+    # Relations
+    part = relationship("Part", back_populates="movements")
+
+    def __repr__(self):
+        return f"<StockMovement(id={self.id}, part_id={self.part_id}, quantity={self.quantity})>"
+
+class StockAlert(BaseModel):
+    """Pièces sous leur seuil d'alerte, tenu à jour à chaque mouvement de stock"""
+    __tablename__ = "part_stock_alerts"
+
+    part_id = Column(Integer, ForeignKey("parts.id"), unique=True, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    threshold = Column(Integer, nullable=False)  # max(stock minimum, point de commande)
+    triggered_at = Column(DateTime, nullable=False)
+
+    # Relations
+    part = relationship("Part")
+
+    def __repr__(self):
+        return f"<StockAlert(part_id={self.part_id}, quantity={self.quantity}, threshold={self.threshold})>"
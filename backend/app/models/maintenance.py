@@ -43,11 +43,14 @@ class MaintenancePlan(BaseModel):
     priority = Column(SQLEnum(MaintenancePriority), nullable=False, default=MaintenancePriority.MEDIUM)
     is_active = Column(Boolean, default=True, nullable=False)
     next_due_date = Column(DateTime, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # verrouillage optimiste (ETag)
+    
+    __mapper_args__ = {"version_id_col": version}
     
     # Relations
     equipment = relationship("Equipment", back_populates="maintenance_plans")
     tasks = relationship("MaintenanceTask", back_populates="maintenance_plan", cascade="all, delete-orphan")
-    scheduled_maintenances = relationship("ScheduledMaintenance", back_populates="maintenance_plan")
+    scheduled_maintenances = relationship("ScheduledMaintenance", back_populates="maintenance_plan", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<MaintenancePlan(id={self.id}, name='{self.name}', equipment_id={self.equipment_id})>"
@@ -126,6 +129,9 @@ class MaintenanceIntervention(BaseModel):
     labor_cost = Column(Integer, nullable=True)  # en centimes d'euro
     parts_cost = Column(Integer, nullable=True)  # en centimes d'euro
     total_cost = Column(Integer, nullable=True)  # en centimes d'euro
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # verrouillage optimiste (ETag)
+    
+    __mapper_args__ = {"version_id_col": version}
     
     # Relations
     scheduled_maintenance = relationship("ScheduledMaintenance", back_populates="interventions")
@@ -161,13 +167,14 @@ class MaintenancePartUsed(BaseModel):
     __tablename__ = "maintenance_parts_used"
     
     intervention_id = Column(Integer, ForeignKey("maintenance_interventions.id"), nullable=False)
-    part_id = Column(Integer, nullable=False)  # Référence vers une table de pièces (à créer plus tard)
+    part_id = Column(Integer, ForeignKey("parts.id"), nullable=False)
     quantity_used = Column(Integer, nullable=False)
     unit_cost = Column(Integer, nullable=True)  # en centimes d'euro
     total_cost = Column(Integer, nullable=True)  # en centimes d'euro
     
     # Relations
     intervention = relationship("MaintenanceIntervention", back_populates="parts_used")
+    part = relationship("Part")
     
     def __repr__(self):
         return f"<MaintenancePartUsed(id={self.id}, part_id={self.part_id}, quantity={self.quantity_used})>"
@@ -1,5 +1,5 @@
 # Modèle Production Line
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, UniqueConstraint, CheckConstraint
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -13,6 +13,31 @@ class ProductionLine(BaseModel):
     # Relations
     site = relationship("Site", back_populates="production_lines")
     equipment = relationship("Equipment", back_populates="production_line")
+    dependencies = relationship("EquipmentDependency", back_populates="production_line", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<ProductionLine(id={self.id}, name='{self.name}', site_id={self.site_id})>"
+
+class EquipmentDependency(BaseModel):
+    """Arc du graphe de flux d'une ligne : l'aval ne produit que s'il est alimenté.
+
+    Un équipement sans amont est alimenté par l'entrée de la ligne ; un
+    équipement avec plusieurs amonts (branches en parallèle) l'est tant
+    qu'au moins l'un d'eux produit. Les équipements en série forment une
+    chaîne. La ligne produit si tous ses équipements terminaux produisent.
+    """
+    __tablename__ = "equipment_dependencies"
+    __table_args__ = (
+        UniqueConstraint("upstream_id", "downstream_id", name="uq_equipment_dependencies_edge"),
+        CheckConstraint("upstream_id <> downstream_id", name="ck_equipment_dependencies_no_self_loop"),
+    )
+
+    production_line_id = Column(Integer, ForeignKey("production_lines.id", ondelete="CASCADE"), nullable=False, index=True)
+    upstream_id = Column(Integer, ForeignKey("equipment.id", ondelete="CASCADE"), nullable=False)
+    downstream_id = Column(Integer, ForeignKey("equipment.id", ondelete="CASCADE"), nullable=False)
+
+    # Relations
+    production_line = relationship("ProductionLine", back_populates="dependencies")
+
+    def __repr__(self):
+        return f"<EquipmentDependency(line={self.production_line_id}, {self.upstream_id} -> {self.downstream_id})>"
@@ -0,0 +1,30 @@
+# Modèle des simulations Monte Carlo lancées en tâche de fond
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, JSON, String, Text, func
+from .base import Base
+
+class SimulationJob(Base):
+    """État et résultat d'une simulation, partagés entre workers.
+
+    Hors du cache des réponses : une simulation en cours ou terminée n'est
+    jamais évincée par le trafic de lecture. Purgée après expires_at.
+    """
+    __tablename__ = "simulation_jobs"
+    __table_args__ = (
+        Index("idx_simulation_jobs_expires_at", "expires_at"),
+    )
+
+    id = Column(String(32), primary_key=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, completed, failed
+    runs = Column(Integer, nullable=False)
+    horizon_days = Column(Integer, nullable=False)
+    seed = Column(BigInteger, nullable=False)
+    site_id = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<SimulationJob(id='{self.id}', status='{self.status}')>"
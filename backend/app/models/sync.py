@@ -0,0 +1,23 @@
+# Modèle des suppressions à propager aux tablettes hors ligne
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, func
+from .base import Base
+
+class SyncTombstone(Base):
+    """Enregistrement disparu de la vue d'un technicien (supprimé ou réassigné).
+
+    technician_id None : suppression qui concerne tous les techniciens
+    (équipement, tâche). Purgé après SYNC_TOMBSTONE_RETENTION_DAYS.
+    """
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("idx_sync_tombstones_deleted_at", "deleted_at", "id"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    entity = Column(String(20), nullable=False)  # equipment, scheduled, interventions, tasks
+    entity_id = Column(Integer, nullable=False)
+    technician_id = Column(Integer, nullable=True)
+    deleted_at = Column(DateTime, nullable=False, server_default=func.now())  # horloge de la base, comme updated_at
+
+    def __repr__(self):
+        return f"<SyncTombstone(entity='{self.entity}', entity_id={self.entity_id}, technician_id={self.technician_id})>"
@@ -0,0 +1,56 @@
+# Modèles pour la télémétrie des équipements
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from .base import Base
+
+class SensorReading(Base):
+    """Mesure capteur brute.
+
+    Table à fort volume, partitionnée par mois sur recorded_at (PostgreSQL) :
+    pas d'identifiant ni de colonnes d'horodatage techniques, la clé
+    primaire (équipement, métrique, instant) dédoublonne les renvois.
+    L'équipement est vérifié à l'ingestion plutôt que par une clé
+    étrangère, contrôlée ligne à ligne.
+    """
+    __tablename__ = "sensor_readings"
+    __table_args__ = (
+        Index("idx_sensor_readings_recorded_at", "recorded_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
+
+    equipment_id = Column(Integer, primary_key=True)
+    metric = Column(String(50), primary_key=True)
+    recorded_at = Column(DateTime, primary_key=True)
+    value = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<SensorReading(equipment_id={self.equipment_id}, metric='{self.metric}', recorded_at={self.recorded_at})>"
+
+class SensorRollupMixin:
+    """Agrégat d'une série sur un intervalle (bucket = début de l'intervalle).
+
+    La somme est stockée plutôt que la moyenne : les agrégats se cumulent
+    alors exactement quand de nouvelles mesures arrivent.
+    """
+    equipment_id = Column(Integer, primary_key=True)
+    metric = Column(String(50), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    sample_count = Column(Integer, nullable=False)
+    value_sum = Column(Float, nullable=False)
+    value_min = Column(Float, nullable=False)
+    value_max = Column(Float, nullable=False)
+
+    @property
+    def value_mean(self):
+        return self.value_sum / self.sample_count
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(equipment_id={self.equipment_id}, metric='{self.metric}', bucket={self.bucket})>"
+
+class SensorRollupMinute(SensorRollupMixin, Base):
+    __tablename__ = "sensor_rollups_1m"
+
+class SensorRollupHour(SensorRollupMixin, Base):
+    __tablename__ = "sensor_rollups_1h"
+
+class SensorRollupDay(SensorRollupMixin, Base):
+    __tablename__ = "sensor_rollups_1d"
@@ -12,6 +12,7 @@ class User(BaseModel):
     last_name = Column(String(50), nullable=False)
     role = Column(String(20), nullable=False)  # admin, supervisor, technician
     is_active = Column(Boolean, default=True, nullable=False)
+    hourly_rate = Column(Integer, nullable=True)  # en centimes d'euro, taux par défaut sinon
     
     def __repr__(self):
         return f"<User(username='{self.username}', email='{self.email}', role='{self.role}')>"
@@ -0,0 +1,127 @@
+# Schémas pour les analyses de fiabilité, de disponibilité et de simulation
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+class ReliabilityGroupBy(str, Enum):
+    MODEL = "model"
+    MANUFACTURER = "manufacturer"
+    PRODUCTION_LINE = "production_line"
+
+class HazardPoint(BaseModel):
+    hours: float  # temps depuis la dernière panne
+    hazard: float  # taux de défaillance instantané, par heure
+    reliability: float  # probabilité de fonctionner encore
+
+class ReliabilityGroup(BaseModel):
+    group: Optional[str]  # valeur du regroupement (None : non renseigné)
+    label: Optional[str]
+    equipment: int
+    failures: int  # intervalles terminés par une panne
+    censored: int  # intervalles en cours à la fin de la période
+    shape: float  # forme de Weibull : < 1 pannes précoces, > 1 usure
+    scale_hours: float
+    mtbf_hours: float
+    curve: List[HazardPoint]
+
+class ReliabilityReport(BaseModel):
+    group_by: ReliabilityGroupBy
+    start: Optional[datetime]
+    end: datetime
+    groups: List[ReliabilityGroup]
+
+class AvailabilityLevel(str, Enum):
+    EQUIPMENT = "equipment"
+    PRODUCTION_LINE = "production_line"
+    SITE = "site"
+
+class AvailabilityRow(BaseModel):
+    id: Optional[int]  # None : équipements sans ligne ou sans site
+    name: Optional[str]
+    equipment: int
+    downtime_seconds: int  # union des arrêts, sans double comptage
+    availability_percent: float
+    equipment_availability_percent: float  # moyenne sur les équipements du groupe
+
+class AvailabilityReport(BaseModel):
+    level: AvailabilityLevel
+    start: datetime
+    end: datetime
+    period_seconds: int
+    rows: List[AvailabilityRow]
+
+class StateDuration(BaseModel):
+    status: str
+    seconds: int
+    percent: float  # part du temps observé
+
+class TimeInStateRow(BaseModel):
+    id: Optional[int]  # None : équipements sans ligne ou sans site
+    name: Optional[str]
+    equipment: int
+    observed_seconds: int  # temps couvert par l'historique, cumulé sur les équipements
+    states: List[StateDuration]
+
+class TimeInStateReport(BaseModel):
+    level: AvailabilityLevel
+    start: datetime
+    end: datetime
+    rows: List[TimeInStateRow]
+
+class SimulationRequest(BaseModel):
+    runs: Optional[int] = Field(None, ge=100)  # défaut : SIMULATION_RUNS
+    horizon_days: int = Field(365, ge=1, le=3650)
+    seed: Optional[int] = Field(None, ge=0)  # même graine, même résultat
+    site_id: Optional[int] = None
+
+class Percentiles(BaseModel):
+    mean: float
+    p5: float
+    p50: float
+    p95: float
+
+class SiteSimulation(BaseModel):
+    site_id: int
+    name: str
+    equipment: int
+    failures: Percentiles
+    downtime_hours: Percentiles  # arrêts de panne et préventive planifiée
+    corrective_cost: Percentiles  # en centimes d'euro
+    preventive_cost: Percentiles
+    total_cost: Percentiles
+
+class SimulationTotal(BaseModel):
+    failures: Percentiles
+    downtime_hours: Percentiles
+    corrective_cost: Percentiles
+    preventive_cost: Percentiles
+    total_cost: Percentiles
+
+class SimulationResult(BaseModel):
+    seed: int
+    runs: int
+    horizon_days: int
+    equipment: int
+    fitted_models: int  # modèles dotés de leur propre loi de Weibull
+    sites: List[SiteSimulation]
+    total: Optional[SimulationTotal]
+
+class SimulationStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class SimulationJob(BaseModel):
+    id: str
+    status: SimulationStatus
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    runs: int
+    horizon_days: int
+    seed: int
+    site_id: Optional[int]
+    error: Optional[str]
+    result: Optional[SimulationResult]
@@ -0,0 +1,23 @@
+# Schémas pour le journal d'audit
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+from enum import Enum
+
+class AuditAction(str, Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+class AuditLogResponse(BaseModel):
+    id: int
+    occurred_at: datetime
+    actor: Optional[str] = None
+    source: Optional[str] = None
+    action: AuditAction
+    entity: str
+    entity_id: Optional[int] = None
+    changes: Dict[str, Any]  # {champ: [avant, après]} pour une modification
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,36 @@
+# Schémas pour le tableau de bord
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+from .maintenance import MaintenanceStats, MaintenancePriority, MaintenanceType
+
+class DashboardUpcomingMaintenance(BaseModel):
+    id: int
+    equipment_id: int
+    equipment_name: Optional[str] = None
+    scheduled_date: datetime
+    estimated_start_time: str
+    priority: MaintenancePriority
+    assigned_technician_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class DashboardIntervention(BaseModel):
+    id: int
+    equipment_id: int
+    equipment_name: Optional[str] = None
+    technician_id: int
+    priority: MaintenancePriority
+    maintenance_type: MaintenanceType
+    actual_start_time: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class DashboardResponse(BaseModel):
+    equipment: dict
+    maintenance: MaintenanceStats
+    upcoming: List[DashboardUpcomingMaintenance]
+    in_progress: List[DashboardIntervention]
@@ -55,6 +55,7 @@ class EquipmentUpdate(BaseModel):
 
 class EquipmentResponse(EquipmentBase):
     id: int
+    version: int  # ETag, à renvoyer dans If-Match
     created_at: datetime
     updated_at: datetime
     status_display: Optional[str] = None
@@ -71,6 +72,17 @@ class EquipmentWithRelations(EquipmentResponse):
     class Config:
         from_attributes = True
 
+# Schéma pour l'historique des statuts
+class EquipmentStatusChangeResponse(BaseModel):
+    id: int
+    equipment_id: int
+    status: str
+    previous_status: Optional[str] = None  # None : création de l'équipement
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
 # Schéma pour les filtres de recherche
 class EquipmentFilter(BaseModel):
     site_id: Optional[int] = None
@@ -0,0 +1,105 @@
+# Schémas pour le stock de pièces détachées
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+class StockMovementType(str, Enum):
+    RECEIPT = "receipt"
+    CONSUMPTION = "consumption"
+    ADJUSTMENT = "adjustment"
+    RETURN = "return"
+
+# Schémas pour Part
+class PartBase(BaseModel):
+    reference: str
+    name: str
+    description: Optional[str] = None
+    manufacturer: Optional[str] = None
+    unit: str = "unit"
+    unit_cost: Optional[int] = None  # en centimes d'euro
+    lead_time_days: Optional[int] = None
+    is_active: bool = True
+
+class PartCreate(PartBase):
+    initial_quantity: int = Field(0, ge=0)
+    min_quantity: int = Field(0, ge=0)
+
+class PartUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    manufacturer: Optional[str] = None
+    unit: Optional[str] = None
+    unit_cost: Optional[int] = None
+    lead_time_days: Optional[int] = None
+    is_active: Optional[bool] = None
+    min_quantity: Optional[int] = Field(None, ge=0)
+
+class PartResponse(PartBase):
+    id: int
+    quantity: int = 0
+    min_quantity: int = 0
+    reorder_point: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# Schémas pour StockMovement
+class StockReceipt(BaseModel):
+    quantity: int = Field(..., gt=0)
+    unit_cost: Optional[int] = None
+    notes: Optional[str] = None
+
+class StockAdjustment(BaseModel):
+    quantity: int  # variation signée
+    notes: Optional[str] = None
+
+class StockMovementResponse(BaseModel):
+    id: int
+    part_id: int
+    movement_type: StockMovementType
+    quantity: int
+    balance_after: int
+    unit_cost: Optional[int] = None
+    intervention_id: Optional[int] = None
+    user_id: Optional[int] = None
+    notes: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# Schémas pour les alertes de stock
+class StockAlertResponse(BaseModel):
+    part_id: int
+    reference: str
+    name: str
+    quantity: int
+    threshold: int
+    triggered_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ReorderPointsResult(BaseModel):
+    updated: int
+    alerts: int
+
+# Schémas pour MaintenancePartUsed
+class PartConsumption(BaseModel):
+    part_id: int
+    quantity: int = Field(..., gt=0)
+
+class MaintenancePartUsedResponse(BaseModel):
+    id: int
+    intervention_id: int
+    part_id: int
+    quantity_used: int
+    unit_cost: Optional[int] = None
+    total_cost: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -89,6 +89,7 @@ class MaintenancePlanUpdate(BaseModel):
 
 class MaintenancePlanResponse(MaintenancePlanBase):
     id: int
+    version: int  # ETag, à renvoyer dans If-Match
     next_due_date: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
@@ -187,6 +188,7 @@ class MaintenanceInterventionUpdate(BaseModel):
 
 class MaintenanceInterventionResponse(MaintenanceInterventionBase):
     id: int
+    version: int  # ETag, à renvoyer dans If-Match
     scheduled_maintenance_id: Optional[int] = None
     actual_start_time: Optional[datetime] = None
     actual_end_time: Optional[datetime] = None
@@ -220,6 +222,28 @@ class MaintenanceStats(BaseModel):
     mttr: float
     mtbf: float
 
+# Schémas pour la file de travail des techniciens
+class WorkQueueItem(BaseModel):
+    kind: str  # intervention, scheduled
+    id: int
+    technician_id: Optional[int]
+    status: str
+    priority: MaintenancePriority
+    maintenance_type: Optional[MaintenanceType]
+    due_date: datetime
+    equipment_id: int
+    equipment_name: str
+    criticality: str
+    production_line_id: Optional[int]
+    stops_line: bool  # son arrêt seul arrête la ligne
+    overdue_hours: float  # négatif : pas encore dû
+    score: float  # poids (en heures) + heures de retard
+
+class WorkQueueResponse(BaseModel):
+    technician_id: Optional[int]  # None : maintenances non assignées
+    total: int
+    items: List[WorkQueueItem]
+
 # Schémas pour les événements du calendrier
 class CalendarEvent(BaseModel):
     id: str
@@ -1,6 +1,6 @@
 # Schémas pour les lignes de production
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class ProductionLineBase(BaseModel):
@@ -30,3 +30,42 @@ class ProductionLineWithRelations(ProductionLineResponse):
 
     class Config:
         from_attributes = True
+
+# Graphe de flux et impact des arrêts
+class DependencyEdge(BaseModel):
+    upstream_id: int
+    downstream_id: int
+
+class DependencyGraphUpdate(BaseModel):
+    edges: List[DependencyEdge]
+
+class LineGraphNode(BaseModel):
+    equipment_id: int
+    name: str
+    status: str
+    up: bool  # l'équipement lui-même est en marche
+    fed: bool  # au moins un amont produit (ou pas d'amont)
+    producing: bool
+
+class LineGraphResponse(BaseModel):
+    line_id: int
+    running: bool
+    nodes: List[LineGraphNode]
+    edges: List[DependencyEdge]
+
+class EquipmentImpact(BaseModel):
+    equipment_id: int
+    name: str
+    status: str
+    downtime_seconds: int  # arrêts propres, fusionnés
+    attributed_downtime_seconds: int  # arrêt de ligne évité sans ses arrêts
+    stops_line: bool  # son arrêt seul arrête la ligne
+
+class LineImpactResponse(BaseModel):
+    line_id: int
+    start: datetime
+    end: datetime
+    period_seconds: int
+    line_downtime_seconds: int
+    availability_percent: float
+    equipment: List[EquipmentImpact]
@@ -0,0 +1,76 @@
+# Schémas pour la synchronisation des tablettes hors ligne
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class SyncEquipment(BaseModel):
+    id: int
+    name: str
+    model: Optional[str] = None
+    serial_number: Optional[str] = None
+    manufacturer: Optional[str] = None
+    site_id: Optional[int] = None
+    production_line_id: Optional[int] = None
+    status: str
+    criticality: str
+    version: int
+    updated_at: datetime
+
+class SyncScheduledMaintenance(BaseModel):
+    id: int
+    equipment_id: int
+    maintenance_plan_id: int
+    scheduled_date: datetime
+    estimated_start_time: str
+    estimated_end_time: str
+    status: str
+    priority: str
+    notes: Optional[str] = None
+    updated_at: datetime
+
+class SyncIntervention(BaseModel):
+    id: int
+    equipment_id: int
+    scheduled_maintenance_id: Optional[int] = None
+    maintenance_type: str
+    status: str
+    priority: str
+    scheduled_date: Optional[datetime] = None
+    actual_start_time: Optional[datetime] = None
+    actual_end_time: Optional[datetime] = None
+    description: str
+    work_performed: Optional[str] = None
+    issues_found: Optional[str] = None
+    recommendations: Optional[str] = None
+    version: int
+    updated_at: datetime
+
+class SyncTask(BaseModel):
+    id: int
+    intervention_id: int
+    name: str
+    description: Optional[str] = None
+    is_completed: bool
+    completion_notes: Optional[str] = None
+    completed_at: Optional[datetime] = None
+    order: int
+    updated_at: datetime
+
+class SyncChanges(BaseModel):
+    equipment: List[SyncEquipment] = []
+    scheduled: List[SyncScheduledMaintenance] = []
+    interventions: List[SyncIntervention] = []
+    tasks: List[SyncTask] = []
+
+class SyncDeletions(BaseModel):
+    # Identifiants supprimés, ou sortis du périmètre du technicien
+    equipment: List[int] = []
+    scheduled: List[int] = []
+    interventions: List[int] = []
+    tasks: List[int] = []
+
+class SyncPage(BaseModel):
+    next_token: str  # à renvoyer tel quel à la requête suivante
+    has_more: bool  # True : d'autres pages de la même passe suivent
+    changes: SyncChanges
+    deleted: SyncDeletions
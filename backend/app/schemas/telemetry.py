@@ -0,0 +1,48 @@
+# Schémas pour la télémétrie des équipements
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+from enum import Enum
+
+class Resolution(str, Enum):
+    RAW = "raw"
+    MINUTE = "1m"
+    HOUR = "1h"
+    DAY = "1d"
+
+class IngestionResult(BaseModel):
+    accepted: int  # mesures valides reçues
+    inserted: int  # mesures écrites (hors doublons)
+    equipment: int  # équipements concernés
+    anomalies: int = 0  # anomalies détectées dans le lot
+    interventions: List[int] = []  # interventions prédictives ouvertes
+
+class SensorReadingResponse(BaseModel):
+    equipment_id: int
+    metric: str
+    recorded_at: datetime
+    value: float
+
+    class Config:
+        from_attributes = True
+
+class DetectorStats(BaseModel):
+    series: int
+    observed: int
+    detected: int
+    memory_bytes: int
+
+class SeriesPoint(BaseModel):
+    bucket: datetime  # début de l'intervalle (instant de la mesure pour raw)
+    mean: float
+    min: float
+    max: float
+    count: int
+
+class SeriesResponse(BaseModel):
+    equipment_id: int
+    metric: str
+    resolution: Resolution
+    start: datetime
+    end: datetime
+    points: List[SeriesPoint]
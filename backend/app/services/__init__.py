@@ -0,0 +1 @@
+# Logique métier partagée entre les endpoints et les scripts
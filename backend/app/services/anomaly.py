@@ -0,0 +1,273 @@
+# Détection d'anomalies en continu sur la télémétrie des équipements
+import math
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.changes import record_change
+from ..core.config import settings
+from ..core.events import equipment_event
+from ..models.equipment import Equipment
+from ..models.maintenance import MaintenanceIntervention
+
+# Écart-type en dessous duquel une série est considérée comme constante
+EPSILON = 1e-9
+
+OPEN_STATUSES = ("pending", "assigned", "in_progress")
+
+class Anomaly(NamedTuple):
+    equipment_id: int
+    metric: str
+    recorded_at: datetime
+    value: float
+    score: float  # plus grand |z| observé (fenêtre glissante ou EWMA)
+    reasons: Tuple[str, ...]  # "zscore", "ewma", "rate"
+
+class AnomalyDetector:
+    """Statistiques glissantes par couple (équipement, métrique).
+
+    L'état de toutes les séries tient dans quelques tableaux NumPy
+    préalloués (une ligne par série) : tampon circulaire des dernières
+    valeurs avec somme et somme des carrés tenues à jour, moyenne et
+    variance exponentielles (EWMA), dernière valeur et son instant.
+    Chaque mesure est traitée en O(1), quel que soit l'historique.
+
+    Une anomalie est signalée quand |z| (fenêtre ou EWMA) ou la vitesse de
+    variation dépasse son seuil pendant `consecutive` mesures d'affilée,
+    une seule fois par dépassement. L'état est propre au worker.
+    """
+
+    def __init__(
+        self,
+        window: int = 120,
+        alpha: float = 0.05,
+        z_threshold: float = 4.0,
+        min_samples: int = 30,
+        consecutive: int = 3,
+        rate_limits: Optional[Dict[str, float]] = None,
+        initial_capacity: int = 256
+    ):
+        self.window = window
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_samples = max(min_samples, 2)
+        self.consecutive = max(consecutive, 1)
+        self.rate_limits = rate_limits or {}
+        self.observed = 0
+        self.detected = 0
+        self._lock = threading.Lock()
+        self._slots: Dict[Tuple[int, str], int] = {}
+        self._capacity = 0
+        self._resize(initial_capacity)
+
+    def _resize(self, capacity: int) -> None:
+        """Agrandir les tableaux d'état (doublement : coût amorti constant)"""
+        def grow(name, shape, dtype):
+            array = np.zeros(shape, dtype=dtype)
+            previous = getattr(self, name, None)
+            if previous is not None:
+                array[:len(previous)] = previous
+            setattr(self, name, array)
+
+        grow("_buffer", (capacity, self.window), np.float64)
+        grow("_count", capacity, np.int64)
+        grow("_head", capacity, np.int64)
+        grow("_total", capacity, np.float64)
+        grow("_total_sq", capacity, np.float64)
+        grow("_ewma", capacity, np.float64)
+        grow("_ewvar", capacity, np.float64)
+        grow("_last_value", capacity, np.float64)
+        grow("_last_time", capacity, np.float64)
+        grow("_hits", capacity, np.int64)
+        self._capacity = capacity
+
+    def _slot(self, key: Tuple[int, str]) -> int:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._slots)
+            if slot >= self._capacity:
+                self._resize(self._capacity * 2)
+            self._slots[key] = slot
+        return slot
+
+    @property
+    def series_count(self) -> int:
+        return len(self._slots)
+
+    def observe(self, equipment_id: int, metric: str, recorded_at: datetime, value: float) -> Optional[Anomaly]:
+        """Intégrer une mesure ; renvoie l'anomalie si le seuil vient d'être franchi"""
+        slot = self._slot((equipment_id, metric))
+        timestamp = recorded_at.replace(tzinfo=timezone.utc).timestamp()  # instants stockés en UTC
+        count = int(self._count[slot])
+        last_time = float(self._last_time[slot])
+        if count and timestamp <= last_time:
+            return None  # doublon ou mesure arrivée dans le désordre
+
+        anomaly = None
+        if count >= self.min_samples:
+            filled = min(count, self.window)
+            mean = self._total[slot] / filled
+            std = math.sqrt(max(self._total_sq[slot] / filled - mean * mean, 0.0))
+            ew_std = math.sqrt(self._ewvar[slot])
+            z_window = (value - mean) / std if std > EPSILON else 0.0
+            z_ewma = (value - self._ewma[slot]) / ew_std if ew_std > EPSILON else 0.0
+            rate = (value - self._last_value[slot]) / (timestamp - last_time)
+
+            reasons = []
+            if abs(z_window) >= self.z_threshold:
+                reasons.append("zscore")
+            if abs(z_ewma) >= self.z_threshold:
+                reasons.append("ewma")
+            rate_limit = self.rate_limits.get(metric)
+            if rate_limit is not None and abs(rate) > rate_limit:
+                reasons.append("rate")
+
+            if reasons:
+                self._hits[slot] += 1
+                if self._hits[slot] == self.consecutive:
+                    anomaly = Anomaly(
+                        equipment_id, metric, recorded_at, value,
+                        float(max(abs(z_window), abs(z_ewma))), tuple(reasons)
+                    )
+                    self.detected += 1
+            else:
+                self._hits[slot] = 0
+
+        # Tampon circulaire : la valeur la plus ancienne sort des sommes
+        head = int(self._head[slot])
+        if count >= self.window:
+            evicted = self._buffer[slot, head]
+            self._total[slot] -= evicted
+            self._total_sq[slot] -= evicted * evicted
+        self._buffer[slot, head] = value
+        self._total[slot] += value
+        self._total_sq[slot] += value * value
+        head = (head + 1) % self.window
+        self._head[slot] = head
+        if head == 0:
+            # Recalcul exact à chaque tour de tampon : pas de dérive d'arrondi
+            filled = min(count + 1, self.window)
+            self._total[slot] = self._buffer[slot, :filled].sum()
+            self._total_sq[slot] = np.square(self._buffer[slot, :filled]).sum()
+
+        # Moyenne et variance exponentielles, mises à jour incrémentalement
+        if count == 0:
+            self._ewma[slot] = value
+            self._ewvar[slot] = 0.0
+        else:
+            diff = value - self._ewma[slot]
+            increment = self.alpha * diff
+            self._ewma[slot] += increment
+            self._ewvar[slot] = (1 - self.alpha) * (self._ewvar[slot] + diff * increment)
+
+        self._last_value[slot] = value
+        self._last_time[slot] = timestamp
+        self._count[slot] = count + 1
+        self.observed += 1
+        return anomaly
+
+    def observe_batch(self, rows: Iterable[Tuple[int, str, datetime, float]]) -> List[Anomaly]:
+        """Intégrer un lot de mesures, remises dans l'ordre chronologique par série"""
+        anomalies = []
+        with self._lock:
+            for equipment_id, metric, recorded_at, value in sorted(rows):
+                anomaly = self.observe(equipment_id, metric, recorded_at, value)
+                if anomaly is not None:
+                    anomalies.append(anomaly)
+        return anomalies
+
+    def stats(self) -> dict:
+        return {
+            "series": self.series_count,
+            "observed": self.observed,
+            "detected": self.detected,
+            "memory_bytes": sum(
+                getattr(self, name).nbytes
+                for name in ("_buffer", "_count", "_head", "_total", "_total_sq",
+                             "_ewma", "_ewvar", "_last_value", "_last_time", "_hits")
+            )
+        }
+
+def open_predictive_interventions(
+    db: Session,
+    anomalies: List[Anomaly],
+    technician_id: int,
+    z_threshold: float
+) -> List[MaintenanceIntervention]:
+    """Ouvrir une intervention prédictive par équipement en anomalie.
+
+    Un équipement qui a déjà une intervention prédictive ouverte n'en
+    reçoit pas de nouvelle. Trois requêtes, quel que soit le nombre
+    d'anomalies.
+    """
+    by_equipment: Dict[int, List[Anomaly]] = {}
+    for anomaly in anomalies:
+        by_equipment.setdefault(anomaly.equipment_id, []).append(anomaly)
+    if not by_equipment:
+        return []
+
+    already_open = set(db.execute(
+        select(MaintenanceIntervention.equipment_id).where(
+            MaintenanceIntervention.equipment_id.in_(list(by_equipment)),
+            MaintenanceIntervention.maintenance_type == "predictive",
+            MaintenanceIntervention.status.in_(OPEN_STATUSES)
+        )
+    ).scalars())
+    equipment_ids = [equipment_id for equipment_id in by_equipment if equipment_id not in already_open]
+    if not equipment_ids:
+        return []
+    equipment_by_id = {
+        equipment.id: equipment
+        for equipment in db.query(Equipment).filter(Equipment.id.in_(equipment_ids))
+    }
+
+    interventions = []
+    for equipment_id in equipment_ids:
+        findings = by_equipment[equipment_id]
+        worst = max(findings, key=lambda anomaly: anomaly.score)
+        details = "\n".join(
+            f"- {anomaly.metric} = {anomaly.value:g} à {anomaly.recorded_at:%Y-%m-%d %H:%M:%S} "
+            f"(|z| = {anomaly.score:.1f}, {', '.join(anomaly.reasons)})"
+            for anomaly in findings
+        )
+        intervention = MaintenanceIntervention(
+            equipment_id=equipment_id,
+            technician_id=technician_id,
+            maintenance_type="predictive",
+            status="pending",
+            priority="high" if worst.score >= 2 * z_threshold else "medium",
+            description=f"Anomalie détectée automatiquement sur la télémétrie :\n{details}",
+            scheduled_date=datetime.now()
+        )
+        db.add(intervention)
+        interventions.append(intervention)
+    db.flush()
+
+    for intervention in interventions:
+        record_change(db, ("maintenance",), equipment_event(
+            "intervention.created",
+            equipment_by_id.get(intervention.equipment_id),
+            {
+                "id": intervention.id,
+                "equipment_id": intervention.equipment_id,
+                "technician_id": intervention.technician_id,
+                "status": intervention.status,
+                "priority": intervention.priority,
+                "maintenance_type": intervention.maintenance_type
+            },
+            technician_id=intervention.technician_id
+        ))
+    return interventions
+
+anomaly_detector = AnomalyDetector(
+    window=settings.ANOMALY_WINDOW,
+    alpha=settings.ANOMALY_EWMA_ALPHA,
+    z_threshold=settings.ANOMALY_Z_THRESHOLD,
+    min_samples=settings.ANOMALY_MIN_SAMPLES,
+    consecutive=settings.ANOMALY_CONSECUTIVE,
+    rate_limits=settings.ANOMALY_RATE_LIMITS
+)
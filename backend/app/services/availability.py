@@ -0,0 +1,145 @@
+# Disponibilité des équipements, lignes et sites à partir des arrêts
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.equipment import Equipment
+from ..models.maintenance import MaintenanceIntervention
+from ..models.production_line import ProductionLine
+from ..models.site import Site
+
+LEVELS = ("equipment", "production_line", "site")
+
+def to_seconds(moments) -> np.ndarray:
+    """Dates sans fuseau converties en secondes depuis l'epoch (conversion NumPy)"""
+    return np.array(moments, dtype="datetime64[s]").astype(np.int64)
+
+def merged_downtime(keys: np.ndarray, starts: np.ndarray, ends: np.ndarray, key_count: int) -> np.ndarray:
+    """Durée de l'union des intervalles [start, end) de chaque clé.
+
+    Tri puis balayage, entièrement vectorisés : les fins sont décalées de
+    clé x étendue pour qu'un seul maximum cumulé (np.maximum.accumulate)
+    suffise à toutes les clés. Un intervalle ouvre un nouveau bloc quand il
+    commence après la fin la plus lointaine déjà vue ; chaque bloc fusionné
+    n'est compté qu'une fois. Les bornes doivent être des entiers >= 0.
+    """
+    if not len(keys):
+        return np.zeros(key_count, dtype=np.int64)
+
+    span = int(ends.max()) + 1
+    order = np.lexsort((starts, keys))
+    keys, starts, ends = keys[order], starts[order], ends[order]
+    offset = keys * span
+    shifted_ends = ends + offset
+    reach = np.maximum.accumulate(shifted_ends)
+
+    new_block = np.ones(len(keys), dtype=bool)
+    new_block[1:] = starts[1:] + offset[1:] > reach[:-1]
+    block_starts = np.flatnonzero(new_block)
+    block_ends = np.maximum.reduceat(shifted_ends, block_starts) - offset[block_starts]
+    return np.bincount(
+        keys[block_starts], weights=block_ends - starts[block_starts], minlength=key_count
+    ).astype(np.int64)
+
+def compute_availability(
+    db: Session,
+    level: str,
+    start: datetime,
+    end: datetime,
+    site_id: Optional[int] = None,
+    production_line_id: Optional[int] = None
+) -> List[dict]:
+    """Disponibilité sur [start, end) par équipement, ligne ou site.
+
+    L'arrêt d'une ligne ou d'un site est l'union des arrêts de ses
+    équipements : deux équipements arrêtés en même temps ne comptent
+    qu'une fois. equipment_availability est la moyenne des disponibilités
+    des équipements du groupe. Un arrêt sans fin court jusqu'à maintenant.
+    """
+    site = func.coalesce(Equipment.site_id, ProductionLine.site_id)
+    criteria = []
+    if site_id is not None:
+        criteria.append(site == site_id)
+    if production_line_id is not None:
+        criteria.append(Equipment.production_line_id == production_line_id)
+
+    equipment_rows = db.execute(
+        select(
+            Equipment.id,
+            Equipment.name,
+            Equipment.production_line_id,
+            ProductionLine.name,
+            site,
+            Site.name
+        )
+        .outerjoin(ProductionLine, ProductionLine.id == Equipment.production_line_id)
+        .outerjoin(Site, Site.id == site)
+        .where(*criteria)
+        .order_by(Equipment.id)
+    ).all()
+    if not equipment_rows:
+        return []
+
+    now = datetime.now()
+    downtime_end = func.coalesce(MaintenanceIntervention.downtime_end, now)
+    downtimes = db.execute(
+        select(MaintenanceIntervention.equipment_id, MaintenanceIntervention.downtime_start, downtime_end)
+        .join(Equipment, Equipment.id == MaintenanceIntervention.equipment_id)
+        .outerjoin(ProductionLine, ProductionLine.id == Equipment.production_line_id)
+        .where(
+            *criteria,
+            MaintenanceIntervention.downtime_start.isnot(None),
+            MaintenanceIntervention.downtime_start < end,
+            downtime_end > start
+        )
+    ).all()
+
+    equipment_ids = np.array([row[0] for row in equipment_rows], dtype=np.int64)
+    period = int(to_seconds([end])[0] - to_seconds([start])[0])
+
+    # Bornes ramenées à la période, en secondes depuis son début
+    if downtimes:
+        interval_equipment, starts, ends = zip(*downtimes)
+        origin = to_seconds([start])[0]
+        starts = np.clip(to_seconds(starts) - origin, 0, period)
+        ends = np.clip(to_seconds(ends) - origin, 0, period)
+        positions = np.searchsorted(equipment_ids, np.asarray(interval_equipment, dtype=np.int64))
+        keep = ends > starts
+        positions, starts, ends = positions[keep], starts[keep], ends[keep]
+    else:
+        positions = starts = ends = np.empty(0, dtype=np.int64)
+
+    if level == "equipment":
+        groups = np.arange(len(equipment_rows))
+        labels = [(row[0], row[1]) for row in equipment_rows]
+    else:
+        id_column, name_column = (2, 3) if level == "production_line" else (4, 5)
+        group_ids = np.array([row[id_column] if row[id_column] is not None else -1 for row in equipment_rows])
+        unique_ids, first, groups = np.unique(group_ids, return_index=True, return_inverse=True)
+        labels = [
+            (int(group_id) if group_id >= 0 else None, equipment_rows[index][name_column])
+            for group_id, index in zip(unique_ids, first)
+        ]
+    group_count = len(labels)
+
+    equipment_downtime = merged_downtime(positions, starts, ends, len(equipment_rows))
+    group_downtime = merged_downtime(groups[positions], starts, ends, group_count)
+    equipment_count = np.bincount(groups, minlength=group_count)
+    summed_downtime = np.bincount(groups, weights=equipment_downtime, minlength=group_count)
+
+    availability = 100.0 * (1 - group_downtime / period)
+    equipment_availability = 100.0 * (1 - summed_downtime / (equipment_count * period))
+    return [
+        {
+            "id": group_id,
+            "name": name,
+            "equipment": int(equipment_count[index]),
+            "downtime_seconds": int(group_downtime[index]),
+            "availability_percent": round(float(availability[index]), 3),
+            "equipment_availability_percent": round(float(equipment_availability[index]), 3)
+        }
+        for index, (group_id, name) in enumerate(labels)
+    ]
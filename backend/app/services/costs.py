@@ -0,0 +1,54 @@
+# Calcul des coûts des interventions
+from sqlalchemy import Integer, cast, func, select, update
+from sqlalchemy.orm import Session
+
+from ..models.maintenance import MaintenanceIntervention, MaintenancePartUsed
+from ..models.user import User
+
+def _duration_seconds(dialect_name: str):
+    """Durée réelle de l'intervention en secondes, selon le moteur SQL"""
+    start = MaintenanceIntervention.actual_start_time
+    end = MaintenanceIntervention.actual_end_time
+    if dialect_name == "postgresql":
+        return func.extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400
+
+def rollup_costs(db: Session, criteria: list, default_labor_rate: int) -> int:
+    """Calculer main-d'œuvre, pièces et total en un seul UPDATE agrégé.
+
+    Les pièces sont la somme de maintenance_parts_used, la main-d'œuvre la
+    durée réelle multipliée par le taux horaire du technicien (ou le taux
+    par défaut). Sans heure de début ou de fin, la main-d'œuvre reste vide.
+    """
+    parts_cost = func.coalesce(
+        select(func.sum(MaintenancePartUsed.total_cost))
+        .where(MaintenancePartUsed.intervention_id == MaintenanceIntervention.id)
+        .scalar_subquery(),
+        0
+    )
+    hourly_rate = func.coalesce(
+        select(User.hourly_rate)
+        .where(User.id == MaintenanceIntervention.technician_id)
+        .scalar_subquery(),
+        default_labor_rate
+    )
+    labor_cost = cast(
+        func.round(_duration_seconds(db.get_bind().dialect.name) * hourly_rate / 3600.0),
+        Integer
+    )
+
+    # Lignes comptées via RETURNING : rowcount n'est pas fiable avec RETURNING (journal d'audit)
+    return len(db.execute(
+        update(MaintenanceIntervention)
+        .where(*criteria)
+        .values(
+            parts_cost=parts_cost,
+            labor_cost=labor_cost,
+            total_cost=parts_cost + func.coalesce(labor_cost, 0),
+            updated_at=func.now(),
+            # Nouvelle version : les ETag déjà servis ne correspondent plus
+            version=MaintenanceIntervention.version + 1
+        )
+        .returning(MaintenanceIntervention.id)
+        .execution_options(synchronize_session=False)
+    ).all())
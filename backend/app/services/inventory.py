@@ -0,0 +1,220 @@
+# Mouvements de stock des pièces détachées
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..core.changes import record_change
+from ..core.events import Event
+from ..models.inventory import Part, PartStock, StockAlert, StockMovement, StockMovementType
+from ..models.maintenance import MaintenancePartUsed
+
+def alert_threshold():
+    """Seuil d'alerte : le plus grand du stock minimum et du point de commande"""
+    return case(
+        (PartStock.min_quantity >= PartStock.reorder_point, PartStock.min_quantity),
+        else_=PartStock.reorder_point
+    )
+
+def apply_stock_movement(
+    db: Session,
+    part_id: int,
+    quantity: int,
+    movement_type: StockMovementType,
+    unit_cost: Optional[int] = None,
+    intervention_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    notes: Optional[str] = None
+) -> StockMovement:
+    """Appliquer une variation de stock et l'inscrire au journal.
+
+    La variation est un UPDATE conditionnel unique : la base verrouille la
+    ligne de stock jusqu'au commit et réévalue la condition après l'attente,
+    si bien que deux techniciens ne peuvent ni écraser la mise à jour de
+    l'autre ni faire passer le stock sous zéro.
+    """
+    statement = (
+        update(PartStock)
+        .where(PartStock.part_id == part_id)
+        .values(
+            quantity=PartStock.quantity + quantity,
+            version=PartStock.version + 1,
+            updated_at=func.now()
+        )
+        .returning(PartStock.quantity, alert_threshold())
+        .execution_options(synchronize_session=False)
+    )
+    if quantity < 0:
+        statement = statement.where(PartStock.quantity >= -quantity)
+
+    row = db.execute(statement).first()
+    if row is None:
+        if db.query(PartStock.id).filter(PartStock.part_id == part_id).first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Pièce non trouvée"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Stock insuffisant"
+        )
+    balance, threshold = row
+
+    movement = StockMovement(
+        part_id=part_id,
+        movement_type=movement_type,
+        quantity=quantity,
+        balance_after=balance,
+        unit_cost=unit_cost,
+        intervention_id=intervention_id,
+        user_id=user_id,
+        notes=notes
+    )
+    db.add(movement)
+    _sync_alert(db, part_id, balance, threshold)
+    return movement
+
+def _sync_alert(db: Session, part_id: int, balance: int, threshold: int) -> None:
+    """Mettre à jour l'alerte d'une pièce dans la transaction du mouvement.
+
+    Le verrou pris sur la ligne de stock sérialise les mouvements d'une
+    même pièce : l'alerte ne peut pas être modifiée en parallèle.
+    """
+    if threshold > 0 and balance <= threshold:
+        updated = db.execute(
+            update(StockAlert)
+            .where(StockAlert.part_id == part_id)
+            .values(quantity=balance, threshold=threshold, updated_at=func.now())
+            .returning(StockAlert.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if updated is None:
+            db.add(StockAlert(part_id=part_id, quantity=balance, threshold=threshold, triggered_at=datetime.now()))
+            record_change(db, ("parts",), Event("stock.low", {
+                "part_id": part_id,
+                "quantity": balance,
+                "threshold": threshold
+            }))
+    else:
+        db.execute(
+            delete(StockAlert)
+            .where(StockAlert.part_id == part_id)
+            .execution_options(synchronize_session=False)
+        )
+
+def refresh_stock_alerts(db: Session, part_ids: Optional[Iterable[int]] = None) -> None:
+    """Recalculer les alertes en trois requêtes ensemblistes (après un changement de seuils)"""
+    threshold = alert_threshold()
+    scope = [PartStock.part_id.in_(list(part_ids))] if part_ids is not None else []
+    low = [threshold > 0, PartStock.quantity <= threshold]
+    low_parts = select(PartStock.part_id).where(*scope, *low)
+
+    db.execute(
+        delete(StockAlert)
+        .where(
+            StockAlert.part_id.in_(select(PartStock.part_id).where(*scope)),
+            StockAlert.part_id.not_in(low_parts)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(StockAlert)
+        .values(
+            quantity=select(PartStock.quantity).where(PartStock.part_id == StockAlert.part_id).scalar_subquery(),
+            threshold=select(threshold).where(PartStock.part_id == StockAlert.part_id).scalar_subquery()
+        )
+        .where(StockAlert.part_id.in_(low_parts))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        insert(StockAlert).from_select(
+            ["part_id", "quantity", "threshold", "triggered_at"],
+            select(PartStock.part_id, PartStock.quantity, threshold, func.now())
+            .where(*scope, *low, PartStock.part_id.not_in(select(StockAlert.part_id)))
+        )
+    )
+
+def compute_reorder_points(
+    db: Session,
+    history_days: int,
+    default_lead_time_days: int,
+    service_level_z: float
+) -> Dict[int, int]:
+    """Points de commande à partir des consommations journalières.
+
+    ROP = demande moyenne × délai + z × écart-type journalier × √délai,
+    les jours sans consommation comptant pour zéro.
+    """
+    since = datetime.now() - timedelta(days=history_days)
+    day = func.date(MaintenancePartUsed.created_at)
+    daily_usage = db.execute(
+        select(MaintenancePartUsed.part_id, func.sum(MaintenancePartUsed.quantity_used))
+        .where(MaintenancePartUsed.created_at >= since)
+        .group_by(MaintenancePartUsed.part_id, day)
+    )
+
+    totals = defaultdict(int)
+    squares = defaultdict(int)
+    for part_id, used in daily_usage:
+        totals[part_id] += used
+        squares[part_id] += used * used
+
+    lead_times = dict(db.execute(select(Part.id, Part.lead_time_days).where(Part.id.in_(list(totals)))).all())
+    reorder_points = {}
+    for part_id, total in totals.items():
+        mean = total / history_days
+        variance = max(squares[part_id] / history_days - mean * mean, 0.0)
+        lead_time = lead_times.get(part_id) or default_lead_time_days
+        reorder_points[part_id] = math.ceil(mean * lead_time + service_level_z * math.sqrt(variance * lead_time))
+    return reorder_points
+
+def update_reorder_points(
+    db: Session,
+    history_days: int,
+    default_lead_time_days: int,
+    service_level_z: float
+) -> int:
+    """Enregistrer les points de commande modifiés et recalculer les alertes"""
+    reorder_points = compute_reorder_points(db, history_days, default_lead_time_days, service_level_z)
+    current = db.execute(select(PartStock.part_id, PartStock.reorder_point)).all()
+    changes = {
+        part_id: reorder_points.get(part_id, 0)
+        for part_id, reorder_point in current
+        if reorder_points.get(part_id, 0) != reorder_point
+    }
+    if changes:
+        # Un seul UPDATE (pas d'executemany) : relevé par le journal d'audit via RETURNING
+        db.execute(
+            update(PartStock)
+            .where(PartStock.part_id.in_(list(changes)))
+            .values(reorder_point=case(changes, value=PartStock.part_id))
+            .execution_options(synchronize_session=False)
+        )
+        refresh_stock_alerts(db, list(changes))
+    return len(changes)
+
+def consume_part(
+    db: Session,
+    intervention_id: int,
+    part_id: int,
+    quantity: int,
+    user_id: Optional[int] = None
+) -> MaintenancePartUsed:
+    """Sortir des pièces du stock pour une intervention, au coût unitaire courant"""
+    unit_cost = db.query(Part.unit_cost).filter(Part.id == part_id).scalar()
+    apply_stock_movement(
+        db, part_id, -quantity, StockMovementType.CONSUMPTION,
+        unit_cost=unit_cost, intervention_id=intervention_id, user_id=user_id
+    )
+    part_used = MaintenancePartUsed(
+        intervention_id=intervention_id,
+        part_id=part_id,
+        quantity_used=quantity,
+        unit_cost=unit_cost,
+        total_cost=unit_cost * quantity if unit_cost is not None else None
+    )
+    db.add(part_used)
+    return part_used
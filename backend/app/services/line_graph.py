@@ -0,0 +1,332 @@
+# Graphe de flux des lignes de production et propagation des arrêts
+import heapq
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..core.changes import on_change
+from ..models.equipment import Equipment
+from ..models.maintenance import MaintenanceIntervention
+from ..models.production_line import EquipmentDependency
+from .availability import merged_downtime, to_seconds
+
+# Statuts d'équipement qui interrompent le flux
+DOWN_STATUSES = ("maintenance", "broken")
+
+class LineGraph:
+    """Structure d'une ligne : listes d'adjacence et rang topologique.
+
+    La ligne produit quand tous ses équipements terminaux (sans aval)
+    produisent : sans dépendance déclarée, tous les équipements sont
+    terminaux et donc en série.
+    """
+
+    def __init__(self, equipment: Iterable[Tuple[int, str, str]], edges: Iterable[Tuple[int, int]]):
+        equipment = list(equipment)
+        self.nodes = [row[0] for row in equipment]
+        self.names = [row[1] for row in equipment]
+        self.statuses = [row[2] for row in equipment]
+        self.index = {equipment_id: position for position, equipment_id in enumerate(self.nodes)}
+        self.predecessors: List[List[int]] = [[] for _ in self.nodes]
+        self.successors: List[List[int]] = [[] for _ in self.nodes]
+        self.edges = []
+        for upstream_id, downstream_id in edges:
+            upstream, downstream = self.index.get(upstream_id), self.index.get(downstream_id)
+            if upstream is None or downstream is None:
+                continue  # équipement sorti de la ligne depuis
+            self.successors[upstream].append(downstream)
+            self.predecessors[downstream].append(upstream)
+            self.edges.append((upstream_id, downstream_id))
+        self.rank = self._topological_rank()
+        self.sinks = [node for node in range(len(self.nodes)) if not self.successors[node]]
+
+    def _topological_rank(self) -> List[int]:
+        """Rang de chaque nœud dans un ordre topologique (Kahn) ; ValueError si cycle"""
+        remaining = [len(predecessors) for predecessors in self.predecessors]
+        ready = [node for node, count in enumerate(remaining) if count == 0]
+        rank = [0] * len(self.nodes)
+        position = 0
+        while ready:
+            node = ready.pop()
+            rank[node] = position
+            position += 1
+            for successor in self.successors[node]:
+                remaining[successor] -= 1
+                if remaining[successor] == 0:
+                    ready.append(successor)
+        if position != len(self.nodes):
+            raise ValueError("Les dépendances forment un cycle")
+        return rank
+
+    def state(self, down: Iterable[int] = ()) -> "GraphState":
+        return GraphState(self, down)
+
+class GraphState:
+    """État de marche d'une ligne, réévalué incrémentalement.
+
+    Un équipement produit s'il est en marche et alimenté (sans amont, ou au
+    moins un amont qui produit). Quand un équipement change d'état, seuls
+    ses descendants dont l'état change sont réévalués, dans l'ordre
+    topologique (tas indexé par rang).
+    """
+
+    def __init__(self, graph: LineGraph, down: Iterable[int] = ()):
+        self.graph = graph
+        self.up = [True] * len(graph.nodes)
+        for node in down:
+            self.up[node] = False
+        self.effective = [False] * len(graph.nodes)
+        for node in sorted(range(len(graph.nodes)), key=graph.rank.__getitem__):
+            self.effective[node] = self._evaluate(node)
+        self.running_sinks = sum(1 for node in graph.sinks if self.effective[node])
+
+    def _evaluate(self, node: int) -> bool:
+        return self.up[node] and self.fed(node)
+
+    def fed(self, node: int) -> bool:
+        predecessors = self.graph.predecessors[node]
+        return not predecessors or any(self.effective[predecessor] for predecessor in predecessors)
+
+    @property
+    def running(self) -> bool:
+        return self.running_sinks == len(self.graph.sinks)
+
+    def set_up(self, node: int, up: bool) -> int:
+        """Changer l'état propre d'un équipement ; renvoie le nombre de nœuds réévalués"""
+        if self.up[node] == up:
+            return 0
+        self.up[node] = up
+
+        graph = self.graph
+        heap = [(graph.rank[node], node)]
+        queued = {node}
+        evaluated = 0
+        while heap:
+            _, current = heapq.heappop(heap)
+            evaluated += 1
+            value = self._evaluate(current)
+            if value == self.effective[current]:
+                continue  # rien ne change en aval
+            self.effective[current] = value
+            if not graph.successors[current]:
+                self.running_sinks += 1 if value else -1
+            for successor in graph.successors[current]:
+                if successor not in queued:
+                    queued.add(successor)
+                    heapq.heappush(heap, (graph.rank[successor], successor))
+        return evaluated
+
+class LineGraphCache:
+    """Graphes des lignes gardés en mémoire, avec leur état de marche courant.
+
+    Construit à la première demande ; un changement de statut d'équipement
+    est appliqué incrémentalement, un changement de structure (dépendances,
+    équipements ajoutés, déplacés ou supprimés) écarte les graphes.
+    """
+
+    def __init__(self):
+        self._states: Dict[int, GraphState] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def _build(self, db: Session, line_id: int) -> GraphState:
+        equipment = db.execute(
+            select(Equipment.id, Equipment.name, Equipment.status)
+            .where(Equipment.production_line_id == line_id)
+            .order_by(Equipment.id)
+        ).all()
+        edges = db.execute(
+            select(EquipmentDependency.upstream_id, EquipmentDependency.downstream_id)
+            .where(EquipmentDependency.production_line_id == line_id)
+        ).all()
+        graph = LineGraph(equipment, edges)
+        return graph.state(node for node, row in enumerate(equipment) if row[2] in DOWN_STATUSES)
+
+    def get(self, db: Session, line_id: int) -> GraphState:
+        with self._lock:
+            state = self._states.get(line_id)
+            version = self._version
+        if state is not None:
+            return state
+        state = self._build(db, line_id)
+        with self._lock:
+            # Un changement survenu pendant la construction la rend peut-être obsolète
+            if self._version == version:
+                state = self._states.setdefault(line_id, state)
+        return state
+
+    def snapshot(self, db: Session, line_id: int) -> dict:
+        """Copie cohérente de l'état d'une ligne"""
+        state = self.get(db, line_id)
+        with self._lock:
+            graph = state.graph
+            return {
+                "line_id": line_id,
+                "running": state.running,
+                "nodes": [
+                    {
+                        "equipment_id": equipment_id,
+                        "name": graph.names[node],
+                        "status": graph.statuses[node],
+                        "up": state.up[node],
+                        "fed": state.fed(node),
+                        "producing": state.effective[node]
+                    }
+                    for node, equipment_id in enumerate(graph.nodes)
+                ],
+                "edges": [
+                    {"upstream_id": upstream_id, "downstream_id": downstream_id}
+                    for upstream_id, downstream_id in graph.edges
+                ]
+            }
+
+    def apply_status(self, line_id: Optional[int], equipment_id: int, equipment_status: str) -> None:
+        with self._lock:
+            self._version += 1
+            state = self._states.get(line_id)
+            if state is None:
+                return
+            node = state.graph.index.get(equipment_id)
+            if node is None:
+                del self._states[line_id]
+                return
+            state.graph.statuses[node] = equipment_status
+            state.set_up(node, equipment_status not in DOWN_STATUSES)
+
+    def invalidate(self, line_id: Optional[int] = None) -> None:
+        with self._lock:
+            self._version += 1
+            if line_id is None:
+                self._states.clear()
+            else:
+                self._states.pop(line_id, None)
+
+line_graphs = LineGraphCache()
+
+@on_change
+def _track_line_changes(tags: tuple, change_event) -> None:
+    if "production_lines" in tags:
+        line_graphs.invalidate()
+    elif change_event is not None and change_event.type == "equipment.status":
+        line_graphs.apply_status(
+            change_event.production_line_id, change_event.data["id"], change_event.data["status"]
+        )
+    elif "equipment" in tags:
+        line_graphs.invalidate()
+
+def validate_graph(equipment_ids: List[int], edges: List[Tuple[int, int]]) -> None:
+    """Vérifier qu'un jeu de dépendances est utilisable pour la ligne"""
+    known = set(equipment_ids)
+    for upstream_id, downstream_id in edges:
+        if upstream_id == downstream_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"L'équipement {upstream_id} ne peut dépendre de lui-même"
+            )
+        if upstream_id not in known or downstream_id not in known:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Dépendance {upstream_id} -> {downstream_id} : équipement hors de la ligne"
+            )
+    if len(set(edges)) != len(edges):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Dépendance en double")
+    try:
+        LineGraph(((equipment_id, "", "") for equipment_id in equipment_ids), edges)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def _line_downtime(graph: LineGraph, events: List[Tuple[int, int, int]], period: int, excluded: Optional[int] = None) -> int:
+    """Durée d'arrêt de la ligne en rejouant les débuts et fins d'arrêt dans l'ordre.
+
+    Entre deux instants consécutifs l'état est constant ; chaque événement
+    ne réévalue que la partie du graphe concernée.
+    """
+    state = graph.state()
+    down_counts = [0] * len(graph.nodes)
+    downtime = 0
+    previous = 0
+    for moment, delta, node in events:
+        if moment != previous:
+            if not state.running:
+                downtime += moment - previous
+            previous = moment
+        if node == excluded:
+            continue
+        down_counts[node] += delta
+        state.set_up(node, down_counts[node] == 0)
+    if not state.running:
+        downtime += period - previous
+    return downtime
+
+def line_impact(db: Session, line_id: int, start: datetime, end: datetime) -> dict:
+    """Arrêt effectif de la ligne et impact de chaque équipement sur [start, end).
+
+    L'impact d'un équipement est l'arrêt de ligne qui aurait été évité sans
+    ses propres arrêts (rejeu du graphe sans lui) ; stops_line indique si
+    son arrêt seul suffit à arrêter la ligne.
+    """
+    graph = line_graphs.get(db, line_id).graph
+    period = int(to_seconds([end])[0] - to_seconds([start])[0])
+
+    downtime_end = func.coalesce(MaintenanceIntervention.downtime_end, datetime.now())
+    rows = db.execute(
+        select(MaintenanceIntervention.equipment_id, MaintenanceIntervention.downtime_start, downtime_end)
+        .where(
+            MaintenanceIntervention.equipment_id.in_(graph.nodes),
+            MaintenanceIntervention.downtime_start.isnot(None),
+            MaintenanceIntervention.downtime_start < end,
+            downtime_end > start
+        )
+    ).all() if graph.nodes else []
+
+    if rows:
+        equipment_ids, starts, stops = zip(*rows)
+        origin = to_seconds([start])[0]
+        nodes = np.array([graph.index[equipment_id] for equipment_id in equipment_ids], dtype=np.int64)
+        begins = np.clip(to_seconds(starts) - origin, 0, period)
+        finishes = np.clip(to_seconds(stops) - origin, 0, period)
+        keep = finishes > begins
+        nodes, begins, finishes = nodes[keep], begins[keep], finishes[keep]
+    else:
+        nodes = begins = finishes = np.empty(0, dtype=np.int64)
+
+    # Fins avant débuts au même instant : deux arrêts bout à bout ne se chevauchent pas
+    events = sorted(
+        [(begin, 1, node) for begin, node in zip(begins.tolist(), nodes.tolist())]
+        + [(finish, -1, node) for finish, node in zip(finishes.tolist(), nodes.tolist())]
+    )
+    line_downtime = _line_downtime(graph, events, period)
+
+    own_downtime = merged_downtime(nodes, begins, finishes, len(graph.nodes))
+
+    probe = graph.state()
+    equipment = []
+    for node, equipment_id in enumerate(graph.nodes):
+        probe.set_up(node, False)
+        stops_line = not probe.running
+        probe.set_up(node, True)
+        attributed = line_downtime - _line_downtime(graph, events, period, excluded=node) if own_downtime[node] else 0
+        equipment.append({
+            "equipment_id": equipment_id,
+            "name": graph.names[node],
+            "status": graph.statuses[node],
+            "downtime_seconds": int(own_downtime[node]),
+            "attributed_downtime_seconds": int(attributed),
+            "stops_line": stops_line
+        })
+    equipment.sort(key=lambda row: (row["attributed_downtime_seconds"], row["stops_line"], row["downtime_seconds"]), reverse=True)
+
+    return {
+        "line_id": line_id,
+        "start": start,
+        "end": end,
+        "period_seconds": period,
+        "line_downtime_seconds": line_downtime,
+        "availability_percent": round(100.0 * (1 - line_downtime / period), 3) if period else 100.0,
+        "equipment": equipment
+    }
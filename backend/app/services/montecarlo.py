@@ -0,0 +1,89 @@
+# Noyau de simulation Monte Carlo des pannes (NumPy seul : importé par les processus de calcul)
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional
+
+import numpy as np
+
+def simulate_chunk(inputs: Dict[str, np.ndarray], seed: np.random.SeedSequence, runs: int, horizon: float) -> Dict[str, np.ndarray]:
+    """Simuler `runs` années (ou horizons) pour tous les équipements à la fois.
+
+    Chaque couple (tirage, équipement) suit un processus de renouvellement
+    de Weibull : une réparation ou une maintenance préventive remet
+    l'équipement à neuf. Une itération avance d'un événement tous les
+    couples encore actifs ; il y a autant d'itérations que d'événements
+    du couple le plus chargé, pas de boucle par équipement.
+
+    Renvoie, par tirage et par site, pannes, heures d'arrêt et coût correctif.
+    """
+    rng = np.random.default_rng(seed)
+    shape, scale, mttr = inputs["shape"], inputs["scale"], inputs["mttr"]
+    pm_interval, failure_cost, site = inputs["pm_interval"], inputs["failure_cost"], inputs["site"]
+    equipment_count = len(shape)
+
+    column = np.tile(np.arange(equipment_count), runs)
+    clock = np.zeros(runs * equipment_count)
+    next_pm = pm_interval[column].copy()  # inf sans plan de maintenance
+    failures = np.zeros(runs * equipment_count)
+    downtime = np.zeros(runs * equipment_count)
+
+    live = np.arange(runs * equipment_count)
+    while live.size:
+        equipment = column[live]
+        candidate = clock[live] + scale[equipment] * rng.weibull(shape[equipment])
+        repair = rng.exponential(mttr[equipment])
+        boundary = next_pm[live]
+
+        failed = (candidate < boundary) & (candidate < horizon)
+        renewed = ~failed & (boundary < horizon)
+        failed_at = live[failed]
+        failures[failed_at] += 1
+        downtime[failed_at] += np.minimum(repair[failed], horizon - candidate[failed])
+
+        now = np.where(failed, candidate + repair, np.where(renewed, boundary, horizon))
+        clock[live] = now
+
+        # Prochaine préventive après l'instant atteint (une réparation peut en chevaucher)
+        passed = boundary <= now
+        if passed.any():
+            interval = pm_interval[equipment[passed]]
+            skipped = np.floor((now[passed] - boundary[passed]) / interval) + 1
+            next_pm[live[passed]] = boundary[passed] + skipped * interval
+
+        live = live[now < horizon]
+
+    # Agrégation par site : produit matriciel avec l'indicatrice équipement -> site
+    membership = np.zeros((equipment_count, int(site.max()) + 1))
+    membership[np.arange(equipment_count), site] = 1.0
+    failures = failures.reshape(runs, equipment_count)
+    return {
+        "failures": failures @ membership,
+        "downtime_hours": downtime.reshape(runs, equipment_count) @ membership,
+        "corrective_cost": (failures * failure_cost) @ membership,
+    }
+
+def run_simulation(
+    inputs: Dict[str, np.ndarray],
+    runs: int,
+    horizon: float,
+    seed: Optional[int],
+    chunk_runs: int,
+    processes: int
+) -> Dict[str, np.ndarray]:
+    """Répartir les tirages en lots, éventuellement sur un pool de processus.
+
+    Chaque lot reçoit sa propre graine dérivée (SeedSequence.spawn) : à
+    graine et taille de lot égales, le résultat ne dépend pas du nombre
+    de processus.
+    """
+    sizes: List[int] = [min(chunk_runs, runs - offset) for offset in range(0, runs, chunk_runs)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if processes > 1 and len(sizes) > 1:
+        # spawn plutôt que fork : le worker web a des threads (pool SQL, écouteurs)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(processes, len(sizes)), mp_context=context) as pool:
+            chunks = list(pool.map(simulate_chunk, repeat(inputs), seeds, sizes, repeat(horizon)))
+    else:
+        chunks = [simulate_chunk(inputs, chunk_seed, size, horizon) for chunk_seed, size in zip(seeds, sizes)]
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
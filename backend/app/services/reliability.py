@@ -0,0 +1,203 @@
+# Analyse de fiabilité : intervalles entre pannes et lois de Weibull par groupe d'équipements
+import math
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.equipment import Equipment
+from ..models.maintenance import MaintenanceIntervention
+from ..models.production_line import ProductionLine
+
+FAILURE_TYPES = ("corrective", "emergency")
+
+GROUP_COLUMNS = {
+    "model": Equipment.model,
+    "manufacturer": Equipment.manufacturer,
+    "production_line": Equipment.production_line_id,
+}
+
+# Bornes du paramètre de forme : au-delà, la loi n'a plus de sens physique
+MIN_SHAPE = 0.05
+MAX_SHAPE = 50.0
+
+def load_failures(
+    db: Session,
+    group_by: str,
+    start: Optional[datetime],
+    end: datetime
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, list]:
+    """Instants de panne (heures epoch) par équipement et code de groupe.
+
+    Une panne est une intervention corrective ou d'urgence non rejetée,
+    datée par le début d'arrêt, à défaut le début réel, à défaut la création.
+    """
+    failed_at = func.coalesce(
+        MaintenanceIntervention.downtime_start,
+        MaintenanceIntervention.actual_start_time,
+        MaintenanceIntervention.created_at
+    )
+    criteria = [
+        MaintenanceIntervention.maintenance_type.in_(FAILURE_TYPES),
+        MaintenanceIntervention.status != "rejected",
+        failed_at < end
+    ]
+    if start is not None:
+        criteria.append(failed_at >= start)
+
+    rows = db.execute(
+        select(MaintenanceIntervention.equipment_id, GROUP_COLUMNS[group_by], failed_at)
+        .join(Equipment, Equipment.id == MaintenanceIntervention.equipment_id)
+        .where(*criteria)
+    ).all()
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0), []
+
+    equipment_ids, keys, moments = zip(*rows)
+    # Les clés (chaînes ou identifiants) sont codées en entiers une seule fois
+    index = {}
+    codes = np.fromiter((index.setdefault(key, len(index)) for key in keys), dtype=np.int64, count=len(keys))
+    return np.asarray(equipment_ids, dtype=np.int64), codes, to_hours(moments), list(index)
+
+def to_hours(moments) -> np.ndarray:
+    """Dates sans fuseau converties en heures depuis l'epoch (conversion NumPy)"""
+    return np.array(moments, dtype="datetime64[s]").astype(np.int64) / 3600.0
+
+def failure_intervals(
+    equipment_ids: np.ndarray,
+    codes: np.ndarray,
+    hours: np.ndarray,
+    end_hours: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Intervalles entre pannes successives d'un même équipement, plus un
+    intervalle censuré (sans panne) de la dernière panne à la fin de la période.
+
+    Un tri lexicographique puis des différences décalées : aucune boucle
+    par équipement.
+    """
+    order = np.lexsort((hours, equipment_ids))
+    equipment_ids, codes, hours = equipment_ids[order], codes[order], hours[order]
+    same = equipment_ids[1:] == equipment_ids[:-1]
+
+    last = np.ones(len(equipment_ids), dtype=bool)  # dernière panne de chaque équipement
+    last[:-1] = ~same
+
+    durations = np.concatenate(((hours[1:] - hours[:-1])[same], end_hours - hours[last]))
+    groups = np.concatenate((codes[1:][same], codes[last]))
+    failed = np.concatenate((np.ones(int(same.sum())), np.zeros(int(last.sum()))))
+    return durations, groups, failed, codes[last]
+
+def fit_weibull(
+    durations: np.ndarray,
+    groups: np.ndarray,
+    failed: np.ndarray,
+    group_count: int,
+    iterations: int = 100,
+    tolerance: float = 1e-8
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Forme et échelle de Weibull (maximum de vraisemblance avec censure)
+    pour tous les groupes à la fois.
+
+    Newton sur l'équation de la forme k, vectorisé : chaque itération est
+    une poignée de np.bincount sur toutes les observations. Les durées
+    sont ramenées à la moyenne de leur groupe, ce qui ne change pas k et
+    évite les débordements de t**k. Groupes sans panne : NaN.
+    """
+    keep = durations > 0  # pannes simultanées : intervalle nul, inexploitable
+    durations, groups, failed = durations[keep], groups[keep], failed[keep]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        failures = np.bincount(groups, weights=failed, minlength=group_count)
+        mean = np.bincount(groups, weights=durations, minlength=group_count) / np.bincount(groups, minlength=group_count)
+        x = durations / mean[groups]
+        log_x = np.log(x)
+        failed_log = np.bincount(groups, weights=failed * log_x, minlength=group_count) / failures
+
+        shape = np.ones(group_count)
+        for _ in range(iterations):
+            x_k = x ** shape[groups]
+            s0 = np.bincount(groups, weights=x_k, minlength=group_count)
+            s1 = np.bincount(groups, weights=x_k * log_x, minlength=group_count)
+            s2 = np.bincount(groups, weights=x_k * log_x * log_x, minlength=group_count)
+            g = s1 / s0 - 1 / shape - failed_log
+            dg = (s2 * s0 - s1 * s1) / (s0 * s0) + 1 / (shape * shape)
+            candidate = shape - g / dg
+            # g est croissante : un pas qui sort du domaine est remplacé par une division par deux
+            candidate = np.where(candidate > 0, candidate, shape / 2)
+            candidate = np.clip(np.nan_to_num(candidate, nan=1.0), MIN_SHAPE, MAX_SHAPE)
+            converged = np.abs(candidate - shape) <= tolerance * shape
+            shape = candidate
+            if converged.all():
+                break
+
+        s0 = np.bincount(groups, weights=x ** shape[groups], minlength=group_count)
+        scale = mean * (s0 / failures) ** (1 / shape)
+
+    invalid = ~(failures > 0)
+    shape[invalid] = np.nan
+    scale[invalid] = np.nan
+    return shape, scale
+
+def hazard_curves(shape: np.ndarray, scale: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Taux de défaillance h(t) et fiabilité R(t) sur [0, 2 x échelle], pour chaque groupe"""
+    hours = scale[:, None] * np.linspace(0, 2, points + 1)[1:][None, :]
+    ratio = hours / scale[:, None]
+    hazard = (shape[:, None] / scale[:, None]) * ratio ** (shape[:, None] - 1)
+    reliability = np.exp(-ratio ** shape[:, None])
+    return hours, hazard, reliability
+
+def reliability_by_group(
+    db: Session,
+    group_by: str,
+    start: Optional[datetime],
+    end: datetime,
+    min_failures: int,
+    points: int
+) -> List[dict]:
+    """Paramètres de Weibull, MTBF et courbes de taux de défaillance par groupe"""
+    equipment_ids, codes, hours, keys = load_failures(db, group_by, start, end)
+    if not keys:
+        return []
+
+    durations, groups, failed, last_codes = failure_intervals(
+        equipment_ids, codes, hours, float(to_hours([end])[0])
+    )
+    group_count = len(keys)
+    equipment_per_group = np.bincount(last_codes, minlength=group_count)
+    failures = np.bincount(groups, weights=failed, minlength=group_count).astype(np.int64)
+    censored = np.bincount(groups, weights=1 - failed, minlength=group_count).astype(np.int64)
+    shape, scale = fit_weibull(durations, groups, failed, group_count)
+    retained = np.flatnonzero((failures >= min_failures) & np.isfinite(shape))
+    if not len(retained):
+        return []
+    curve_hours, hazard, reliability = hazard_curves(shape[retained], scale[retained], points)
+
+    labels = {}
+    if group_by == "production_line":
+        line_ids = [keys[code] for code in retained if keys[code] is not None]
+        labels = dict(db.execute(
+            select(ProductionLine.id, ProductionLine.name).where(ProductionLine.id.in_(line_ids))
+        ).tuples().all())
+
+    results = []
+    for row, code in enumerate(retained):
+        key = keys[code]
+        k, lam = float(shape[code]), float(scale[code])
+        results.append({
+            "group": str(key) if key is not None else None,
+            "label": str(labels.get(key, key)) if key is not None else None,
+            "equipment": int(equipment_per_group[code]),
+            "failures": int(failures[code]),
+            "censored": int(censored[code]),
+            "shape": k,
+            "scale_hours": lam,
+            "mtbf_hours": lam * math.gamma(1 + 1 / k),
+            "curve": [
+                {"hours": float(t), "hazard": float(h), "reliability": float(r)}
+                for t, h, r in zip(curve_hours[row], hazard[row], reliability[row])
+            ]
+        })
+    results.sort(key=lambda group: group["failures"], reverse=True)
+    return results
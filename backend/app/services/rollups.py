@@ -0,0 +1,298 @@
+# Agrégats de la télémétrie (minute, heure, jour) et rétention
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal_column, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.telemetry import SensorReading, SensorRollupMinute, SensorRollupHour, SensorRollupDay
+
+# (équipement, métrique, bucket) -> (nombre, somme, min, max)
+Aggregates = Dict[Tuple[int, str, datetime], Tuple[int, float, float, float]]
+
+class Tier(NamedTuple):
+    name: str
+    model: type
+    seconds: int
+    unit: str  # unité de date_trunc
+
+TIERS = (
+    Tier("1m", SensorRollupMinute, 60, "minute"),
+    Tier("1h", SensorRollupHour, 3600, "hour"),
+    Tier("1d", SensorRollupDay, 86400, "day"),
+)
+TIERS_BY_NAME = {tier.name: tier for tier in TIERS}
+
+RAW = "raw"
+
+# Format de stockage des dates de SQLAlchemy sous SQLite
+SQLITE_BUCKET_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00.000000",
+    "hour": "%Y-%m-%d %H:00:00.000000",
+    "day": "%Y-%m-%d 00:00:00.000000",
+}
+
+PARTITION_NAME = re.compile(r"^sensor_readings_(\d{4})_(\d{2})$")
+
+def utc_now() -> datetime:
+    """Instant courant en UTC sans fuseau, comme les mesures stockées"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def retention_days() -> Dict[str, Optional[int]]:
+    """Durée de conservation par niveau, None pour une conservation illimitée"""
+    return {
+        RAW: settings.TELEMETRY_RETENTION_RAW_DAYS,
+        "1m": settings.TELEMETRY_RETENTION_1M_DAYS,
+        "1h": settings.TELEMETRY_RETENTION_1H_DAYS,
+        "1d": settings.TELEMETRY_RETENTION_1D_DAYS,
+    }
+
+def _truncate(moment: datetime, seconds: int) -> datetime:
+    if seconds == 60:
+        return moment.replace(second=0, microsecond=0)
+    if seconds == 3600:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _aggregate(items: Iterable, seconds: int) -> Aggregates:
+    """Regrouper des agrégats (ou des mesures) dans des buckets plus larges"""
+    aggregates: Aggregates = {}
+    for (equipment_id, metric, moment), (count, total, minimum, maximum) in items:
+        key = (equipment_id, metric, _truncate(moment, seconds))
+        current = aggregates.get(key)
+        if current is None:
+            aggregates[key] = (count, total, minimum, maximum)
+        else:
+            aggregates[key] = (
+                current[0] + count,
+                current[1] + total,
+                min(current[2], minimum),
+                max(current[3], maximum)
+            )
+    return aggregates
+
+def _upsert(db: Session, model: type, aggregates: Aggregates) -> None:
+    """Cumuler les agrégats dans un niveau en un seul executemany"""
+    if db.get_bind().dialect.name == "postgresql":
+        statement, least, greatest = postgresql.insert(model.__table__), func.least, func.greatest
+    else:
+        statement, least, greatest = sqlite.insert(model.__table__), func.min, func.max
+    table, excluded = model.__table__.c, statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.equipment_id, table.metric, table.bucket],
+        set_={
+            "sample_count": table.sample_count + excluded.sample_count,
+            "value_sum": table.value_sum + excluded.value_sum,
+            "value_min": least(table.value_min, excluded.value_min),
+            "value_max": greatest(table.value_max, excluded.value_max),
+        }
+    )
+    # Ordre de clé stable : deux ingestions concurrentes verrouillent les
+    # mêmes lignes dans le même ordre, sans interblocage
+    parameters = [
+        {
+            "equipment_id": equipment_id,
+            "metric": metric,
+            "bucket": bucket,
+            "sample_count": count,
+            "value_sum": total,
+            "value_min": minimum,
+            "value_max": maximum,
+        }
+        for (equipment_id, metric, bucket), (count, total, minimum, maximum) in sorted(aggregates.items())
+    ]
+    db.connection().execute(statement, parameters)
+
+def rollup_readings(db: Session, rows: List[Tuple[int, str, datetime, float]]) -> None:
+    """Intégrer des mesures nouvellement insérées dans les trois niveaux.
+
+    Chaque niveau est calculé à partir du précédent (en mémoire), puis
+    cumulé en base : le coût dépend du lot, pas de l'historique. Les
+    mesures doivent être nouvelles, sinon elles seraient comptées deux fois.
+    """
+    if not rows:
+        return
+    aggregates = (
+        ((equipment_id, metric, recorded_at), (1, value, value, value))
+        for equipment_id, metric, recorded_at, value in rows
+    )
+    for tier in TIERS:
+        aggregates = _aggregate(aggregates, tier.seconds)
+        _upsert(db, tier.model, aggregates)
+        aggregates = aggregates.items()
+
+def _bucket(column, unit: str, dialect_name: str):
+    """Début de l'intervalle contenant la date, selon le moteur SQL"""
+    if dialect_name == "postgresql":
+        return func.date_trunc(literal_column(f"'{unit}'"), column)
+    return func.strftime(SQLITE_BUCKET_FORMATS[unit], column)
+
+def rebuild_rollups(db: Session, start: datetime, end: datetime) -> Dict[str, int]:
+    """Recalculer les agrégats des jours [start, end) depuis les mesures brutes.
+
+    Sert à l'initialisation et après une correction des données. Les
+    minutes sont agrégées depuis les mesures, les heures depuis les
+    minutes, les jours depuis les heures.
+    """
+    start = _truncate(start, 86400)
+    end_day = _truncate(end, 86400)
+    end = end_day + timedelta(days=1) if end_day < end else end_day
+    dialect_name = db.get_bind().dialect.name
+
+    counts = {}
+    source = SensorReading
+    for tier in TIERS:
+        if source is SensorReading:
+            moment = SensorReading.recorded_at
+            columns = (
+                func.count(),
+                func.sum(SensorReading.value),
+                func.min(SensorReading.value),
+                func.max(SensorReading.value),
+            )
+        else:
+            moment = source.bucket
+            columns = (
+                func.sum(source.sample_count),
+                func.sum(source.value_sum),
+                func.min(source.value_min),
+                func.max(source.value_max),
+            )
+        bucket = _bucket(moment, tier.unit, dialect_name)
+
+        db.execute(delete(tier.model).where(tier.model.bucket >= start, tier.model.bucket < end))
+        counts[tier.name] = db.execute(
+            insert(tier.model).from_select(
+                ["equipment_id", "metric", "bucket", "sample_count", "value_sum", "value_min", "value_max"],
+                select(source.equipment_id, source.metric, bucket, *columns)
+                .where(moment >= start, moment < end)
+                .group_by(source.equipment_id, source.metric, bucket)
+            )
+        ).rowcount
+        source = tier.model
+    return counts
+
+def _drop_expired_partitions(db: Session, cutoff: datetime) -> List[str]:
+    """Supprimer les partitions mensuelles entièrement antérieures à la date limite"""
+    names = db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = 'sensor_readings'::regclass"
+    )).scalars()
+    dropped = []
+    for name in sorted(names):
+        match = PARTITION_NAME.match(name)
+        if match is None:
+            continue  # partition par défaut
+        year, month = int(match.group(1)), int(match.group(2))
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+        if month_end <= cutoff:
+            db.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            dropped.append(name)
+    return dropped
+
+def apply_retention(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Supprimer ce qui dépasse la durée de conservation de chaque niveau.
+
+    Sous PostgreSQL, les mois entièrement expirés des mesures brutes sont
+    supprimés partition par partition, sans DELETE ligne à ligne.
+    """
+    now = now or utc_now()
+    removed = {}
+    for name, days in retention_days().items():
+        if days is None:
+            continue
+        cutoff = now - timedelta(days=days)
+        if name == RAW:
+            if db.get_bind().dialect.name == "postgresql":
+                removed["partitions"] = len(_drop_expired_partitions(db, cutoff))
+            removed[name] = db.execute(
+                delete(SensorReading).where(SensorReading.recorded_at < cutoff)
+            ).rowcount
+        else:
+            model = TIERS_BY_NAME[name].model
+            removed[name] = db.execute(delete(model).where(model.bucket < cutoff)).rowcount
+    return removed
+
+def choose_resolution(db: Session, equipment_id: int, metric: str, start: datetime, end: datetime, max_points: int) -> str:
+    """Niveau le plus fin qui couvre la période et tient dans le budget de points.
+
+    Un niveau ne convient que si sa rétention couvre le début de la
+    période. Les mesures brutes ne sont envisagées que si les minutes
+    tiennent déjà dans le budget, et vérifiées par un comptage borné :
+    une courbe sur un an ne lit jamais de mesure brute.
+    """
+    span = max((end - start).total_seconds(), 1)
+    retention = retention_days()
+    oldest = utc_now()
+
+    def covers(name: str) -> bool:
+        days = retention[name]
+        return days is None or start >= oldest - timedelta(days=days)
+
+    for tier in TIERS:
+        if not covers(tier.name) or math.ceil(span / tier.seconds) > max_points:
+            continue
+        if tier.name == "1m" and covers(RAW):
+            raw_points = db.execute(
+                select(func.count()).select_from(
+                    select(literal_column("1"))
+                    .select_from(SensorReading)
+                    .where(
+                        SensorReading.equipment_id == equipment_id,
+                        SensorReading.metric == metric,
+                        SensorReading.recorded_at >= start,
+                        SensorReading.recorded_at < end
+                    )
+                    .limit(max_points + 1)
+                    .subquery()
+                )
+            ).scalar()
+            if raw_points <= max_points:
+                return RAW
+        return tier.name
+    return TIERS[-1].name
+
+def query_series(
+    db: Session,
+    equipment_id: int,
+    metric: str,
+    start: datetime,
+    end: datetime,
+    resolution: str,
+    max_points: int
+) -> List[Tuple[datetime, float, float, float, int]]:
+    """Points (bucket, moyenne, min, max, nombre) d'une série, dans l'ordre chronologique"""
+    if resolution == RAW:
+        statement = select(
+            SensorReading.recorded_at,
+            SensorReading.value,
+            SensorReading.value,
+            SensorReading.value,
+            literal_column("1")
+        ).where(
+            SensorReading.equipment_id == equipment_id,
+            SensorReading.metric == metric,
+            SensorReading.recorded_at >= start,
+            SensorReading.recorded_at < end
+        ).order_by(SensorReading.recorded_at)
+    else:
+        tier = TIERS_BY_NAME[resolution]
+        model = tier.model
+        statement = select(
+            model.bucket,
+            model.value_sum / model.sample_count,
+            model.value_min,
+            model.value_max,
+            model.sample_count
+        ).where(
+            model.equipment_id == equipment_id,
+            model.metric == metric,
+            model.bucket >= _truncate(start, tier.seconds),
+            model.bucket < end
+        ).order_by(model.bucket)
+    return [tuple(row) for row in db.execute(statement.limit(max_points))]
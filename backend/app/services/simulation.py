@@ -0,0 +1,218 @@
+# Simulation des arrêts et coûts de maintenance de l'année à venir, par site (tâches de fond)
+import logging
+import secrets
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.equipment import Equipment
+from ..models.maintenance import MaintenanceIntervention, MaintenancePlan
+from ..models.production_line import ProductionLine
+from ..models.simulation import SimulationJob
+from ..models.site import Site
+from .montecarlo import run_simulation
+from .reliability import FAILURE_TYPES, failure_intervals, fit_weibull, load_failures, to_hours
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (5, 50, 95)
+METRICS = ("failures", "downtime_hours", "corrective_cost", "preventive_cost", "total_cost")
+
+# Une seule simulation à la fois par worker : elle occupe déjà plusieurs processus
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simulation")
+
+def _failure_history(db: Session) -> tuple:
+    """Durée moyenne de réparation (heures) et coût moyen d'une panne (centimes)"""
+    failure = MaintenanceIntervention.maintenance_type.in_(FAILURE_TYPES)
+    durations = db.execute(
+        select(MaintenanceIntervention.downtime_start, MaintenanceIntervention.downtime_end).where(
+            failure,
+            MaintenanceIntervention.downtime_start.isnot(None),
+            MaintenanceIntervention.downtime_end > MaintenanceIntervention.downtime_start
+        )
+    ).all()
+    mttr = settings.SIMULATION_DEFAULT_MTTR_HOURS
+    if durations:
+        starts, ends = zip(*durations)
+        mttr = float(np.mean(to_hours(ends) - to_hours(starts)))
+
+    cost = db.execute(
+        select(func.avg(MaintenanceIntervention.total_cost)).where(
+            failure, MaintenanceIntervention.total_cost.isnot(None)
+        )
+    ).scalar()
+    return mttr, float(cost) if cost is not None else float(settings.SIMULATION_DEFAULT_FAILURE_COST)
+
+def load_inputs(db: Session, site_id: Optional[int], horizon_days: int) -> dict:
+    """Paramètres par équipement : loi de Weibull, réparation, coût, préventive.
+
+    La loi vient de l'ajustement sur l'historique du modèle d'équipement ;
+    à défaut de pannes suffisantes, de l'ajustement sur tout le parc, puis
+    d'une loi exponentielle de MTBF par défaut. La criticité pondère le
+    coût d'une panne. La préventive la plus fréquente remet l'équipement à
+    neuf ; toutes les préventives ajoutent leur durée et leur main-d'œuvre.
+    """
+    site = func.coalesce(Equipment.site_id, ProductionLine.site_id)
+    criteria = [site == site_id] if site_id is not None else [site.isnot(None)]
+    equipment = db.execute(
+        select(Equipment.id, Equipment.model, Equipment.criticality, site, Site.name)
+        .outerjoin(ProductionLine, ProductionLine.id == Equipment.production_line_id)
+        .join(Site, Site.id == site)
+        .where(*criteria)
+        .order_by(Equipment.id)
+    ).all()
+    if not equipment:
+        return {}
+
+    # Lois de Weibull par modèle et pour l'ensemble du parc
+    now = datetime.now()
+    failure_ids, codes, hours, models = load_failures(db, "model", None, now)
+    model_fit: Dict[Optional[str], tuple] = {}
+    shape_all, scale_all = 1.0, settings.SIMULATION_DEFAULT_MTBF_HOURS
+    if models:
+        durations, groups, failed, _ = failure_intervals(failure_ids, codes, hours, float(to_hours([now])[0]))
+        counts = np.bincount(groups, weights=failed, minlength=len(models))
+        shapes, scales = fit_weibull(durations, groups, failed, len(models))
+        for code, model in enumerate(models):
+            if model is not None and counts[code] >= settings.SIMULATION_MIN_FAILURES and np.isfinite(shapes[code]):
+                model_fit[model] = (float(shapes[code]), float(scales[code]))
+        if failed.sum() >= settings.SIMULATION_MIN_FAILURES:
+            overall_shape, overall_scale = fit_weibull(durations, np.zeros(len(durations), dtype=np.int64), failed, 1)
+            if np.isfinite(overall_shape[0]):
+                shape_all, scale_all = float(overall_shape[0]), float(overall_scale[0])
+
+    mttr, failure_cost = _failure_history(db)
+    factors = settings.SIMULATION_CRITICALITY_FACTORS
+
+    # Plans actifs : la plus petite fréquence renouvelle, toutes coûtent
+    plans = db.execute(
+        select(MaintenancePlan.equipment_id, MaintenancePlan.frequency_days, MaintenancePlan.estimated_duration)
+        .where(MaintenancePlan.is_active.is_(True), MaintenancePlan.frequency_days > 0)
+    ).all()
+    position = {row[0]: index for index, row in enumerate(equipment)}
+    pm_interval = np.full(len(equipment), np.inf)
+    pm_hours = np.zeros(len(equipment))
+    for equipment_id, frequency_days, duration_minutes in plans:
+        index = position.get(equipment_id)
+        if index is None:
+            continue
+        pm_interval[index] = min(pm_interval[index], frequency_days * 24.0)
+        pm_hours[index] += (horizon_days // frequency_days) * duration_minutes / 60.0
+
+    site_ids, site_codes = np.unique(np.array([row[3] for row in equipment]), return_inverse=True)
+    site_names = {row[3]: row[4] for row in equipment}
+    fits = [model_fit.get(row[1], (shape_all, scale_all)) for row in equipment]
+    return {
+        "arrays": {
+            "shape": np.array([fit[0] for fit in fits]),
+            "scale": np.array([fit[1] for fit in fits]),
+            "mttr": np.full(len(equipment), mttr),
+            "pm_interval": pm_interval,
+            "failure_cost": np.array([failure_cost * factors.get(row[2], 1.0) for row in equipment]),
+            "site": site_codes.astype(np.int64),
+        },
+        "sites": [(int(site_id), site_names[site_id]) for site_id in site_ids],
+        "site_equipment": np.bincount(site_codes, minlength=len(site_ids)),
+        "preventive_hours": np.bincount(site_codes, weights=pm_hours, minlength=len(site_ids)),
+        "fitted_models": len(model_fit),
+    }
+
+def _summary(values: np.ndarray) -> dict:
+    p5, p50, p95 = np.percentile(values, PERCENTILES, axis=0)
+    return {"mean": float(np.mean(values)), "p5": float(p5), "p50": float(p50), "p95": float(p95)}
+
+def simulate(db: Session, runs: int, horizon_days: int, seed: int, site_id: Optional[int] = None) -> dict:
+    """Simuler puis résumer chaque site et le total par percentiles"""
+    inputs = load_inputs(db, site_id, horizon_days)
+    if not inputs:
+        return {"seed": seed, "runs": runs, "horizon_days": horizon_days, "equipment": 0, "fitted_models": 0, "sites": [], "total": None}
+
+    draws = run_simulation(
+        inputs["arrays"], runs, horizon_days * 24.0, seed,
+        settings.SIMULATION_CHUNK_RUNS, settings.SIMULATION_PROCESSES
+    )
+    # La préventive est planifiée : coût et arrêt identiques dans chaque tirage
+    preventive_cost = inputs["preventive_hours"] * settings.DEFAULT_LABOR_RATE
+    draws["downtime_hours"] = draws["downtime_hours"] + inputs["preventive_hours"]
+    draws["preventive_cost"] = np.broadcast_to(preventive_cost, draws["failures"].shape)
+    draws["total_cost"] = draws["corrective_cost"] + preventive_cost
+
+    sites = []
+    for index, (site_id_, name) in enumerate(inputs["sites"]):
+        sites.append({
+            "site_id": site_id_,
+            "name": name,
+            "equipment": int(inputs["site_equipment"][index]),
+            **{metric: _summary(draws[metric][:, index]) for metric in METRICS}
+        })
+    return {
+        "seed": seed,
+        "runs": runs,
+        "horizon_days": horizon_days,
+        "equipment": int(inputs["site_equipment"].sum()),
+        "fitted_models": inputs["fitted_models"],
+        "sites": sites,
+        # Total : percentiles de la somme par tirage, pas somme des percentiles
+        "total": {metric: _summary(draws[metric].sum(axis=1)) for metric in METRICS}
+    }
+
+JOB_COLUMNS = (
+    "id", "status", "created_at", "started_at", "finished_at", "runs",
+    "horizon_days", "seed", "site_id", "error", "result"
+)
+
+def _as_dict(job: SimulationJob) -> dict:
+    return {column: getattr(job, column) for column in JOB_COLUMNS}
+
+def _expires_at(db: Session) -> datetime:
+    """Conservation comptée depuis le dernier changement d'état (horloge de la base)"""
+    return db.execute(select(func.now())).scalar() + timedelta(seconds=settings.SIMULATION_JOB_TTL)
+
+def get_job(db: Session, job_id: str) -> Optional[dict]:
+    """État d'une simulation (table simulation_jobs, partagée entre workers)"""
+    job = db.execute(
+        select(SimulationJob).where(SimulationJob.id == job_id, SimulationJob.expires_at > func.now())
+    ).scalar_one_or_none()
+    return _as_dict(job) if job is not None else None
+
+def submit_simulation(db: Session, runs: int, horizon_days: int, seed: Optional[int], site_id: Optional[int]) -> dict:
+    """Mettre une simulation en file ; sans graine, une graine est tirée et renvoyée"""
+    job = SimulationJob(
+        id=uuid.uuid4().hex,
+        status="pending",
+        runs=runs,
+        horizon_days=horizon_days,
+        seed=seed if seed is not None else secrets.randbits(32),
+        site_id=site_id,
+        expires_at=_expires_at(db)
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _executor.submit(_run_job, job.id)
+    return _as_dict(job)
+
+def _run_job(job_id: str) -> None:
+    db = SessionLocal()
+    try:
+        job = db.get(SimulationJob, job_id)
+        job.status, job.started_at, job.expires_at = "running", func.now(), _expires_at(db)
+        db.commit()
+        try:
+            job.result = simulate(db, job.runs, job.horizon_days, job.seed, job.site_id)
+            job.status = "completed"
+        except Exception as e:
+            logger.exception("Échec de la simulation %s", job_id)
+            db.rollback()
+            job.status, job.error = "failed", str(e)
+        job.finished_at, job.expires_at = func.now(), _expires_at(db)
+        db.commit()
+    finally:
+        db.close()
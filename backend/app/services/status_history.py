@@ -0,0 +1,149 @@
+# Historique des statuts d'équipement et temps passé dans chaque statut
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import event as sa_event, func, inspect, literal, select
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..models.equipment import Equipment, EquipmentStatusChange
+from ..models.production_line import ProductionLine
+from ..models.site import Site
+
+def _value(member) -> Optional[str]:
+    return getattr(member, "value", member)
+
+@sa_event.listens_for(SessionLocal, "before_flush")
+def _record_status_changes(session: Session, flush_context, instances) -> None:
+    """Journaliser chaque statut posé ou modifié, dans le flush qui l'écrit.
+
+    Le journal partage ainsi la transaction du changement : il n'existe
+    pas de statut enregistré sans sa ligne d'historique, ni l'inverse.
+    """
+    now = datetime.now()
+    for equipment in session.new:
+        if isinstance(equipment, Equipment):
+            session.add(EquipmentStatusChange(
+                equipment=equipment,
+                status=_value(equipment.status) or Equipment.status.default.arg,
+                changed_at=now
+            ))
+    for equipment in session.dirty:
+        if not isinstance(equipment, Equipment):
+            continue
+        history = inspect(equipment).attrs.status.history
+        if not history.added:
+            continue
+        previous = _value(history.deleted[0]) if history.deleted else None
+        current = _value(history.added[0])
+        if current != previous:
+            session.add(EquipmentStatusChange(
+                equipment=equipment, status=current, previous_status=previous, changed_at=now
+            ))
+
+def _epoch(db: Session, moment):
+    """Secondes depuis l'epoch d'une expression date, selon le dialecte"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", moment)
+    return (func.julianday(moment) - 2440587.5) * 86400.0
+
+def time_in_state(
+    db: Session,
+    level: str,
+    start: datetime,
+    end: datetime,
+    site_id: Optional[int] = None,
+    production_line_id: Optional[int] = None,
+    equipment_id: Optional[int] = None
+) -> List[dict]:
+    """Secondes passées dans chaque statut sur [start, end), par équipement, ligne ou site.
+
+    Pour chaque équipement, seul le dernier changement avant start est lu
+    en plus de ceux de la période (une recherche dans l'index par
+    équipement) ; lead() donne la fin de chaque période, bornée à [start,
+    end), et la somme est faite en SQL. observed_seconds ne compte que le
+    temps couvert par l'historique (équipement créé en cours de période).
+    """
+    postgresql = db.get_bind().dialect.name == "postgresql"
+    greatest = func.greatest if postgresql else func.max
+    least = func.least if postgresql else func.min
+
+    site = func.coalesce(Equipment.site_id, ProductionLine.site_id)
+    criteria = []
+    if site_id is not None:
+        criteria.append(site == site_id)
+    if production_line_id is not None:
+        criteria.append(Equipment.production_line_id == production_line_id)
+    if equipment_id is not None:
+        criteria.append(Equipment.id == equipment_id)
+
+    # Début de lecture par équipement : dernier changement au plus tard à start
+    floor = (
+        select(func.max(EquipmentStatusChange.changed_at))
+        .where(EquipmentStatusChange.equipment_id == Equipment.id, EquipmentStatusChange.changed_at <= start)
+        .correlate(Equipment)
+        .scalar_subquery()
+    )
+    scope = (
+        select(Equipment.id.label("equipment_id"), func.coalesce(floor, start).label("floor"))
+        .outerjoin(ProductionLine, ProductionLine.id == Equipment.production_line_id)
+        .where(*criteria)
+        .cte("scope")
+    )
+    periods = (
+        select(
+            EquipmentStatusChange.equipment_id,
+            EquipmentStatusChange.status,
+            EquipmentStatusChange.changed_at,
+            func.lead(EquipmentStatusChange.changed_at).over(
+                partition_by=EquipmentStatusChange.equipment_id,
+                order_by=(EquipmentStatusChange.changed_at, EquipmentStatusChange.id)
+            ).label("next_at")
+        )
+        .join(scope, scope.c.equipment_id == EquipmentStatusChange.equipment_id)
+        .where(EquipmentStatusChange.changed_at >= scope.c.floor, EquipmentStatusChange.changed_at < end)
+        .subquery("periods")
+    )
+    period_start = greatest(periods.c.changed_at, literal(start))
+    period_end = least(func.coalesce(periods.c.next_at, literal(end)), literal(end))
+    seconds = func.sum(_epoch(db, period_end) - _epoch(db, period_start))
+
+    if level == "equipment":
+        group_id, group_name = Equipment.id, Equipment.name
+    elif level == "production_line":
+        group_id, group_name = Equipment.production_line_id, ProductionLine.name
+    else:
+        group_id, group_name = site, Site.name
+
+    rows = db.execute(
+        select(group_id, group_name, periods.c.equipment_id, periods.c.status, seconds)
+        .select_from(periods)
+        .join(Equipment, Equipment.id == periods.c.equipment_id)
+        .outerjoin(ProductionLine, ProductionLine.id == Equipment.production_line_id)
+        .outerjoin(Site, Site.id == site)
+        .where(func.coalesce(periods.c.next_at, literal(end)) > start)
+        .group_by(group_id, group_name, periods.c.equipment_id, periods.c.status)
+    ).all()
+
+    groups = {}
+    for key, name, member_id, state, state_seconds in rows:
+        group = groups.setdefault(key, {"id": key, "name": name, "members": set(), "observed_seconds": 0.0, "states": {}})
+        group["members"].add(member_id)
+        group["states"][state] = group["states"].get(state, 0.0) + float(state_seconds)
+        group["observed_seconds"] += float(state_seconds)
+
+    results = []
+    for group in groups.values():
+        observed = group["observed_seconds"]
+        group["equipment"] = len(group.pop("members"))
+        group["observed_seconds"] = round(observed)
+        group["states"] = [
+            {
+                "status": state,
+                "seconds": round(state_seconds),
+                "percent": round(100.0 * state_seconds / observed, 3) if observed else 0.0
+            }
+            for state, state_seconds in sorted(group["states"].items(), key=lambda item: -item[1])
+        ]
+        results.append(group)
+    return results
@@ -0,0 +1,225 @@
+# Synchronisation différentielle des tablettes des techniciens (travail hors ligne)
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, event as sa_event, func, inspect, or_, select, tuple_, union
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.equipment import Equipment
+from ..models.maintenance import InterventionTask, MaintenanceIntervention, ScheduledMaintenance
+from ..models.sync import SyncTombstone
+
+# Colonnes transmises : le strict nécessaire au travail sur le terrain
+SCHEDULED_COLUMNS = (
+    "id", "equipment_id", "maintenance_plan_id", "scheduled_date", "estimated_start_time",
+    "estimated_end_time", "status", "priority", "notes", "updated_at"
+)
+INTERVENTION_COLUMNS = (
+    "id", "equipment_id", "scheduled_maintenance_id", "maintenance_type", "status", "priority",
+    "scheduled_date", "actual_start_time", "actual_end_time", "description", "work_performed",
+    "issues_found", "recommendations", "version", "updated_at"
+)
+TASK_COLUMNS = (
+    "id", "intervention_id", "name", "description", "is_completed", "completion_notes",
+    "completed_at", "order", "updated_at"
+)
+EQUIPMENT_COLUMNS = (
+    "id", "name", "model", "serial_number", "manufacturer", "site_id", "production_line_id",
+    "status", "criticality", "version", "updated_at"
+)
+
+class SyncToken(NamedTuple):
+    """Position de synchronisation.
+
+    since/until bornent les updated_at de la passe en cours (until est
+    figé à la première page, absent entre deux passes) ; entity, moment et
+    last_id reprennent la pagination par clé à l'intérieur de la passe.
+    """
+    since: Optional[datetime]
+    until: Optional[datetime] = None
+    entity: int = 0
+    moment: Optional[datetime] = None
+    last_id: int = 0
+
+    def encode(self) -> str:
+        payload = [
+            self.since.isoformat() if self.since else None,
+            self.until.isoformat() if self.until else None,
+            self.entity,
+            self.moment.isoformat() if self.moment else None,
+            self.last_id,
+        ]
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "SyncToken":
+        try:
+            since, until, entity, moment, last_id = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+            return cls(
+                datetime.fromisoformat(since) if since else None,
+                datetime.fromisoformat(until) if until else None,
+                int(entity),
+                datetime.fromisoformat(moment) if moment else None,
+                int(last_id),
+            )
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Jeton de synchronisation invalide"
+            )
+
+def _tombstone(session: Session, entity: str, entity_id: int, technician_id: Optional[int]) -> None:
+    session.add(SyncTombstone(entity=entity, entity_id=entity_id, technician_id=technician_id))
+
+@sa_event.listens_for(SessionLocal, "before_flush")
+def _record_tombstones(session: Session, flush_context, instances) -> None:
+    """Pierres tombales des suppressions et réassignations, dans le même flush"""
+    for obj in session.deleted:
+        if isinstance(obj, MaintenanceIntervention):
+            _tombstone(session, "interventions", obj.id, obj.technician_id)
+        elif isinstance(obj, ScheduledMaintenance):
+            _tombstone(session, "scheduled", obj.id, obj.assigned_technician_id)
+        elif isinstance(obj, InterventionTask):
+            _tombstone(session, "tasks", obj.id, None)
+        elif isinstance(obj, Equipment):
+            _tombstone(session, "equipment", obj.id, None)
+
+    # Réassignation : l'enregistrement sort de la vue de l'ancien technicien
+    for obj in session.dirty:
+        if isinstance(obj, MaintenanceIntervention):
+            entity, attribute = "interventions", "technician_id"
+        elif isinstance(obj, ScheduledMaintenance):
+            entity, attribute = "scheduled", "assigned_technician_id"
+        else:
+            continue
+        history = inspect(obj).attrs[attribute].history
+        if history.added and history.deleted and history.deleted[0] is not None and history.deleted[0] != history.added[0]:
+            _tombstone(session, entity, obj.id, history.deleted[0])
+
+def _row(row, columns) -> dict:
+    values = dict(zip(columns, row))
+    return {key: getattr(value, "value", value) for key, value in values.items()}
+
+def _sources(technician_id: int, since: Optional[datetime], until: datetime):
+    """Sources de la passe, dans l'ordre de pagination : (nom, modèle, colonnes, critères).
+
+    Les pierres tombales passent en premier : un enregistrement sorti puis
+    revenu dans le périmètre pendant la passe est supprimé puis recréé par
+    le client, jamais l'inverse.
+    """
+    def changed(model):
+        criteria = [model.updated_at <= until]
+        if since is not None:
+            criteria.append(model.updated_at > since)
+        return criteria
+
+    interventions = select(MaintenanceIntervention.id).where(MaintenanceIntervention.technician_id == technician_id)
+    assigned = ScheduledMaintenance.assigned_technician_id == technician_id
+    owned = MaintenanceIntervention.technician_id == technician_id
+
+    # Équipements du périmètre : modifiés, ou nouvellement référencés par un élément modifié
+    referenced = union(
+        select(ScheduledMaintenance.equipment_id).where(assigned),
+        select(MaintenanceIntervention.equipment_id).where(owned)
+    ).subquery()
+    equipment_criteria = [Equipment.id.in_(select(referenced.c[0]))]
+    sources = []
+    if since is not None:
+        newly_referenced = union(
+            select(ScheduledMaintenance.equipment_id).where(assigned, *changed(ScheduledMaintenance)),
+            select(MaintenanceIntervention.equipment_id).where(owned, *changed(MaintenanceIntervention))
+        ).subquery()
+        equipment_criteria.append(or_(
+            and_(Equipment.updated_at > since, Equipment.updated_at <= until),
+            Equipment.id.in_(select(newly_referenced.c[0]))
+        ))
+        # Sans objet lors d'une synchronisation complète
+        sources.append(("deleted", SyncTombstone, ("entity", "entity_id"), [
+            SyncTombstone.deleted_at > since,
+            SyncTombstone.deleted_at <= until,
+            or_(SyncTombstone.technician_id == technician_id, SyncTombstone.technician_id.is_(None))
+        ]))
+
+    return sources + [
+        ("equipment", Equipment, EQUIPMENT_COLUMNS, equipment_criteria),
+        ("scheduled", ScheduledMaintenance, SCHEDULED_COLUMNS, [assigned, *changed(ScheduledMaintenance)]),
+        ("interventions", MaintenanceIntervention, INTERVENTION_COLUMNS, [owned, *changed(MaintenanceIntervention)]),
+        ("tasks", InterventionTask, TASK_COLUMNS, [InterventionTask.intervention_id.in_(interventions), *changed(InterventionTask)]),
+    ]
+
+def sync_page(db: Session, technician_id: int, token: Optional[str], page_size: int) -> dict:
+    """Une page de changements depuis un jeton (tout le périmètre sans jeton).
+
+    Une passe parcourt les pierres tombales, équipements, maintenances
+    planifiées, interventions puis tâches, chacun par (updated_at, id)
+    croissants, jusqu'à page_size lignes au total. Le jeton de fin de
+    passe repart de until moins un recouvrement : une transaction encore
+    ouverte à until peut y avoir écrit un updated_at antérieur. Les
+    doublons éventuels sont des mises à jour idempotentes pour le client.
+    """
+    now = db.execute(select(func.now())).scalar()
+    if token:
+        position = SyncToken.decode(token)
+        oldest = now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        if position.since is not None and position.since < oldest:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Jeton expiré : synchronisation complète nécessaire"
+            )
+    else:
+        position = SyncToken(None)
+    if position.until is None and (position.entity or position.moment is not None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Jeton de synchronisation invalide"
+        )
+
+    # Nouvelle passe : borne haute à l'instant présent, figée jusqu'à sa dernière page
+    since, until = position.since, position.until or now
+    sources = _sources(technician_id, since, until)
+    changes = {name: [] for name in ("equipment", "scheduled", "interventions", "tasks")}
+    deleted = {name: [] for name in changes}
+    remaining = page_size
+    entity, moment, last_id = position.entity, position.moment, position.last_id
+    if entity >= len(sources):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Jeton de synchronisation invalide"
+        )
+
+    while entity < len(sources) and remaining > 0:
+        name, model, columns, criteria = sources[entity]
+        order = (model.deleted_at if model is SyncTombstone else model.updated_at, model.id)
+        query = select(*(getattr(model, column) for column in columns), *order).where(*criteria)
+        if moment is not None:
+            query = query.where(tuple_(*order) > tuple_(moment, last_id))
+        rows = db.execute(query.order_by(*order).limit(remaining)).all()
+
+        for row in rows:
+            if model is SyncTombstone:
+                deleted[row[0]].append(row[1])
+            else:
+                changes[name].append(_row(row, columns))
+        remaining -= len(rows)
+        if remaining > 0:
+            # Source épuisée : la suivante repart du début
+            entity, moment, last_id = entity + 1, None, 0
+        else:
+            moment, last_id = rows[-1][-2], rows[-1][-1]
+
+    has_more = entity < len(sources)
+    if has_more:
+        next_token = SyncToken(since, until, entity, moment, last_id)
+    else:
+        next_token = SyncToken(until - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS))
+    return {
+        "next_token": next_token.encode(),
+        "has_more": has_more,
+        "changes": changes,
+        "deleted": deleted,
+    }
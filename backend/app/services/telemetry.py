@@ -0,0 +1,187 @@
+# Ingestion des mesures capteurs
+import csv
+import io
+import json
+import math
+from datetime import datetime, timezone
+from typing import Iterable, List, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..models.equipment import Equipment
+from ..models.telemetry import SensorReading
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel, on retombe sur le module json standard
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack est optionnel, seul NDJSON est alors accepté
+    msgpack = None
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+Reading = Tuple[int, str, datetime, float]
+
+def _invalid(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+def decode_batches(body: bytes, content_type: str) -> Iterable:
+    """Décoder le corps : un lot par ligne NDJSON ou par objet MessagePack"""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in MSGPACK_MEDIA_TYPES:
+        if msgpack is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="MessagePack n'est pas disponible sur ce serveur"
+            )
+        try:
+            return list(msgpack.Unpacker(io.BytesIO(body), raw=False, timestamp=3))
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as e:
+            raise _invalid(f"MessagePack invalide : {e}")
+
+    if media_type in NDJSON_MEDIA_TYPES or media_type == "application/json":
+        loads = orjson.loads if orjson is not None else json.loads
+        batches = []
+        for line_number, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                batches.append(loads(line))
+            except ValueError:
+                raise _invalid(f"Ligne {line_number} : JSON invalide")
+        return batches
+
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Formats acceptés : application/x-ndjson, application/msgpack"
+    )
+
+def _timestamp(value) -> datetime:
+    """Instant en UTC sans fuseau : ISO 8601, secondes epoch ou horodatage MessagePack"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    raise ValueError(value)
+
+def flatten_batches(batches: Iterable, max_readings: int) -> List[Reading]:
+    """Valider les lots {"equipment_id", "readings": [{"metric", "value", "recorded_at"}]}.
+
+    Validation manuelle plutôt que Pydantic : à des dizaines de milliers de
+    mesures par seconde, le coût par objet compte.
+    """
+    rows = []
+    for index, batch in enumerate(batches, start=1):
+        if not isinstance(batch, dict):
+            raise _invalid(f"Lot {index} : objet attendu")
+        equipment_id = batch.get("equipment_id")
+        readings = batch.get("readings")
+        if not isinstance(equipment_id, int) or isinstance(equipment_id, bool):
+            raise _invalid(f"Lot {index} : equipment_id entier attendu")
+        if not isinstance(readings, list):
+            raise _invalid(f"Lot {index} : liste readings attendue")
+        if len(rows) + len(readings) > max_readings:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Au plus {max_readings} mesures par requête"
+            )
+
+        for reading in readings:
+            try:
+                metric = reading["metric"]
+                value = reading["value"]
+                recorded_at = _timestamp(reading["recorded_at"])
+            except (KeyError, TypeError, ValueError, OverflowError):
+                raise _invalid(f"Lot {index} : mesure invalide {reading!r:.100}")
+            if not isinstance(metric, str) or not 0 < len(metric) <= 50:
+                raise _invalid(f"Lot {index} : métrique invalide {metric!r:.60}")
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise _invalid(f"Lot {index} : valeur invalide pour {metric}")
+            rows.append((equipment_id, metric, recorded_at, float(value)))
+    return rows
+
+def check_equipment(db: Session, rows: List[Reading]) -> None:
+    """Vérifier en une requête que tous les équipements référencés existent"""
+    equipment_ids = {row[0] for row in rows}
+    known = set(db.execute(select(Equipment.id).where(Equipment.id.in_(equipment_ids))).scalars())
+    unknown = equipment_ids - known
+    if unknown:
+        raise _invalid(f"Équipements inconnus : {', '.join(map(str, sorted(unknown)))}")
+
+def write_readings(db: Session, rows: List[Reading]) -> List[Reading]:
+    """Écrire les mesures, doublons ignorés ; renvoie les mesures réellement insérées"""
+    if not rows:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        return _copy_readings(db, rows)
+
+    # Les clés déjà présentes sont écartées d'abord : le moteur ne dit pas
+    # quelles lignes un INSERT OR IGNORE a ignorées
+    times = [row[2] for row in rows]
+    existing = set(map(tuple, db.execute(
+        select(SensorReading.equipment_id, SensorReading.metric, SensorReading.recorded_at).where(
+            SensorReading.equipment_id.in_({row[0] for row in rows}),
+            SensorReading.recorded_at >= min(times),
+            SensorReading.recorded_at <= max(times)
+        )
+    )))
+    new_rows = []
+    for row in rows:
+        key = row[:3]
+        if key not in existing:
+            existing.add(key)
+            new_rows.append(row)
+    if not new_rows:
+        return []
+
+    # executemany sur une instruction compilée une seule fois, sans passer par l'ORM
+    statement = insert(SensorReading.__table__)
+    if db.get_bind().dialect.name == "sqlite":
+        statement = statement.prefix_with("OR IGNORE")
+    parameters = [
+        {"equipment_id": equipment_id, "metric": metric, "recorded_at": recorded_at, "value": value}
+        for equipment_id, metric, recorded_at, value in new_rows
+    ]
+    db.connection().execute(statement, parameters)
+    return new_rows
+
+def _copy_readings(db: Session, rows: List[Reading]) -> List[Reading]:
+    """COPY dans une table temporaire, puis INSERT ... ON CONFLICT DO NOTHING.
+
+    COPY ne sait pas ignorer les doublons : la table de transit, propre à
+    la connexion et vidée au commit, absorbe les renvois des capteurs.
+    RETURNING ne renvoie que les lignes réellement insérées.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for equipment_id, metric, recorded_at, value in rows:
+        writer.writerow((equipment_id, metric, recorded_at.isoformat(sep=" "), repr(value)))
+    buffer.seek(0)
+
+    connection = db.connection().connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS sensor_readings_staging "
+            "(LIKE sensor_readings INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        cursor.copy_expert(
+            "COPY sensor_readings_staging (equipment_id, metric, recorded_at, value) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        cursor.execute(
+            "INSERT INTO sensor_readings (equipment_id, metric, recorded_at, value) "
+            "SELECT equipment_id, metric, recorded_at, value FROM sensor_readings_staging "
+            "ON CONFLICT DO NOTHING "
+            "RETURNING equipment_id, metric, recorded_at, value"
+        )
+        return cursor.fetchall()
@@ -0,0 +1,358 @@
+# File de travail des techniciens, classée par risque (tas mis à jour incrémentalement)
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, literal, null, select, type_coerce, union_all
+from sqlalchemy.orm import Session
+
+from ..core.changes import change_listener, on_change
+from ..core.config import settings
+from ..models.change import ChangeCounter
+from ..models.equipment import Equipment
+from ..models.maintenance import MaintenanceIntervention, MaintenancePlan, ScheduledMaintenance
+from ..models.sync import SyncTombstone
+from .line_graph import line_graphs
+
+# Éléments en file : interventions à réaliser et maintenances planifiées non commencées
+INTERVENTION_STATUSES = ("pending", "assigned")
+SCHEDULED_STATUSES = ("scheduled", "overdue")
+
+EPOCH = datetime(1970, 1, 1)
+
+Ref = Tuple[str, int]  # ("intervention" | "scheduled", id)
+
+def _value(member) -> Optional[str]:
+    return getattr(member, "value", member)
+
+def _hours(moment: datetime) -> float:
+    return (moment - EPOCH).total_seconds() / 3600.0
+
+def risk_key(priority: str, criticality: str, stops_line: bool, due: datetime) -> float:
+    """Clé de tri, indépendante de l'instant présent.
+
+    Le score à l'instant t vaut poids + heures de retard, soit
+    (poids - échéance) + t : tous les éléments gagnent la même chose avec
+    le temps, l'ordre ne change donc jamais et le tas n'a pas à être
+    retrié. Les poids s'expriment en heures de retard équivalentes.
+    """
+    weight = (
+        settings.WORK_QUEUE_PRIORITY_HOURS.get(priority, 0)
+        + settings.WORK_QUEUE_CRITICALITY_HOURS.get(criticality, 0)
+        + (settings.WORK_QUEUE_LINE_STOP_HOURS if stops_line else 0)
+    )
+    return weight - _hours(due)
+
+class TechnicianQueue:
+    """Tas d'un technicien, à suppression paresseuse.
+
+    Une entrée est [-clé, numéro, référence, élément] ; retirer un élément
+    vide sa case, le tas est compacté quand les entrées mortes dominent.
+    Les N premiers sont lus depuis la racine en ne parcourant que N
+    branches (O(N log N), indépendant de la taille de la file) et gardés
+    tant qu'aucun changement ne touche le haut de la file.
+    """
+
+    def __init__(self, top_size: int):
+        self.top_size = top_size
+        self.heap: List[list] = []
+        self.entries: Dict[Ref, list] = {}
+        self._dead = 0
+        self._top: Optional[List[list]] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _touches_top(self, entry: list) -> bool:
+        top = self._top
+        return top is not None and (len(top) < self.top_size or entry[:2] <= top[-1][:2])
+
+    def push(self, ref: Ref, key: float, item: dict, sequence: int) -> None:
+        self.discard(ref)
+        entry = [-key, sequence, ref, item]
+        self.entries[ref] = entry
+        heapq.heappush(self.heap, entry)
+        if self._touches_top(entry):
+            self._top = None
+
+    def discard(self, ref: Ref) -> None:
+        entry = self.entries.pop(ref, None)
+        if entry is None:
+            return
+        if self._touches_top(entry):
+            self._top = None
+        entry[3] = None
+        self._dead += 1
+        if self._dead > len(self.entries) and self._dead > 64:
+            self.heap = [live for live in self.heap if live[3] is not None]
+            heapq.heapify(self.heap)
+            self._dead = 0
+
+    def top(self, count: int) -> List[list]:
+        if self._top is None:
+            heap, top = self.heap, []
+            frontier = [(heap[0], 0)] if heap else []
+            while frontier and len(top) < self.top_size:
+                entry, position = heapq.heappop(frontier)
+                if entry[3] is not None:
+                    top.append(entry)
+                for child in (2 * position + 1, 2 * position + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+            self._top = top
+        return self._top[:count]
+
+class WorkQueue:
+    """Files de tous les techniciens (None : maintenances non assignées).
+
+    Construite à la première lecture ; ensuite, chaque intervention ou
+    maintenance planifiée modifiée est relue seule et replacée dans le tas
+    de son technicien. Un changement d'équipements ou de lignes
+    (criticité, graphe) reconstruit tout, de même qu'un délai de sécurité.
+    Sans LISTEN/NOTIFY, les changements des autres workers ne sont pas
+    signalés : chaque lecture relit seulement ce qui a changé depuis la
+    précédente (marque haute sur updated_at, voir _poll).
+    """
+
+    def __init__(self):
+        self._queues: Dict[Optional[int], TechnicianQueue] = {}
+        self._owners: Dict[Ref, Optional[int]] = {}
+        self._pending: Set[Ref] = set()
+        self._line_stops: Dict[int, Set[int]] = {}
+        self._stale = True
+        self._loaded_at = 0.0
+        self._high_water: Optional[datetime] = None
+        self._equipment: Dict[int, tuple] = {}  # nom, criticité et ligne de chaque équipement
+        self._line_version: Optional[int] = None
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # une seule relecture à la fois
+
+    def refresh(self, kind: str, item_id: int) -> None:
+        with self._lock:
+            self._pending.add((kind, item_id))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._stale = True
+
+    def _stopping_equipment(self, db: Session, line_id: Optional[int]) -> Set[int]:
+        """Équipements dont l'arrêt seul arrête leur ligne (graphe en marche nominale)"""
+        if line_id is None:
+            return set()
+        stops = self._line_stops.get(line_id)
+        if stops is None:
+            graph = line_graphs.get(db, line_id).graph
+            probe, stops = graph.state(), set()
+            for node, equipment_id in enumerate(graph.nodes):
+                probe.set_up(node, False)
+                if not probe.running:
+                    stops.add(equipment_id)
+                probe.set_up(node, True)
+            self._line_stops[line_id] = stops
+        return stops
+
+    def _load(self, db: Session, intervention_ids: Optional[List[int]] = None, scheduled_ids: Optional[List[int]] = None):
+        """Éléments à placer en file : (référence, technicien, clé, élément)"""
+        loads = []
+        if intervention_ids is None or intervention_ids:
+            criteria = [MaintenanceIntervention.status.in_(INTERVENTION_STATUSES)]
+            if intervention_ids is not None:
+                criteria.append(MaintenanceIntervention.id.in_(intervention_ids))
+            loads.append(("intervention", select(
+                MaintenanceIntervention.id,
+                MaintenanceIntervention.technician_id,
+                MaintenanceIntervention.status,
+                MaintenanceIntervention.priority,
+                func.coalesce(MaintenanceIntervention.scheduled_date, MaintenanceIntervention.created_at),
+                MaintenanceIntervention.maintenance_type,
+                Equipment.id, Equipment.name, Equipment.criticality, Equipment.production_line_id
+            ).join(Equipment, Equipment.id == MaintenanceIntervention.equipment_id).where(*criteria)))
+        if scheduled_ids is None or scheduled_ids:
+            criteria = [ScheduledMaintenance.status.in_(SCHEDULED_STATUSES)]
+            if scheduled_ids is not None:
+                criteria.append(ScheduledMaintenance.id.in_(scheduled_ids))
+            loads.append(("scheduled", select(
+                ScheduledMaintenance.id,
+                ScheduledMaintenance.assigned_technician_id,
+                ScheduledMaintenance.status,
+                ScheduledMaintenance.priority,
+                ScheduledMaintenance.scheduled_date,
+                MaintenancePlan.maintenance_type,
+                Equipment.id, Equipment.name, Equipment.criticality, Equipment.production_line_id
+            )
+            .join(Equipment, Equipment.id == ScheduledMaintenance.equipment_id)
+            .join(MaintenancePlan, MaintenancePlan.id == ScheduledMaintenance.maintenance_plan_id)
+            .where(*criteria)))
+
+        items = []
+        for kind, query in loads:
+            for item_id, technician_id, item_status, priority, due, maintenance_type, equipment_id, name, criticality, line_id in db.execute(query):
+                priority, criticality = _value(priority), _value(criticality)
+                stops_line = equipment_id in self._stopping_equipment(db, line_id)
+                items.append(((kind, item_id), technician_id, risk_key(priority, criticality, stops_line, due), {
+                    "kind": kind,
+                    "id": item_id,
+                    "technician_id": technician_id,
+                    "status": _value(item_status),
+                    "priority": priority,
+                    "maintenance_type": _value(maintenance_type),
+                    "due_date": due,
+                    "equipment_id": equipment_id,
+                    "equipment_name": name,
+                    "criticality": criticality,
+                    "production_line_id": line_id,
+                    "stops_line": stops_line
+                }))
+        return items
+
+    def _place(self, items: Iterable[tuple]) -> None:
+        for ref, technician_id, key, item in items:
+            queue = self._queues.get(technician_id)
+            if queue is None:
+                queue = self._queues[technician_id] = TechnicianQueue(settings.WORK_QUEUE_TOP_SIZE)
+            queue.push(ref, key, item, next(self._sequence))
+            self._owners[ref] = technician_id
+
+    def _equipment_attributes(self, db: Session, equipment_ids: Optional[List[int]] = None) -> Dict[int, tuple]:
+        query = select(Equipment.id, Equipment.name, Equipment.criticality, Equipment.production_line_id)
+        if equipment_ids is not None:
+            query = query.where(Equipment.id.in_(equipment_ids))
+        return {row[0]: tuple(row[1:]) for row in db.execute(query)}
+
+    def _changes(self, since: datetime):
+        """Références modifiées depuis since, en une requête : (type, identifiant, instant)"""
+        no_id, no_moment = type_coerce(null(), Equipment.id.type), type_coerce(null(), Equipment.updated_at.type)
+        return union_all(
+            select(literal("intervention"), MaintenanceIntervention.id, MaintenanceIntervention.updated_at)
+            .where(MaintenanceIntervention.updated_at > since),
+            select(literal("scheduled"), ScheduledMaintenance.id, ScheduledMaintenance.updated_at)
+            .where(ScheduledMaintenance.updated_at > since),
+            # Type de maintenance lu dans le plan
+            select(literal("scheduled"), ScheduledMaintenance.id, MaintenancePlan.updated_at)
+            .join(MaintenancePlan, MaintenancePlan.id == ScheduledMaintenance.maintenance_plan_id)
+            .where(MaintenancePlan.updated_at > since, ScheduledMaintenance.status.in_(SCHEDULED_STATUSES)),
+            select(literal("equipment"), Equipment.id, Equipment.updated_at)
+            .where(Equipment.updated_at > since),
+            select(SyncTombstone.entity, SyncTombstone.entity_id, SyncTombstone.deleted_at)
+            .where(SyncTombstone.deleted_at > since, SyncTombstone.entity.in_(("interventions", "scheduled", "equipment"))),
+            # Dépendances entre équipements : pas d'updated_at, seulement le compteur de l'étiquette
+            select(literal("lines"), ChangeCounter.version, no_moment)
+            .where(ChangeCounter.tag == "production_lines"),
+            select(literal("now"), no_id, func.now())
+        )
+
+    def _poll(self, db: Session) -> None:
+        """Sans LISTEN/NOTIFY : relire seulement les éléments modifiés depuis la lecture précédente.
+
+        La fenêtre recouvre WORK_QUEUE_OVERLAP_SECONDS avant la marque haute
+        (transactions encore ouvertes à la lecture précédente). Seuls un
+        changement de nom, de criticité ou de ligne d'un équipement, ou des
+        dépendances d'une ligne, reconstruisent toute la file.
+        """
+        if self._high_water is None:
+            return
+        since = self._high_water - timedelta(seconds=settings.WORK_QUEUE_OVERLAP_SECONDS)
+        refs, equipment_ids, rebuild, now = set(), set(), False, None
+        for kind, item_id, moment in db.execute(self._changes(since)):
+            if kind == "now":
+                now = moment
+            elif kind == "lines":
+                rebuild = rebuild or item_id != self._line_version
+            elif kind == "equipment":
+                equipment_ids.add(item_id)
+            else:
+                refs.add(("intervention" if kind == "interventions" else kind, item_id))
+
+        if equipment_ids:
+            current = self._equipment_attributes(db, list(equipment_ids))
+            rebuild = rebuild or any(current.get(equipment_id) != self._equipment.get(equipment_id) for equipment_id in equipment_ids)
+        self._high_water = now
+        if rebuild:
+            line_graphs.invalidate()
+            self.invalidate()
+        else:
+            with self._lock:
+                self._pending.update(refs)
+
+    def _sync(self, db: Session) -> None:
+        with self._sync_lock:
+            if not change_listener.enabled:
+                self._poll(db)
+            self._sync_locked(db)
+
+    def _sync_locked(self, db: Session) -> None:
+        with self._lock:
+            rebuild = self._stale or time.monotonic() - self._loaded_at > settings.WORK_QUEUE_REBUILD_SECONDS
+            if rebuild:
+                self._stale = False
+                self._pending.clear()
+                self._line_stops.clear()
+                self._loaded_at = time.monotonic()
+            pending, self._pending = self._pending, set()
+
+        if rebuild:
+            if not change_listener.enabled:
+                # Marque haute prise avant la lecture : un changement concurrent sera relu
+                self._high_water = db.execute(select(func.now())).scalar()
+                self._equipment = self._equipment_attributes(db)
+                self._line_version = db.execute(
+                    select(ChangeCounter.version).where(ChangeCounter.tag == "production_lines")
+                ).scalar()
+            items = self._load(db)
+            with self._lock:
+                self._queues, self._owners = {}, {}
+                self._place(items)
+            return
+        if not pending:
+            return
+
+        items = self._load(
+            db,
+            [item_id for kind, item_id in pending if kind == "intervention"],
+            [item_id for kind, item_id in pending if kind == "scheduled"]
+        )
+        with self._lock:
+            # Sortis de la file (terminés, démarrés) ou changés de technicien : retirés d'abord
+            for ref in pending:
+                if ref in self._owners:
+                    self._queues[self._owners.pop(ref)].discard(ref)
+            self._place(items)
+
+    def top(self, db: Session, technician_id: Optional[int], count: int) -> Tuple[int, List[dict]]:
+        """Nombre d'éléments en file et N premiers éléments d'un technicien, avec leur score actuel"""
+        self._sync(db)
+        now = _hours(datetime.now())
+        with self._lock:
+            queue = self._queues.get(technician_id)
+            if queue is None:
+                return 0, []
+            total = len(queue)
+            # Copie sous le verrou : une relecture concurrente vide les entrées retirées
+            entries = [(entry[0], entry[3]) for entry in queue.top(count)]
+        results = []
+        for negated_key, item in entries:
+            score = now - negated_key
+            results.append({**item, "score": round(score, 2), "overdue_hours": round(now - _hours(item["due_date"]), 2)})
+        return total, results
+
+work_queue = WorkQueue()
+
+@on_change
+def _track_queue_changes(tags: tuple, change_event) -> None:
+    event_type = change_event.type if change_event is not None else None
+    if event_type in ("intervention.created", "intervention.status"):
+        work_queue.refresh("intervention", change_event.data["id"])
+    elif event_type == "scheduled.created":
+        work_queue.refresh("scheduled", change_event.data["id"])
+    elif event_type in ("plan.updated", "plan.deleted"):
+        # Type de maintenance lu dans le plan ; supprimées avec lui sinon
+        for scheduled_id in change_event.data["scheduled_ids"]:
+            work_queue.refresh("scheduled", scheduled_id)
+    elif event_type == "resync":
+        work_queue.invalidate()
+    elif "production_lines" in tags or ("equipment" in tags and event_type != "equipment.status"):
+        work_queue.invalidate()
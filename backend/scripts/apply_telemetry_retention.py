@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Application de la rétention de la télémétrie (tâche cron quotidienne) : mesures
+brutes et agrégats plus anciens que TELEMETRY_RETENTION_*_DAYS supprimés.
+"""
+import sys
+import os
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.rollups import apply_retention, retention_days
+
+def main():
+    print("🧹 Application de la rétention de la télémétrie...")
+    for name, days in retention_days().items():
+        print(f"   • {name} : {'illimitée' if days is None else f'{days} jour(s)'}")
+
+    db = SessionLocal()
+    try:
+        removed = apply_retention(db)
+        db.commit()
+        for name, count in removed.items():
+            print(f"   ✅ {name} : {count} supprimé(s)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors de l'application de la rétention : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Initialisation de l'historique des statuts : une ligne par équipement qui
+n'en a pas encore, avec son statut actuel depuis sa création. Sans elle, le
+temps antérieur au premier changement journalisé n'est pas compté.
+"""
+import sys
+import os
+from datetime import datetime
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import SessionLocal
+from app.models.equipment import Equipment, EquipmentStatusChange
+
+def main():
+    db = SessionLocal()
+    try:
+        known = select(EquipmentStatusChange.id).where(EquipmentStatusChange.equipment_id == Equipment.id)
+        missing = select(
+            Equipment.id,
+            Equipment.status,
+            func.coalesce(Equipment.created_at, datetime.now())
+        ).where(~known.exists())
+
+        print("🕓 Initialisation de l'historique des statuts...")
+        result = db.execute(insert(EquipmentStatusChange).from_select(
+            ["equipment_id", "status", "changed_at"], missing
+        ))
+        db.commit()
+        print(f"✅ {result.rowcount} équipement(s) initialisé(s)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors de l'initialisation de l'historique : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Mesure des octets transmis et du coût CPU de la compression des réponses JSON
+"""
+import sys
+import os
+import gzip
+import time
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire parent au path pour importer les modules de l'app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.compression import brotli
+from app.core.responses import model_response
+from app.schemas.maintenance import CalendarEvent
+from benchmark_serialization import build_equipment
+from app.schemas.equipment import EquipmentResponse
+
+ROUNDS = 10
+
+def calendar_payload(count: int) -> bytes:
+    """Construire une réponse /calendar représentative"""
+    start = datetime(2025, 1, 1, 8, 0)
+    events = [
+        CalendarEvent(
+            id=f"scheduled_{i}",
+            title=f"Maintenance - Équipement {i % 200}",
+            start=start + timedelta(hours=i),
+            end=start + timedelta(hours=i, minutes=90),
+            extendedProps={
+                "type": "scheduled",
+                "status": "scheduled",
+                "priority": "medium",
+                "equipment_name": f"Équipement {i % 200}",
+                "technician_name": "Jean Dupont"
+            }
+        )
+        for i in range(count)
+    ]
+    return model_response(CalendarEvent, events).body
+
+def measure(label: str, payload: bytes, compress):
+    """Mesurer la taille compressée et le temps CPU moyen de compression"""
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        compressed = compress(payload)
+    elapsed_ms = (time.process_time() - start) * 1000 / ROUNDS
+    ratio = len(compressed) / len(payload) * 100
+    print(f"   {label:<14} {len(compressed):>9} octets ({ratio:5.1f}%)  {elapsed_ms:7.2f} ms CPU")
+
+def main():
+    payloads = {
+        "/equipment?limit=1000": model_response(EquipmentResponse, build_equipment(1000)).body,
+        "/calendar (2000 évts)": calendar_payload(2000),
+    }
+    for name, payload in payloads.items():
+        print(f"📦 {name} : {len(payload)} octets non compressés")
+        for level in (1, 6, 9):
+            measure(f"gzip -{level}", payload, lambda body, level=level: gzip.compress(body, compresslevel=level))
+        if brotli is not None:
+            for quality in (1, 4, 11):
+                measure(f"brotli q{quality}", payload, lambda body, quality=quality: brotli.compress(body, quality=quality))
+        else:
+            print("   ⚠️  brotli non installé")
+
+if __name__ == "__main__":
+    main()
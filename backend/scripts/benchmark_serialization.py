@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark du coût de sérialisation par ligne d'une liste de 1000 équipements
+"""
+import sys
+import os
+import json
+import time
+from datetime import date, datetime
+from typing import List
+
+# Ajouter le répertoire parent au path pour importer les modules de l'app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.fields import parse_fields
+from app.core.responses import FastJSONResponse, model_response
+from app.models.equipment import Equipment
+from app.schemas.equipment import EquipmentResponse
+
+ROWS = 1000
+ROUNDS = 20
+
+def build_equipment(count: int) -> list:
+    """Construire des équipements ORM transitoires (sans base de données)"""
+    now = datetime.now()
+    return [
+        Equipment(
+            id=i,
+            name=f"Équipement {i}",
+            model="XR-200",
+            serial_number=f"SN-{i:06d}",
+            manufacturer="Siemens",
+            purchase_date=date(2020, 1, 1),
+            installation_date=date(2020, 2, 1),
+            warranty_expiry=date(2025, 1, 1),
+            expected_lifespan=10,
+            site_id=1,
+            production_line_id=1,
+            status="active",
+            criticality="high",
+            specifications={"puissance": "15kW", "tension": "400V", "poids": 1200},
+            version=1,
+            created_at=now,
+            updated_at=now
+        )
+        for i in range(count)
+    ]
+
+def default_fastapi_path(rows) -> bytes:
+    """Chemin par défaut : validation du response_model, dump python, puis json.dumps"""
+    adapter = TypeAdapter(List[EquipmentResponse])
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def jsonable_encoder_path(rows) -> bytes:
+    """Chemin historique : jsonable_encoder sur les modèles validés"""
+    models = [EquipmentResponse.model_validate(row) for row in rows]
+    return json.dumps(jsonable_encoder(models)).encode("utf-8")
+
+def orjson_path(rows) -> bytes:
+    """Validation du response_model puis rendu par FastJSONResponse (orjson)"""
+    adapter = TypeAdapter(List[EquipmentResponse])
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return FastJSONResponse(content).body
+
+def model_response_path(rows) -> bytes:
+    """Chemin rapide : validation unique et dump_json pydantic-core"""
+    return model_response(EquipmentResponse, rows).body
+
+def sparse_path(rows) -> bytes:
+    """Chemin rapide avec sélection de champs (vue tableau)"""
+    selected = parse_fields("name,status,criticality,site_id,serial_number", EquipmentResponse)
+    return model_response(EquipmentResponse, rows, selected).body
+
+def measure(label: str, func, rows):
+    """Mesurer le coût moyen par ligne d'un chemin de sérialisation"""
+    func(rows)  # échauffement (caches des adaptateurs)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        body = func(rows)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    print(f"   {label:<28} {elapsed * 1e6 / len(rows):8.2f} µs/ligne  {len(body):>9} octets")
+
+def main():
+    rows = build_equipment(ROWS)
+    print(f"📊 Sérialisation de {ROWS} équipements ({ROUNDS} itérations)")
+    measure("FastAPI par défaut (json)", default_fastapi_path, rows)
+    measure("jsonable_encoder", jsonable_encoder_path, rows)
+    measure("FastJSONResponse (orjson)", orjson_path, rows)
+    measure("model_response (dump_json)", model_response_path, rows)
+    measure("model_response + fields", sparse_path, rows)
+
+if __name__ == "__main__":
+    main()
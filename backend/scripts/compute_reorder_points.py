@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Recalcul périodique des points de commande des pièces détachées (tâche cron)
+"""
+import sys
+import os
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.changes import record_change
+from app.models.inventory import StockAlert
+from app.services.inventory import update_reorder_points
+
+def main():
+    print(f"📦 Calcul des points de commande sur {settings.REORDER_HISTORY_DAYS} jours d'historique...")
+    db = SessionLocal()
+    try:
+        updated = update_reorder_points(
+            db,
+            settings.REORDER_HISTORY_DAYS,
+            settings.REORDER_LEAD_TIME_DAYS,
+            settings.REORDER_SERVICE_LEVEL_Z
+        )
+        record_change(db, ("parts",))
+        db.commit()
+        alerts = db.query(func.count(StockAlert.id)).scalar()
+        print(f"✅ {updated} point(s) de commande modifié(s), {alerts} alerte(s) de stock en cours")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors du calcul : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
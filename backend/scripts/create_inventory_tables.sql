@@ -0,0 +1,102 @@
+-- Script pour créer les tables du stock de pièces détachées
+-- À exécuter sur la base de données Neon, après create_missing_tables.sql
+
+-- Catalogue des pièces
+CREATE TABLE IF NOT EXISTS parts (
+    id SERIAL PRIMARY KEY,
+    reference VARCHAR(50) NOT NULL UNIQUE,
+    name VARCHAR(200) NOT NULL,
+    description TEXT,
+    manufacturer VARCHAR(100),
+    unit VARCHAR(20) NOT NULL DEFAULT 'unit',
+    unit_cost INTEGER, -- en centimes d'euro
+    lead_time_days INTEGER, -- délai d'approvisionnement
+    is_active BOOLEAN NOT NULL DEFAULT true,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Stock courant : une ligne par pièce, jamais négatif
+CREATE TABLE IF NOT EXISTS part_stock (
+    id SERIAL PRIMARY KEY,
+    part_id INTEGER NOT NULL UNIQUE REFERENCES parts(id) ON DELETE CASCADE,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    min_quantity INTEGER NOT NULL DEFAULT 0,
+    reorder_point INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT ck_part_stock_quantity_non_negative CHECK (quantity >= 0)
+);
+
+-- Alertes de stock bas : tenues à jour à chaque mouvement
+CREATE TABLE IF NOT EXISTS part_stock_alerts (
+    id SERIAL PRIMARY KEY,
+    part_id INTEGER NOT NULL UNIQUE REFERENCES parts(id) ON DELETE CASCADE,
+    quantity INTEGER NOT NULL,
+    threshold INTEGER NOT NULL,
+    triggered_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Colonnes ajoutées après la première version des tables
+ALTER TABLE parts ADD COLUMN IF NOT EXISTS lead_time_days INTEGER;
+ALTER TABLE part_stock ADD COLUMN IF NOT EXISTS reorder_point INTEGER NOT NULL DEFAULT 0;
+
+-- Journal des mouvements de stock (ajout uniquement)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'stockmovementtype') THEN
+        CREATE TYPE stockmovementtype AS ENUM ('RECEIPT', 'CONSUMPTION', 'ADJUSTMENT', 'RETURN');
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS stock_movements (
+    id SERIAL PRIMARY KEY,
+    part_id INTEGER NOT NULL REFERENCES parts(id),
+    movement_type stockmovementtype NOT NULL,
+    quantity INTEGER NOT NULL, -- variation signée
+    balance_after INTEGER NOT NULL,
+    unit_cost INTEGER, -- en centimes d'euro
+    intervention_id INTEGER REFERENCES maintenance_interventions(id),
+    user_id INTEGER REFERENCES users(id),
+    notes TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Le journal ne se modifie pas : seules les insertions sont autorisées
+CREATE OR REPLACE FUNCTION prevent_stock_movement_changes()
+RETURNS TRIGGER AS $$
+BEGIN
+    RAISE EXCEPTION 'stock_movements est en ajout uniquement';
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS stock_movements_append_only ON stock_movements;
+CREATE TRIGGER stock_movements_append_only BEFORE UPDATE OR DELETE ON stock_movements FOR EACH ROW EXECUTE FUNCTION prevent_stock_movement_changes();
+
+-- Rattacher les pièces utilisées au catalogue
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.table_constraints WHERE table_name='maintenance_parts_used' AND constraint_name='maintenance_parts_used_part_id_fkey') THEN
+        ALTER TABLE maintenance_parts_used ADD CONSTRAINT maintenance_parts_used_part_id_fkey FOREIGN KEY (part_id) REFERENCES parts(id);
+    END IF;
+END $$;
+
+-- Index
+CREATE INDEX IF NOT EXISTS idx_parts_reference ON parts(reference);
+CREATE INDEX IF NOT EXISTS idx_stock_movements_part_id ON stock_movements(part_id, id);
+CREATE INDEX IF NOT EXISTS idx_stock_movements_intervention_id ON stock_movements(intervention_id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_parts_used_part_id ON maintenance_parts_used(part_id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_parts_used_created_at ON maintenance_parts_used(created_at);
+
+-- Triggers pour mettre à jour automatiquement updated_at
+DROP TRIGGER IF EXISTS update_parts_updated_at ON parts;
+CREATE TRIGGER update_parts_updated_at BEFORE UPDATE ON parts FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_part_stock_updated_at ON part_stock;
+CREATE TRIGGER update_part_stock_updated_at BEFORE UPDATE ON part_stock FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+COMMIT;
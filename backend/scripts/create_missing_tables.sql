@@ -13,6 +13,7 @@ CREATE TABLE IF NOT EXISTS maintenance_plans (
     priority VARCHAR(20) NOT NULL DEFAULT 'medium',
     is_active BOOLEAN NOT NULL DEFAULT true,
     next_due_date TIMESTAMP,
+    version INTEGER NOT NULL DEFAULT 1,
     created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
@@ -60,6 +61,85 @@ CREATE TABLE IF NOT EXISTS maintenance_parts_used (
     updated_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+-- Graphe de flux des lignes : l'équipement aval dépend de l'équipement amont
+CREATE TABLE IF NOT EXISTS equipment_dependencies (
+    id SERIAL PRIMARY KEY,
+    production_line_id INTEGER NOT NULL REFERENCES production_lines(id) ON DELETE CASCADE,
+    upstream_id INTEGER NOT NULL REFERENCES equipment(id) ON DELETE CASCADE,
+    downstream_id INTEGER NOT NULL REFERENCES equipment(id) ON DELETE CASCADE,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_equipment_dependencies_edge UNIQUE (upstream_id, downstream_id),
+    CONSTRAINT ck_equipment_dependencies_no_self_loop CHECK (upstream_id <> downstream_id)
+);
+
+-- Historique des statuts d'équipement (ajout seul)
+CREATE TABLE IF NOT EXISTS equipment_status_history (
+    id SERIAL PRIMARY KEY,
+    equipment_id INTEGER NOT NULL REFERENCES equipment(id) ON DELETE CASCADE,
+    status VARCHAR(20) NOT NULL,
+    previous_status VARCHAR(20),
+    changed_at TIMESTAMP NOT NULL
+);
+
+-- Journal d'audit des écritures (ajout seul, sans clé étrangère)
+CREATE TABLE IF NOT EXISTS audit_log (
+    id BIGSERIAL PRIMARY KEY,
+    occurred_at TIMESTAMP NOT NULL,
+    actor VARCHAR(50),
+    source VARCHAR(200),
+    action VARCHAR(10) NOT NULL,
+    entity VARCHAR(50) NOT NULL,
+    entity_id INTEGER,
+    changes JSON NOT NULL
+);
+
+-- Suppressions et réassignations à propager aux tablettes hors ligne
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    id BIGSERIAL PRIMARY KEY,
+    entity VARCHAR(20) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    technician_id INTEGER,
+    deleted_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Réponses conservées par clé d'idempotence (insérées dans la transaction de l'écriture)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id BIGSERIAL PRIMARY KEY,
+    owner VARCHAR(100) NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    fingerprint VARCHAR(40) NOT NULL,
+    status_code INTEGER,
+    media_type VARCHAR(100),
+    headers JSON,
+    body TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL,
+    CONSTRAINT uq_idempotency_keys_owner_key UNIQUE (owner, key)
+);
+
+-- Simulations Monte Carlo (état et résultat, hors du cache des réponses)
+CREATE TABLE IF NOT EXISTS simulation_jobs (
+    id VARCHAR(32) PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    runs INTEGER NOT NULL,
+    horizon_days INTEGER NOT NULL,
+    seed BIGINT NOT NULL,
+    site_id INTEGER,
+    error TEXT,
+    result JSON,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- Compteurs de changements par étiquette de cache (validateurs HTTP sans Redis)
+CREATE TABLE IF NOT EXISTS change_counters (
+    tag VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
 -- Ajouter des colonnes manquantes à la table maintenance_interventions si nécessaire
 DO $$ 
 BEGIN
@@ -153,6 +233,30 @@ BEGIN
     END IF;
 END $$;
 
+-- Taux horaire des techniciens (calcul du coût de main-d'œuvre)
+DO $$ 
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='users' AND column_name='hourly_rate') THEN
+        ALTER TABLE users ADD COLUMN hourly_rate INTEGER; -- en centimes
+    END IF;
+END $$;
+
+-- Version des enregistrements modifiables (verrouillage optimiste, ETag / If-Match)
+DO $$ 
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='equipment' AND column_name='version') THEN
+        ALTER TABLE equipment ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+    END IF;
+    
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='maintenance_plans' AND column_name='version') THEN
+        ALTER TABLE maintenance_plans ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+    END IF;
+    
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='maintenance_interventions' AND column_name='version') THEN
+        ALTER TABLE maintenance_interventions ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+    END IF;
+END $$;
+
 -- Créer des index pour améliorer les performances
 CREATE INDEX IF NOT EXISTS idx_maintenance_plans_equipment_id ON maintenance_plans(equipment_id);
 CREATE INDEX IF NOT EXISTS idx_maintenance_plans_active ON maintenance_plans(is_active);
@@ -161,6 +265,21 @@ CREATE INDEX IF NOT EXISTS idx_intervention_tasks_intervention_id ON interventio
 CREATE INDEX IF NOT EXISTS idx_scheduled_maintenances_date ON scheduled_maintenances(scheduled_date);
 CREATE INDEX IF NOT EXISTS idx_maintenance_interventions_equipment_id ON maintenance_interventions(equipment_id);
 CREATE INDEX IF NOT EXISTS idx_maintenance_interventions_status ON maintenance_interventions(status);
+CREATE INDEX IF NOT EXISTS idx_equipment_dependencies_production_line_id ON equipment_dependencies(production_line_id);
+CREATE INDEX IF NOT EXISTS idx_equipment_status_history_equipment_changed_at ON equipment_status_history(equipment_id, changed_at, id) INCLUDE (status);
+CREATE INDEX IF NOT EXISTS idx_audit_log_entity ON audit_log(entity, entity_id, id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_actor ON audit_log(actor, id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_occurred_at ON audit_log USING brin (occurred_at);
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_deleted_at ON sync_tombstones(deleted_at, id);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+CREATE INDEX IF NOT EXISTS idx_simulation_jobs_expires_at ON simulation_jobs(expires_at);
+CREATE INDEX IF NOT EXISTS idx_scheduled_maintenances_technician_updated_at ON scheduled_maintenances(assigned_technician_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_interventions_technician_updated_at ON maintenance_interventions(technician_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_intervention_tasks_updated_at ON intervention_tasks(intervention_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_interventions_updated_at ON maintenance_interventions(updated_at);
+CREATE INDEX IF NOT EXISTS idx_scheduled_maintenances_updated_at ON scheduled_maintenances(updated_at);
+CREATE INDEX IF NOT EXISTS idx_maintenance_plans_updated_at ON maintenance_plans(updated_at);
+CREATE INDEX IF NOT EXISTS idx_equipment_updated_at ON equipment(updated_at);
 
 -- Fonction pour mettre à jour automatiquement updated_at
 CREATE OR REPLACE FUNCTION update_updated_at_column()
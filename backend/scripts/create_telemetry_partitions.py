@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Création à l'avance des partitions mensuelles de sensor_readings (tâche cron).
+Une partition manquante ferait tomber les mesures dans la partition par défaut.
+"""
+import sys
+import os
+from datetime import date
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+
+def month_starts(months_ahead: int) -> list:
+    """Premier jour du mois courant et des mois suivants"""
+    today = date.today()
+    months = []
+    for offset in range(months_ahead + 1):
+        year, month = divmod(today.month - 1 + offset, 12)
+        months.append(date(today.year + year, month + 1, 1))
+    return months
+
+def main():
+    if engine.dialect.name != "postgresql":
+        print("ℹ️  Partitionnement disponible uniquement sur PostgreSQL")
+        return
+
+    months = month_starts(settings.TELEMETRY_PARTITION_MONTHS_AHEAD)
+    print(f"🗓️  Création des partitions de {months[0]:%Y-%m} à {months[-1]:%Y-%m}...")
+    try:
+        with engine.begin() as conn:
+            for month_start in months:
+                conn.execute(text("SELECT create_sensor_readings_partition(:month_start)"), {"month_start": month_start})
+                print(f"   ✅ sensor_readings_{month_start:%Y_%m}")
+    except Exception as e:
+        print(f"❌ Erreur lors de la création des partitions : {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+-- Script pour créer la table des mesures capteurs, partitionnée par mois
+-- À exécuter sur la base de données Neon
+
+-- Table parente : les lignes sont stockées dans les partitions mensuelles
+CREATE TABLE IF NOT EXISTS sensor_readings (
+    equipment_id INTEGER NOT NULL,
+    metric VARCHAR(50) NOT NULL,
+    recorded_at TIMESTAMP NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (equipment_id, metric, recorded_at)
+) PARTITION BY RANGE (recorded_at);
+
+-- Partition par défaut : mesures hors des mois déjà créés
+CREATE TABLE IF NOT EXISTS sensor_readings_default PARTITION OF sensor_readings DEFAULT;
+
+-- Index BRIN : très compact pour des données insérées dans l'ordre chronologique
+CREATE INDEX IF NOT EXISTS idx_sensor_readings_recorded_at ON sensor_readings USING brin (recorded_at);
+
+-- Agrégats par minute, heure et jour, cumulés à chaque ingestion
+CREATE TABLE IF NOT EXISTS sensor_rollups_1m (
+    equipment_id INTEGER NOT NULL,
+    metric VARCHAR(50) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    sample_count INTEGER NOT NULL,
+    value_sum DOUBLE PRECISION NOT NULL,
+    value_min DOUBLE PRECISION NOT NULL,
+    value_max DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (equipment_id, metric, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS sensor_rollups_1h (LIKE sensor_rollups_1m INCLUDING ALL);
+CREATE TABLE IF NOT EXISTS sensor_rollups_1d (LIKE sensor_rollups_1m INCLUDING ALL);
+
+-- Rétention : suppression des agrégats anciens par date
+CREATE INDEX IF NOT EXISTS idx_sensor_rollups_1m_bucket ON sensor_rollups_1m USING brin (bucket);
+CREATE INDEX IF NOT EXISTS idx_sensor_rollups_1h_bucket ON sensor_rollups_1h USING brin (bucket);
+
+-- Créer la partition d'un mois (idempotent)
+CREATE OR REPLACE FUNCTION create_sensor_readings_partition(month_start DATE)
+RETURNS VOID AS $$
+DECLARE
+    partition_start DATE := date_trunc('month', month_start)::date;
+    partition_end DATE := (date_trunc('month', month_start) + INTERVAL '1 month')::date;
+    partition_name TEXT := 'sensor_readings_' || to_char(partition_start, 'YYYY_MM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF sensor_readings FOR VALUES FROM (%L) TO (%L)',
+        partition_name, partition_start, partition_end
+    );
+END;
+$$ language 'plpgsql';
+
+-- Mois courant et trois mois suivants (ensuite : scripts/create_telemetry_partitions.py)
+SELECT create_sensor_readings_partition((date_trunc('month', NOW()) + (n || ' month')::interval)::date)
+FROM generate_series(0, 3) AS n;
+
+COMMIT;
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test de charge : de nombreux techniciens consomment la même pièce en parallèle.
+Vérifie qu'aucune mise à jour n'est perdue et que le stock ne devient jamais négatif.
+"""
+import sys
+import json
+import time
+import argparse
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+def call(base_url: str, method: str, path: str, token: str = None, body=None, form=None):
+    """Requête HTTP minimale (bibliothèque standard uniquement)"""
+    headers = {}
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode()
+        headers["Content-Type"] = "application/json"
+    elif form is not None:
+        data = urllib.parse.urlencode(form).encode()
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    request = urllib.request.Request(base_url + path, data=data, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read() or b"null")
+    except (urllib.error.URLError, TimeoutError) as error:
+        return 0, str(error)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--part-id", type=int, required=True)
+    parser.add_argument("--intervention-id", type=int, required=True)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+
+    print("🔐 Connexion...")
+    status, payload = call(args.base_url, "POST", "/api/auth/login",
+                           form={"username": args.username, "password": args.password})
+    if status != 200:
+        print(f"❌ Connexion impossible ({status}) : {payload}")
+        sys.exit(1)
+    token = payload["access_token"]
+
+    _, part = call(args.base_url, "GET", f"/api/v1/parts/{args.part_id}", token)
+    _, movements = call(args.base_url, "GET", f"/api/v1/parts/{args.part_id}/movements?limit=1", token)
+    initial_quantity = part["quantity"]
+    last_movement_id = movements[0]["id"] if movements else 0
+    print(f"📦 Pièce {part['reference']} : stock initial {initial_quantity}")
+
+    def consume(_):
+        started = time.perf_counter()
+        status, _ = call(args.base_url, "POST", f"/api/v1/maintenance/interventions/{args.intervention_id}/parts",
+                         token, body={"part_id": args.part_id, "quantity": args.quantity})
+        return status, time.perf_counter() - started
+
+    print(f"🚀 {args.requests} consommations, {args.concurrency} en parallèle...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(consume, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    statuses = Counter(status for status, _ in results)
+    latencies = sorted(latency for _, latency in results)
+    succeeded = statuses.get(201, 0)
+    print(f"⏱️  {elapsed:.2f} s, {args.requests / elapsed:.0f} req/s, "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.0f} ms")
+    print(f"📊 Statuts : {dict(statuses)}")
+
+    # Vérifications de cohérence
+    _, part = call(args.base_url, "GET", f"/api/v1/parts/{args.part_id}", token)
+    _, movements = call(args.base_url, "GET", f"/api/v1/parts/{args.part_id}/movements?limit=1000", token)
+    new_movements = [movement for movement in movements if movement["id"] > last_movement_id]
+    balances = sorted((movement["balance_after"] for movement in new_movements), reverse=True)
+    expected_balances = [initial_quantity - args.quantity * (i + 1) for i in range(succeeded)]
+
+    errors = []
+    if part["quantity"] != initial_quantity - args.quantity * succeeded:
+        errors.append(f"stock final {part['quantity']} ≠ {initial_quantity} - {args.quantity} × {succeeded}")
+    if part["quantity"] < 0:
+        errors.append(f"stock négatif : {part['quantity']}")
+    if set(statuses) - {201, 409}:
+        errors.append(f"statuts inattendus : {dict(statuses)}")
+    if len(new_movements) < 1000 and balances != expected_balances:
+        errors.append("soldes du journal incohérents (mise à jour perdue ou dupliquée)")
+    if succeeded < args.requests and part["quantity"] >= args.quantity:
+        errors.append("des consommations ont été refusées alors que le stock était suffisant")
+
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        sys.exit(1)
+    print(f"✅ Stock final {part['quantity']} : aucune mise à jour perdue, aucun stock négatif")
+
+if __name__ == "__main__":
+    main()
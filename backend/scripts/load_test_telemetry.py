@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Générateur de charge pour l'ingestion de télémétrie : envoie des lots de mesures
+en NDJSON ou MessagePack et mesure le débit soutenu (mesures par seconde).
+"""
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import msgpack
+except ImportError:  # msgpack est optionnel, seul NDJSON est alors disponible
+    msgpack = None
+
+METRICS = ("temperature", "vibration", "pressure", "current")
+
+def login(base_url: str, username: str, password: str) -> str:
+    data = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    request = urllib.request.Request(base_url + "/api/auth/login", data=data, method="POST")
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())["access_token"]
+
+def build_body(request_index: int, args, start_time: float) -> tuple:
+    """Un lot par équipement ; instants distincts pour éviter les doublons"""
+    per_equipment = max(args.batch_size // len(args.equipment_ids), 1)
+    batches = []
+    for position, equipment_id in enumerate(args.equipment_ids):
+        base = start_time + (request_index * len(args.equipment_ids) + position) * per_equipment * 0.001
+        readings = [
+            {
+                "metric": METRICS[i % len(METRICS)],
+                "value": round(50 + 10 * math.sin(base + i) + random.gauss(0, 1), 3),
+                "recorded_at": round(base + i * 0.001, 3)
+            }
+            for i in range(per_equipment)
+        ]
+        batches.append({"equipment_id": equipment_id, "readings": readings})
+
+    if args.format == "msgpack":
+        return b"".join(msgpack.packb(batch) for batch in batches), "application/msgpack"
+    return "\n".join(json.dumps(batch, separators=(",", ":")) for batch in batches).encode(), "application/x-ndjson"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--equipment-ids", type=lambda value: [int(x) for x in value.split(",")], default=[1])
+    parser.add_argument("--format", choices=["ndjson", "msgpack"], default="ndjson")
+    parser.add_argument("--batch-size", type=int, default=5000, help="mesures par requête")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.format == "msgpack" and msgpack is None:
+        print("❌ Le paquet msgpack n'est pas installé")
+        sys.exit(1)
+
+    print("🔐 Connexion...")
+    token = login(args.base_url, args.username, args.password)
+
+    # Corps préparés à l'avance : seul l'envoi est chronométré
+    start_time = time.time() - args.requests * args.batch_size * 0.001
+    bodies = [build_body(i, args, start_time) for i in range(args.requests)]
+    payload_bytes = sum(len(body) for body, _ in bodies)
+    print(f"📦 {args.requests} requêtes {args.format}, {payload_bytes / len(bodies) / 1024:.0f} Ko en moyenne")
+
+    def send(item):
+        body, content_type = item
+        request = urllib.request.Request(
+            args.base_url + "/api/v1/telemetry/readings",
+            data=body,
+            method="POST",
+            headers={"Content-Type": content_type, "Authorization": f"Bearer {token}"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            return error.code, error.read()[:200]
+        except (urllib.error.URLError, TimeoutError) as error:
+            return 0, str(error)
+
+    print(f"🚀 Envoi avec {args.concurrency} client(s) en parallèle...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(send, bodies))
+    elapsed = time.perf_counter() - started
+
+    statuses = Counter(status for status, _ in results)
+    accepted = sum(payload["accepted"] for status, payload in results if status == 201)
+    inserted = sum(payload["inserted"] for status, payload in results if status == 201)
+    print(f"📊 Statuts : {dict(statuses)}")
+    print(f"⏱️  {accepted} mesures en {elapsed:.2f} s : {accepted / elapsed:,.0f} mesures/s "
+          f"({inserted} insérées, {accepted - inserted} doublons)")
+    if set(statuses) != {201}:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
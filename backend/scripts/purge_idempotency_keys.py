@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Purge des réponses conservées par clé d'idempotence une fois expirées :
+elles ne sont plus rejouées, une nouvelle requête avec la même clé est
+exécutée normalement.
+"""
+import sys
+import os
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func
+
+from app.core.database import SessionLocal
+from app.models.idempotency import IdempotencyKey
+
+def main():
+    db = SessionLocal()
+    try:
+        print("🧹 Purge des clés d'idempotence expirées...")
+        result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now()))
+        db.commit()
+        print(f"✅ {result.rowcount} clé(s) supprimée(s)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors de la purge : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
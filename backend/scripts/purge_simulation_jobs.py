@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Purge des simulations expirées (SIMULATION_JOB_TTL après leur dernier
+changement d'état) : GET /simulations/{id} renvoie alors 404.
+"""
+import sys
+import os
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func
+
+from app.core.database import SessionLocal
+from app.models.simulation import SimulationJob
+
+def main():
+    db = SessionLocal()
+    try:
+        print("🧹 Purge des simulations expirées...")
+        result = db.execute(delete(SimulationJob).where(SimulationJob.expires_at <= func.now()))
+        db.commit()
+        print(f"✅ {result.rowcount} simulation(s) supprimée(s)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors de la purge : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
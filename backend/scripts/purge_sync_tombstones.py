@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Purge des pierres tombales de synchronisation plus anciennes que la durée
+de rétention : les jetons antérieurs sont de toute façon refusés (410) et
+les tablettes concernées refont une synchronisation complète.
+"""
+import sys
+import os
+from datetime import timedelta
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.sync import SyncTombstone
+
+def main():
+    db = SessionLocal()
+    try:
+        now = db.execute(select(func.now())).scalar()
+        oldest = now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+        print("🧹 Purge des pierres tombales de synchronisation...")
+        result = db.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < oldest))
+        db.commit()
+        print(f"✅ {result.rowcount} pierre(s) tombale(s) supprimée(s)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors de la purge : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Recalcul des agrégats de télémétrie (minute, heure, jour) depuis les mesures
+brutes, jour par jour : initialisation ou reprise après correction des données.
+"""
+import sys
+import os
+import time
+import argparse
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.models.telemetry import SensorReading
+from app.services.rollups import rebuild_rollups
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--start", type=datetime.fromisoformat, help="première mesure par défaut")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="dernière mesure par défaut")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        first, last = db.execute(select(func.min(SensorReading.recorded_at), func.max(SensorReading.recorded_at))).one()
+        start = args.start or first
+        end = args.end or (last + timedelta(microseconds=1) if last else None)
+        if start is None or end is None:
+            print("ℹ️  Aucune mesure à agréger")
+            return
+
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        print(f"📈 Recalcul des agrégats du {day:%Y-%m-%d} au {end:%Y-%m-%d}...")
+        started = time.perf_counter()
+        while day < end:
+            # Un commit par jour : transactions courtes, reprise possible
+            counts = rebuild_rollups(db, day, day + timedelta(days=1))
+            db.commit()
+            print(f"   • {day:%Y-%m-%d} : {counts['1m']} minute(s), {counts['1h']} heure(s), {counts['1d']} jour(s)")
+            day += timedelta(days=1)
+        print(f"✅ Agrégats recalculés en {time.perf_counter() - started:.1f} s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors du recalcul des agrégats : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Recalcul des coûts (main-d'œuvre, pièces, total) des interventions terminées,
+par lots : chaque lot est un UPDATE agrégé unique suivi d'un commit.
+"""
+import sys
+import os
+import time
+import argparse
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.changes import record_change
+from app.models.maintenance import MaintenanceIntervention
+from app.services.costs import rollup_costs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=settings.COST_ROLLUP_BATCH_SIZE)
+    parser.add_argument("--only-missing", action="store_true", help="ignorer les interventions déjà chiffrées")
+    args = parser.parse_args()
+
+    print(f"💶 Recalcul des coûts des interventions (lots de {args.batch_size})...")
+    db = SessionLocal()
+    criteria = [MaintenanceIntervention.status.in_(["completed", "validated"])]
+    if args.only_missing:
+        criteria.append(MaintenanceIntervention.total_cost.is_(None))
+
+    started = time.perf_counter()
+    last_id = 0
+    total = 0
+    try:
+        while True:
+            # Pagination par clé : chaque lot reprend après le dernier identifiant traité
+            ids = db.execute(
+                select(MaintenanceIntervention.id)
+                .where(*criteria, MaintenanceIntervention.id > last_id)
+                .order_by(MaintenanceIntervention.id)
+                .limit(args.batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            total += rollup_costs(
+                db,
+                [MaintenanceIntervention.id.in_(ids)],
+                settings.DEFAULT_LABOR_RATE
+            )
+            db.commit()
+            last_id = ids[-1]
+            print(f"   • {total} intervention(s) traitée(s) (jusqu'à l'ID {last_id})")
+
+        if total:
+            record_change(db, ("maintenance",))
+            db.commit()
+        print(f"✅ {total} intervention(s) recalculée(s) en {time.perf_counter() - started:.1f} s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors du recalcul : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
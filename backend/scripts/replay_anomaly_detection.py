@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Rejouer la détection d'anomalies sur l'historique de sensor_readings, par exemple
+pour régler les seuils. Par défaut aucun changement n'est écrit (simulation).
+"""
+import sys
+import os
+import time
+import argparse
+from datetime import datetime
+
+# Ajouter le répertoire parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.telemetry import SensorReading
+from app.services.anomaly import AnomalyDetector, open_predictive_interventions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--equipment-id", type=int, action="append", help="répétable ; tous par défaut")
+    parser.add_argument("--metric", action="append", help="répétable ; toutes par défaut")
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    parser.add_argument("--window", type=int, default=settings.ANOMALY_WINDOW)
+    parser.add_argument("--alpha", type=float, default=settings.ANOMALY_EWMA_ALPHA)
+    parser.add_argument("--z-threshold", type=float, default=settings.ANOMALY_Z_THRESHOLD)
+    parser.add_argument("--min-samples", type=int, default=settings.ANOMALY_MIN_SAMPLES)
+    parser.add_argument("--consecutive", type=int, default=settings.ANOMALY_CONSECUTIVE)
+    parser.add_argument("--technician-id", type=int, default=settings.ANOMALY_TECHNICIAN_ID)
+    parser.add_argument("--open-interventions", action="store_true",
+                        help="ouvrir réellement les interventions prédictives")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.open_interventions and args.technician_id is None:
+        print("❌ --technician-id (ou ANOMALY_TECHNICIAN_ID) est requis avec --open-interventions")
+        sys.exit(1)
+
+    detector = AnomalyDetector(
+        window=args.window,
+        alpha=args.alpha,
+        z_threshold=args.z_threshold,
+        min_samples=args.min_samples,
+        consecutive=args.consecutive,
+        rate_limits=settings.ANOMALY_RATE_LIMITS
+    )
+
+    criteria = []
+    if args.equipment_id:
+        criteria.append(SensorReading.equipment_id.in_(args.equipment_id))
+    if args.metric:
+        criteria.append(SensorReading.metric.in_(args.metric))
+    if args.start:
+        criteria.append(SensorReading.recorded_at >= args.start)
+    if args.end:
+        criteria.append(SensorReading.recorded_at < args.end)
+
+    print("🔁 Rejeu de la détection d'anomalies...")
+    db = SessionLocal()
+    started = time.perf_counter()
+    anomalies = []
+    try:
+        # Lecture en flux, déjà triée par série : la mémoire reste bornée
+        result = db.execute(
+            select(
+                SensorReading.equipment_id,
+                SensorReading.metric,
+                SensorReading.recorded_at,
+                SensorReading.value
+            )
+            .where(*criteria)
+            .order_by(SensorReading.equipment_id, SensorReading.metric, SensorReading.recorded_at)
+            .execution_options(stream_results=True, yield_per=args.chunk_size)
+        )
+        for equipment_id, metric, recorded_at, value in result:
+            anomaly = detector.observe(equipment_id, metric, recorded_at, value)
+            if anomaly is not None:
+                anomalies.append(anomaly)
+                print(f"   ⚠️  Équipement {anomaly.equipment_id} - {anomaly.metric} = {anomaly.value:g} "
+                      f"à {anomaly.recorded_at:%Y-%m-%d %H:%M:%S} (|z| = {anomaly.score:.1f}, "
+                      f"{', '.join(anomaly.reasons)})")
+
+        elapsed = time.perf_counter() - started
+        stats = detector.stats()
+        print(f"📊 {stats['observed']} mesures, {stats['series']} séries, {len(anomalies)} anomalie(s) "
+              f"en {elapsed:.1f} s ({stats['observed'] / max(elapsed, 1e-9):,.0f} mesures/s)")
+
+        if args.open_interventions:
+            interventions = open_predictive_interventions(db, anomalies, args.technician_id, args.z_threshold)
+            db.commit()
+            print(f"✅ {len(interventions)} intervention(s) prédictive(s) ouverte(s)")
+        else:
+            print("ℹ️  Simulation : aucune intervention ouverte (voir --open-interventions)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors du rejeu : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()